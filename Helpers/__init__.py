@@ -2,6 +2,22 @@ from .mongoDB import MongoDB
 from .funciones import Funciones
 from .elastic import ElasticSearch
 from .webScraping import WebScraping
+from .busqueda import Busqueda
+from .cache import CacheResultados
+from .elasticAsync import ElasticSearchAsync
+from .bm25 import MotorBM25
+from .sugerencias import IndiceSugerencias
+from .singleflight import SingleFlight
+from .conexiones import GestorConexiones
+from .controlBulk import ControlBulk
+from .indices import GestorIndices, IndicesPorAnio
+from .manifiesto import ManifiestoIngesta
+from .exportacion import Exportador
+from .plantillas import PlantillasBusqueda
+from .embeddings import Embeddings
+from .extraccionPdf import ExtractorPdf
+from .metadatosPdf import ExtractorMetadatos
+from .ingestaZip import IngestaZip
 #from .PLN import PLN
-__all__ = ['MongoDB', 'Funciones', 'ElasticSearch', 'WebScraping']
-#__all__ = ['MongoDB', 'Funciones', 'ElasticSearch', 'WebScraping', 'PLN']
\ No newline at end of file
+__all__ = ['MongoDB', 'Funciones', 'ElasticSearch', 'WebScraping', 'Busqueda', 'CacheResultados', 'ElasticSearchAsync', 'MotorBM25', 'IndiceSugerencias', 'SingleFlight', 'GestorConexiones', 'ControlBulk', 'GestorIndices', 'IndicesPorAnio', 'ManifiestoIngesta', 'Exportador', 'PlantillasBusqueda', 'Embeddings', 'ExtractorPdf', 'ExtractorMetadatos', 'IngestaZip']
+#__all__ = ['MongoDB', 'Funciones', 'ElasticSearch', 'WebScraping', 'Busqueda', 'CacheResultados', 'ElasticSearchAsync', 'MotorBM25', 'IndiceSugerencias', 'SingleFlight', 'GestorConexiones', 'ControlBulk', 'GestorIndices', 'IndicesPorAnio', 'ManifiestoIngesta', 'Exportador', 'PlantillasBusqueda', 'Embeddings', 'ExtractorPdf', 'ExtractorMetadatos', 'IngestaZip', 'PLN']
\ No newline at end of file
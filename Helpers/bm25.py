@@ -0,0 +1,294 @@
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from Helpers.busqueda import CAMPOS_TEXTO, CAMPOS_RESPUESTA
+
+
+_PATRON_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def plegar_acentos(texto: str) -> str:
+    """'Situación' -> 'situacion' (minúsculas y sin diacríticos)"""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto) -> List[str]:
+    """Tokens de un valor de campo (string o lista de strings)"""
+    if texto is None:
+        return []
+    if isinstance(texto, (list, tuple)):
+        texto = " ".join(str(t) for t in texto if t is not None)
+    return _PATRON_TOKEN.findall(plegar_acentos(str(texto)))
+
+
+class MotorBM25:
+    """
+    Motor de búsqueda local (BM25) sobre el corpus de boletines.
+
+    Replica lo que hace /buscar-elastic sin depender del clúster:
+    multi_match "best_fields" sobre CAMPOS_TEXTO (máximo entre campos),
+    filtros por anio/semana/tipo_archivo y el mismo orden estable.
+
+    El índice se guarda en una carpeta como arreglos .npy (postings en
+    formato CSR por campo) + un meta.json, y se abre con mmap, así el
+    arranque no copia el índice a memoria y los workers comparten páginas.
+    """
+
+    ARCHIVO_META = "meta.json"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1, b: parámetros BM25 (los mismos valores por defecto de Elastic)
+        """
+        self.k1 = k1
+        self.b = b
+
+        self.vocabulario: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.documentos: List[Dict] = []
+        self.tipos_archivo: List[str] = []
+
+        # Por campo: indptr (n_terminos+1), doc_ids, tf, longitudes
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {}
+        self.anio: Optional[np.ndarray] = None
+        self.semana: Optional[np.ndarray] = None
+        self.tipo: Optional[np.ndarray] = None
+
+    @property
+    def total_documentos(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------ #
+    #   CONSTRUCCIÓN
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def construir(cls, documentos: Iterable[Dict], **kwargs) -> "MotorBM25":
+        """
+        Construye el índice en memoria.
+
+        Args:
+            documentos: boletines ya limpios (con "_id" si lo tienen), como
+                        los que prepara cargarjson.limpiar_documento
+        """
+        motor = cls(**kwargs)
+
+        # termino -> {campo -> {doc -> tf}}
+        crudo: Dict[str, Dict[str, Dict[int, int]]] = {c: {} for c in CAMPOS_TEXTO}
+        longitudes: Dict[str, List[int]] = {c: [] for c in CAMPOS_TEXTO}
+        anios, semanas, tipos = [], [], []
+        codigos_tipo: Dict[str, int] = {}
+
+        for doc in documentos:
+            n = len(motor.ids)
+            motor.ids.append(str(doc.get("_id") or doc.get("id_boletin") or n))
+            motor.documentos.append(
+                {c: doc[c] for c in CAMPOS_RESPUESTA if doc.get(c) not in (None, "", [])}
+            )
+
+            for campo in CAMPOS_TEXTO:
+                tokens = tokenizar(doc.get(campo))
+                longitudes[campo].append(len(tokens))
+                for token in tokens:
+                    por_doc = crudo[campo].setdefault(token, {})
+                    por_doc[n] = por_doc.get(n, 0) + 1
+
+            anios.append(_entero(doc.get("anio")))
+            semanas.append(_entero(doc.get("semana_epidemiologica") or doc.get("semana")))
+
+            tipo = (doc.get("tipo_archivo") or "").strip().lower()
+            if tipo and tipo not in codigos_tipo:
+                codigos_tipo[tipo] = len(codigos_tipo) + 1
+            tipos.append(codigos_tipo.get(tipo, 0))
+
+        terminos = sorted(set().union(*(crudo[c].keys() for c in CAMPOS_TEXTO)))
+        motor.vocabulario = {t: i for i, t in enumerate(terminos)}
+
+        for campo in CAMPOS_TEXTO:
+            indptr = np.zeros(len(terminos) + 1, dtype=np.int64)
+            doc_ids: List[int] = []
+            tf: List[int] = []
+            for i, termino in enumerate(terminos):
+                por_doc = crudo[campo].get(termino, {})
+                for d in sorted(por_doc):
+                    doc_ids.append(d)
+                    tf.append(por_doc[d])
+                indptr[i + 1] = len(doc_ids)
+
+            motor.postings[campo] = {
+                "indptr": indptr,
+                "doc_ids": np.asarray(doc_ids, dtype=np.int32),
+                "tf": np.asarray(tf, dtype=np.float32),
+                "longitudes": np.asarray(longitudes[campo], dtype=np.float32),
+            }
+
+        motor.anio = np.asarray(anios, dtype=np.int32)
+        motor.semana = np.asarray(semanas, dtype=np.int32)
+        motor.tipo = np.asarray(tipos, dtype=np.int8)
+        motor.tipos_archivo = sorted(codigos_tipo, key=codigos_tipo.get)
+        return motor
+
+    # ------------------------------------------------------------------ #
+    #   PERSISTENCIA
+    # ------------------------------------------------------------------ #
+
+    def guardar(self, carpeta: str) -> None:
+        """Guarda el índice en una carpeta (arreglos .npy + meta.json)."""
+        os.makedirs(carpeta, exist_ok=True)
+
+        for campo, arreglos in self.postings.items():
+            for nombre, arreglo in arreglos.items():
+                np.save(os.path.join(carpeta, f"{campo}.{nombre}.npy"), arreglo)
+        np.save(os.path.join(carpeta, "anio.npy"), self.anio)
+        np.save(os.path.join(carpeta, "semana.npy"), self.semana)
+        np.save(os.path.join(carpeta, "tipo.npy"), self.tipo)
+
+        meta = {
+            "k1": self.k1,
+            "b": self.b,
+            "campos": list(self.postings),
+            "vocabulario": self.vocabulario,
+            "ids": self.ids,
+            "documentos": self.documentos,
+            "tipos_archivo": self.tipos_archivo,
+        }
+        with open(os.path.join(carpeta, self.ARCHIVO_META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, carpeta: str) -> "MotorBM25":
+        """Abre un índice guardado con guardar(); los .npy se mapean en memoria."""
+        with open(os.path.join(carpeta, cls.ARCHIVO_META), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        motor = cls(k1=meta["k1"], b=meta["b"])
+        motor.vocabulario = meta["vocabulario"]
+        motor.ids = meta["ids"]
+        motor.documentos = meta["documentos"]
+        motor.tipos_archivo = meta["tipos_archivo"]
+
+        def abrir(nombre):
+            return np.load(os.path.join(carpeta, f"{nombre}.npy"), mmap_mode="r")
+
+        for campo in meta["campos"]:
+            motor.postings[campo] = {
+                nombre: abrir(f"{campo}.{nombre}")
+                for nombre in ("indptr", "doc_ids", "tf", "longitudes")
+            }
+        motor.anio = abrir("anio")
+        motor.semana = abrir("semana")
+        motor.tipo = abrir("tipo")
+        return motor
+
+    # ------------------------------------------------------------------ #
+    #   BÚSQUEDA
+    # ------------------------------------------------------------------ #
+
+    def _puntajes_campo(self, campo: str, terminos: List[int]) -> np.ndarray:
+        """BM25 de un campo (fórmula de Lucene: idf * tf / (tf + k1 * norma))."""
+        p = self.postings[campo]
+        longitudes = p["longitudes"]
+        con_campo = longitudes > 0
+        n_docs = int(con_campo.sum())
+        puntajes = np.zeros(self.total_documentos, dtype=np.float32)
+        if not n_docs:
+            return puntajes
+
+        promedio = float(longitudes[con_campo].mean())
+        for t in terminos:
+            inicio, fin = int(p["indptr"][t]), int(p["indptr"][t + 1])
+            if inicio == fin:
+                continue
+            docs = p["doc_ids"][inicio:fin]
+            tf = p["tf"][inicio:fin]
+            df = fin - inicio
+            idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norma = self.k1 * (1 - self.b + self.b * longitudes[docs] / promedio)
+            puntajes[docs] += idf * tf / (tf + norma)
+        return puntajes
+
+    def _mascara_filtros(self, filtros: Dict) -> np.ndarray:
+        mascara = np.ones(self.total_documentos, dtype=bool)
+        if filtros.get("anio") is not None:
+            mascara &= self.anio == int(filtros["anio"])
+        if filtros.get("semana") is not None:
+            mascara &= self.semana == int(filtros["semana"])
+        if filtros.get("tipo_archivo"):
+            tipo = filtros["tipo_archivo"].strip().lower()
+            codigo = self.tipos_archivo.index(tipo) + 1 if tipo in self.tipos_archivo else -1
+            mascara &= self.tipo == codigo
+        return mascara
+
+    def buscar(
+        self,
+        filtros: Dict,
+        size: int = 20,
+        desde: int = 0,
+        orden: str = "estable",
+    ) -> Dict:
+        """
+        Busca con filtros normalizados (Busqueda.normalizar_filtros).
+
+        Args:
+            filtros: texto, anio, semana, tipo_archivo
+            size, desde: ventana de resultados
+            orden: "estable" (anio, semana desc, como /buscar-elastic) o
+                   "relevancia" (puntaje BM25 desc)
+
+        Returns:
+            {"total", "hits", "took_ms"}; cada hit es plano (id + campos +
+            "puntaje"), igual que Busqueda.proyectar_hit
+        """
+        inicio = time.perf_counter()
+
+        terminos = [
+            self.vocabulario[t] for t in dict.fromkeys(tokenizar(filtros.get("texto")))
+            if t in self.vocabulario
+        ]
+        if terminos and self.total_documentos:
+            puntajes = np.max(
+                np.vstack([self._puntajes_campo(c, terminos) for c in self.postings]),
+                axis=0,
+            )
+        else:
+            puntajes = np.zeros(self.total_documentos, dtype=np.float32)
+
+        candidatos = np.flatnonzero((puntajes > 0) & self._mascara_filtros(filtros))
+
+        if orden == "relevancia":
+            orden_docs = candidatos[np.argsort(-puntajes[candidatos], kind="stable")]
+        else:
+            # lexsort usa la última clave como la principal
+            orden_docs = candidatos[np.lexsort((
+                candidatos, -self.semana[candidatos], -self.anio[candidatos]
+            ))]
+
+        hits = []
+        for d in orden_docs[desde:desde + size]:
+            hits.append({
+                "id": self.ids[d],
+                **self.documentos[d],
+                "puntaje": round(float(puntajes[d]), 4),
+            })
+
+        return {
+            "total": int(len(candidatos)),
+            "hits": hits,
+            "took_ms": round((time.perf_counter() - inicio) * 1000, 3),
+        }
+
+
+def _entero(valor) -> int:
+    """int o 0 si falta (0 nunca coincide con un filtro real)"""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return 0
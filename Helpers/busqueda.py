@@ -0,0 +1,383 @@
+import base64
+import html
+import json
+from typing import Dict, List, Optional, Tuple
+
+
+# Campos de texto sobre los que busca el multi_match
+# (OJO: "anio" no va aquí porque es numérico)
+CAMPOS_TEXTO = [
+    "tema_central",
+    "temas_portada",
+    "rango_fechas",
+    "publicacion_en_linea",
+    "semana_epidemiologica",
+]
+
+# Orden estable para paginar con search_after. Con point-in-time el
+# desempate por documento es "_shard_doc" (ordenar por "_id" exige
+# fielddata sobre _id, deshabilitado por defecto en Elastic 8).
+# "semana" es entera en el mapeo declarado (Helpers/indices.py); el
+# índice viejo de mapeo dinámico no la tiene y ordena por la semana en
+# texto ("01".."53", subcampo .keyword). unmapped_type evita el error
+# en el índice que no tiene cada campo.
+ORDEN_ESTABLE = [
+    {"anio": {"order": "desc"}},
+    {"semana": {"order": "desc", "unmapped_type": "integer"}},
+    {"semana_epidemiologica.keyword": {"order": "desc", "unmapped_type": "keyword"}},
+    {"_shard_doc": "asc"},
+]
+
+# Campos que realmente pinta el buscador (filtrado de _source)
+CAMPOS_RESPUESTA = [
+    "anio",
+    "semana_epidemiologica",
+    "rango_fechas",
+    "tema_central",
+    "temas_portada",
+    "pdf_url",
+]
+
+# Resaltado del lado de Elastic. encoder=html escapa el texto original,
+# así el navegador puede pintar los fragmentos como HTML.
+RESALTADO = {
+    "encoder": "html",
+    "pre_tags": ["<mark>"],
+    "post_tags": ["</mark>"],
+    "fields": {
+        "tema_central": {"number_of_fragments": 0},
+        "temas_portada": {"number_of_fragments": 0},
+    },
+}
+
+# Pasajes del cuerpo de los PDFs ("modo": "pasajes", Helpers/pasajes.py):
+# fragmento resaltado de cada pasaje; no_match_size da el comienzo del
+# pasaje (también escapado) si el resaltado no encuentra los términos.
+RESALTADO_PASAJES = {
+    "encoder": "html",
+    "pre_tags": ["<mark>"],
+    "post_tags": ["</mark>"],
+    "fields": {
+        "texto": {"fragment_size": 220, "number_of_fragments": 1, "no_match_size": 220},
+    },
+}
+
+
+class Busqueda:
+    """Construcción de las consultas del buscador de boletines"""
+
+    @staticmethod
+    def _entero(valor) -> Optional[int]:
+        """Convierte a int; si no se puede devuelve None (filtro ignorado)"""
+        if valor in (None, ""):
+            return None
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def normalizar_filtros(data: Dict) -> Dict:
+        """
+        Normaliza el cuerpo de una petición de búsqueda.
+
+        El texto se pasa a minúsculas y se colapsan los espacios (los
+        analizadores de Elastic hacen lo mismo), así "Dengue " y "dengue"
+        terminan en la misma consulta y en la misma entrada de caché.
+
+        Args:
+            data: body JSON con texto, anio, semana y tipo_archivo
+        """
+        texto = " ".join((data.get("texto") or "").split()).lower()
+        tipo_archivo = (data.get("tipo_archivo") or "").strip() or None
+
+        return {
+            "texto": texto,
+            "anio": Busqueda._entero(data.get("anio")),
+            "semana": Busqueda._entero(data.get("semana")),
+            "tipo_archivo": tipo_archivo,
+        }
+
+    @staticmethod
+    def clave(filtros: Dict) -> Tuple:
+        """Clave hashable de una búsqueda (para caché)"""
+        return (
+            filtros.get("texto"),
+            filtros.get("anio"),
+            filtros.get("semana"),
+            filtros.get("tipo_archivo"),
+        )
+
+    @staticmethod
+    def construir_filtros(filtros: Dict) -> List[Dict]:
+        """Cláusulas filter (año, semana, tipo de archivo) de filtros normalizados."""
+        clausulas = []
+
+        # Filtro por año (numérico)
+        if filtros.get("anio") is not None:
+            clausulas.append({"term": {"anio": filtros["anio"]}})
+
+        # Filtro por semana: numérica en el mapeo declarado y en dos dígitos
+        # ("01") en el índice viejo de mapeo dinámico, que no tiene "semana"
+        if filtros.get("semana") is not None:
+            clausulas.append({"bool": {
+                "should": [
+                    {"term": {"semana": filtros["semana"]}},
+                    {"term": {"semana_epidemiologica": f"{filtros['semana']:02d}"}},
+                ],
+                "minimum_should_match": 1,
+            }})
+
+        # Filtro por tipo de archivo (keyword con normalizador en minúsculas)
+        if filtros.get("tipo_archivo"):
+            clausulas.append({"term": {"tipo_archivo": filtros["tipo_archivo"]}})
+
+        return clausulas
+
+    @staticmethod
+    def construir_query(filtros: Dict) -> Dict:
+        """
+        Construye la query bool (multi_match + filtros) a partir de
+        filtros ya normalizados con normalizar_filtros.
+        """
+        return {
+            "bool": {
+                "must": [
+                    {
+                        "multi_match": {
+                            "query": filtros["texto"],
+                            "fields": CAMPOS_TEXTO,
+                            "type": "best_fields"
+                        }
+                    }
+                ],
+                "filter": Busqueda.construir_filtros(filtros)
+            }
+        }
+
+    @staticmethod
+    def parametros_plantilla(
+        filtros: Dict,
+        size: int = 0,
+        pit_id: Optional[str] = None,
+        keep_alive: Optional[str] = None,
+        search_after: Optional[List] = None,
+        total: bool = True,
+    ) -> Dict:
+        """
+        Parámetros de las plantillas guardadas (Helpers/plantillas.py): es
+        todo lo que viaja por petición en lugar del cuerpo completo.
+
+        Args:
+            filtros: filtros normalizados
+            size: tamaño de página (0 para facetas)
+            pit_id / keep_alive: point-in-time (sin PIT no se ordena por _shard_doc)
+            search_after: valores de orden de la página anterior
+            total: track_total_hits
+        """
+        params = {
+            "texto": filtros["texto"],
+            "filtros": Busqueda.construir_filtros(filtros),
+            "size": size,
+            "total": total,
+        }
+        if pit_id:
+            params["pit_id"] = pit_id
+            params["keep_alive"] = keep_alive or "1m"
+        if search_after is not None:
+            params["search_after"] = search_after
+            params["pagina_siguiente"] = True
+        return params
+
+    @staticmethod
+    def construir_knn(vector: List[float], filtros: Dict, k: int = 50,
+                      campo: str = "embedding") -> Dict:
+        """
+        Búsqueda kNN aproximada sobre el campo dense_vector, con los
+        mismos filtros que la búsqueda léxica (se aplican durante la
+        búsqueda de vecinos, no después).
+        """
+        return {
+            "field": campo,
+            "query_vector": vector,
+            "k": k,
+            "num_candidates": max(100, 2 * k),
+            "filter": Busqueda.construir_filtros(filtros),
+        }
+
+    @staticmethod
+    def fusionar_rrf(listas: List[List[Dict]], k: int = 60) -> List[Dict]:
+        """
+        Reciprocal rank fusion: cada hit suma 1 / (k + posición) por cada
+        lista en la que aparece. Solo usa posiciones, así que no importa
+        que los scores de BM25 y de kNN estén en escalas distintas.
+
+        De un hit que aparece en varias listas se conserva la primera
+        versión (la léxica, que trae el resaltado).
+
+        Returns:
+            hits únicos ordenados por puntaje RRF (en "_rrf")
+        """
+        puntajes: Dict[str, float] = {}
+        hits: Dict[str, Dict] = {}
+        for lista in listas:
+            for posicion, hit in enumerate(lista, start=1):
+                puntajes[hit["_id"]] = puntajes.get(hit["_id"], 0.0) + 1.0 / (k + posicion)
+                hits.setdefault(hit["_id"], hit)
+        orden = sorted(puntajes, key=lambda i: puntajes[i], reverse=True)
+        return [dict(hits[i], _rrf=round(puntajes[i], 6)) for i in orden]
+
+    @staticmethod
+    def construir_pasajes(filtros: Dict, size: int, desde: int = 0,
+                          por_boletin: int = 3, total: bool = True) -> Dict:
+        """
+        Búsqueda sobre el índice de pasajes agrupada por boletín: collapse
+        por boletin_id deja el mejor pasaje de cada boletín como hit y
+        inner_hits trae los `por_boletin` mejores pasajes de cada uno.
+
+        Args:
+            filtros: filtros normalizados (los campos del boletín están
+                     copiados en cada pasaje)
+            size / desde: página de boletines
+            por_boletin: pasajes por boletín
+            total: contar los boletines distintos (cardinality)
+        """
+        cuerpo = {
+            "from": desde,
+            "size": size,
+            "query": {
+                "bool": {
+                    "must": [{"match": {"texto": {
+                        "query": filtros["texto"], "minimum_should_match": "2<75%",
+                    }}}],
+                    # Las frases exactas (con poca distancia) suben
+                    "should": [{"match_phrase": {"texto": {
+                        "query": filtros["texto"], "slop": 2, "boost": 2,
+                    }}}],
+                    "filter": Busqueda.construir_filtros(filtros),
+                }
+            },
+            "collapse": {
+                "field": "boletin_id",
+                "inner_hits": {
+                    "name": "pasajes",
+                    "size": por_boletin,
+                    "_source": ["pagina"],
+                    "highlight": RESALTADO_PASAJES,
+                },
+            },
+            "_source": CAMPOS_RESPUESTA,
+            "track_total_hits": False,
+        }
+        if total:
+            cuerpo["aggs"] = {"boletines": {"cardinality": {"field": "boletin_id"}}}
+        return cuerpo
+
+    @staticmethod
+    def construir_facetas() -> Dict:
+        """Agregaciones para los filtros del buscador (año, semana, tipo)"""
+        return {
+            "anios": {"terms": {"field": "anio", "size": 50, "order": {"_key": "desc"}}},
+            "semanas": {"terms": {"field": "semana", "size": 53, "order": {"_key": "asc"}}},
+            "tipos_archivo": {"terms": {"field": "tipo_archivo", "size": 10}},
+        }
+
+    @staticmethod
+    def construir_sugerencias(texto: str) -> Dict:
+        """Sugerencias de corrección ("quiso decir") sobre los temas"""
+        return {
+            "text": texto,
+            "tema_central": {"term": {"field": "tema_central", "suggest_mode": "popular"}},
+            "temas_portada": {"term": {"field": "temas_portada", "suggest_mode": "popular"}},
+        }
+
+    # ------------------------------------------------------------------ #
+    #   PROYECCIÓN DE RESULTADOS
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def proyectar_hit(hit: Dict) -> Dict:
+        """
+        Convierte un hit de Elastic en un registro plano y compacto.
+
+        Solo se conservan el _id y los CAMPOS_RESPUESTA presentes. Si Elastic
+        resaltó tema_central o temas_portada, el valor se reemplaza por su
+        versión HTML (escapada, con <mark>) y el nombre del campo queda en la
+        lista "resaltado"; así el texto no viaja dos veces.
+        """
+        fuente = hit.get("_source") or {}
+        plano = {"id": hit.get("_id")}
+        for campo in CAMPOS_RESPUESTA:
+            valor = fuente.get(campo)
+            if valor not in (None, "", []):
+                plano[campo] = valor
+
+        resaltado = hit.get("highlight") or {}
+        campos_html = []
+
+        if resaltado.get("tema_central"):
+            plano["tema_central"] = " … ".join(resaltado["tema_central"])
+            campos_html.append("tema_central")
+
+        if resaltado.get("temas_portada"):
+            # Elastic solo devuelve los temas que coinciden: los reubicamos
+            # en la lista completa (escapando el resto)
+            marcados = {
+                frag.replace("<mark>", "").replace("</mark>", ""): frag
+                for frag in resaltado["temas_portada"]
+            }
+            temas = fuente.get("temas_portada") or []
+            if isinstance(temas, str):
+                temas = [temas]
+            plano["temas_portada"] = [
+                marcados.get(html.escape(t), html.escape(t)) for t in temas
+            ]
+            campos_html.append("temas_portada")
+
+        if campos_html:
+            plano["resaltado"] = campos_html
+
+        return plano
+
+    @staticmethod
+    def proyectar_pasajes(hit: Dict) -> Dict:
+        """
+        Proyecta un hit de construir_pasajes: el registro del boletín (con
+        id = boletin_id) y en "pasajes" la página y el fragmento HTML de
+        cada pasaje encontrado.
+        """
+        plano = Busqueda.proyectar_hit(hit)
+        plano["id"] = ((hit.get("fields") or {}).get("boletin_id") or [plano["id"]])[0]
+
+        internos = ((hit.get("inner_hits") or {}).get("pasajes") or {}).get("hits", {}).get("hits", [])
+        plano["pasajes"] = [
+            {
+                "pagina": (h.get("_source") or {}).get("pagina"),
+                "texto": " … ".join((h.get("highlight") or {}).get("texto", [])),
+                "score": h.get("_score"),
+            }
+            for h in internos
+        ]
+        plano["resaltado"] = plano.get("resaltado", []) + ["pasajes"]
+        return plano
+
+    # ------------------------------------------------------------------ #
+    #   CURSORES DE PAGINACIÓN
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def codificar_cursor(datos: Dict) -> str:
+        """Codifica el estado de paginación como un string opaco (base64 url-safe)"""
+        crudo = json.dumps(datos, separators=(",", ":"), ensure_ascii=False)
+        return base64.urlsafe_b64encode(crudo.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decodificar_cursor(cursor: str) -> Dict:
+        """Inverso de codificar_cursor; lanza ValueError si el cursor no es válido"""
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception as e:
+            raise ValueError(f"Cursor inválido: {e}")
+        if not isinstance(datos, dict) or "pit" not in datos or "after" not in datos:
+            raise ValueError("Cursor inválido")
+        return datos
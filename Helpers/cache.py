@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class CacheResultados:
+    """
+    Caché en memoria (LRU + TTL) para resultados de búsqueda.
+
+    Cada entrada guarda la generación del índice con la que se calculó;
+    si el índice cambió (carga bulk) la entrada deja de ser válida.
+    """
+
+    def __init__(self, max_entradas: int = 512, ttl_segundos: float = 300):
+        """
+        Args:
+            max_entradas: número máximo de entradas (se expulsa la menos usada)
+            ttl_segundos: vida máxima de una entrada
+        """
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsadas = 0
+        self.expiradas = 0
+        self.invalidadas = 0
+
+    def obtener(self, clave: Hashable, generacion: int = 0) -> Optional[Dict]:
+        """Devuelve el valor guardado o None si no está, expiró o es de otra generación"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+
+            expira, gen, valor = entrada
+            if gen != generacion:
+                del self._datos[clave]
+                self.invalidadas += 1
+                self.fallos += 1
+                return None
+            if expira <= ahora:
+                del self._datos[clave]
+                self.expiradas += 1
+                self.fallos += 1
+                return None
+
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Dict, generacion: int = 0,
+                ttl_segundos: Optional[float] = None) -> None:
+        """
+        Guarda un valor; si se supera el tamaño se expulsa la entrada menos usada.
+        ttl_segundos acorta la vida de esta entrada (nunca la alarga).
+        """
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        expira = time.monotonic() + ttl
+        with self._lock:
+            self._datos[clave] = (expira, generacion, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.expulsadas += 1
+
+    def limpiar(self) -> None:
+        """Vacía la caché (los contadores se conservan)"""
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict:
+        """Contadores para dimensionar la caché"""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+                "expulsadas": self.expulsadas,
+                "expiradas": self.expiradas,
+                "invalidadas": self.invalidadas,
+            }
@@ -0,0 +1,126 @@
+"""
+Codec JSON único para el corpus, los links y los cuerpos bulk.
+
+Usa orjson si está instalado (3-10x más rápido, trabaja en bytes) y si
+no la librería estándar. La salida es compacta (sin espacios) y UTF-8 sin
+escapar tildes; indentar=True da 2 espacios con ambos backends. Tipos no
+JSON (datetime, Decimal, numpy...) se serializan como texto.
+
+    from Helpers import codecJson
+    datos = codecJson.leer("data/boletin.json")
+    codecJson.escribir_ndjson("salida.ndjson", documentos)
+"""
+import json
+from typing import IO, Any, Iterable, Iterator, Union
+
+try:
+    import orjson
+except ImportError:  # opcional
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def _default(obj):
+    if hasattr(obj, "isoformat"):  # orjson ya serializa datetime solo
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy
+        return obj.tolist()
+    return str(obj)
+
+
+def dumps_bytes(obj: Any, indentar: bool = False, ordenar: bool = False) -> bytes:
+    """Serializa a bytes UTF-8 (compacto salvo indentar=True)."""
+    if orjson is not None:
+        opciones = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indentar:
+            opciones |= orjson.OPT_INDENT_2
+        if ordenar:
+            opciones |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_default, option=opciones)
+        except TypeError:
+            pass  # p. ej. enteros de más de 64 bits: lo resuelve json
+    return _dumps_stdlib(obj, indentar, ordenar).encode("utf-8")
+
+
+def dumps(obj: Any, indentar: bool = False, ordenar: bool = False) -> str:
+    """Serializa a str (compacto salvo indentar=True)."""
+    if orjson is not None:
+        return dumps_bytes(obj, indentar, ordenar).decode("utf-8")
+    return _dumps_stdlib(obj, indentar, ordenar)
+
+
+def _dumps_stdlib(obj: Any, indentar: bool, ordenar: bool) -> str:
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        default=_default,
+        sort_keys=ordenar,
+        indent=2 if indentar else None,
+        separators=None if indentar else (",", ":"),
+    )
+
+
+def loads(datos: Union[bytes, bytearray, str]) -> Any:
+    """Parsea JSON desde bytes o str (ValueError si es inválido)."""
+    if orjson is not None:
+        return orjson.loads(datos)
+    if isinstance(datos, (bytes, bytearray)):
+        datos = datos.decode("utf-8")
+    return json.loads(datos)
+
+
+# ---------------------------------------------------------------------- #
+#   ARCHIVOS
+# ---------------------------------------------------------------------- #
+
+def leer(ruta: str) -> Any:
+    """Lee un archivo JSON completo (OSError / ValueError si falla)."""
+    with open(ruta, "rb") as f:
+        return loads(f.read())
+
+
+def guardar(ruta: str, obj: Any, indentar: bool = False) -> None:
+    """Escribe un archivo JSON (compacto salvo indentar=True)."""
+    with open(ruta, "wb") as f:
+        f.write(dumps_bytes(obj, indentar))
+
+
+def linea_ndjson(obj: Any) -> bytes:
+    """Un objeto como línea NDJSON (con el salto de línea)."""
+    return dumps_bytes(obj) + b"\n"
+
+
+def leer_ndjson(origen: Union[str, IO[bytes]]) -> Iterator[Any]:
+    """Generador de objetos de un archivo NDJSON (ruta o archivo binario)."""
+    if isinstance(origen, str):
+        with open(origen, "rb") as f:
+            yield from leer_ndjson(f)
+        return
+    for linea in origen:
+        if linea.strip():
+            yield loads(linea)
+
+
+def escribir_ndjson(destino: Union[str, IO[bytes]], objetos: Iterable[Any],
+                    agregar: bool = False) -> int:
+    """
+    Escribe objetos como NDJSON, en streaming.
+
+    Args:
+        destino: ruta o archivo abierto en modo binario
+        objetos: iterable (puede ser un generador)
+        agregar: con ruta, agregar al final en lugar de sobrescribir
+
+    Returns:
+        número de líneas escritas
+    """
+    if isinstance(destino, str):
+        with open(destino, "ab" if agregar else "wb") as f:
+            return escribir_ndjson(f, objetos)
+    n = 0
+    for obj in objetos:
+        destino.write(linea_ndjson(obj))
+        n += 1
+    return n
@@ -0,0 +1,179 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from elasticsearch import Elasticsearch
+
+
+class GestorConexiones:
+    """
+    Clientes de Elastic y MongoDB compartidos, creados de forma perezosa y
+    uno por proceso.
+
+    Nada se conecta al importar: el cliente se crea la primera vez que se
+    pide, dentro del proceso que lo va a usar. Si el proceso cambió (fork
+    de gunicorn --preload) los clientes heredados se descartan y se crean
+    de nuevo; MongoClient en particular no se puede compartir tras un fork.
+
+    La configuración sale de variables de entorno:
+        ELASTIC_POOL, ELASTIC_TIMEOUT, ELASTIC_REINTENTOS, ELASTIC_COMPRIMIR
+        MONGO_POOL, MONGO_TIMEOUT_MS, MONGO_MAX_IDLE_MS
+    """
+
+    def __init__(self):
+        self._pid = os.getpid()
+        self._elastic: Dict[Tuple, Elasticsearch] = {}
+        self._mongo: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._olvidar_clientes)
+
+    # ------------------------------------------------------------------ #
+    #   CONFIGURACIÓN
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def config() -> Dict:
+        """Parámetros de pool, timeouts, reintentos y keep-alive (desde el entorno)."""
+        return {
+            "elastic_pool": int(os.getenv("ELASTIC_POOL", "10")),
+            "elastic_timeout": float(os.getenv("ELASTIC_TIMEOUT", "10")),
+            "elastic_reintentos": int(os.getenv("ELASTIC_REINTENTOS", "3")),
+            "elastic_comprimir": os.getenv("ELASTIC_COMPRIMIR", "0") == "1",
+            "mongo_pool": int(os.getenv("MONGO_POOL", "20")),
+            "mongo_timeout_ms": int(os.getenv("MONGO_TIMEOUT_MS", "5000")),
+            "mongo_max_idle_ms": int(os.getenv("MONGO_MAX_IDLE_MS", "300000")),
+        }
+
+    @staticmethod
+    def credenciales_elastic() -> Tuple[Optional[str], Optional[str]]:
+        """URL y API key de Elastic (.env de la app o env.txt de los scripts)."""
+        url = os.getenv("ELASTIC_ENDPOINT") or os.getenv("ELASTIC_CLOUD_URL")
+        return url, os.getenv("ELASTIC_API_KEY")
+
+    # ------------------------------------------------------------------ #
+    #   CLIENTES
+    # ------------------------------------------------------------------ #
+
+    def _olvidar_clientes(self) -> None:
+        """Descarta (sin cerrar) los clientes heredados del proceso padre."""
+        self._pid = os.getpid()
+        self._elastic = {}
+        self._mongo = {}
+        self._lock = threading.Lock()
+
+    def _verificar_proceso(self) -> None:
+        if self._pid != os.getpid():
+            self._olvidar_clientes()
+
+    def elastic(self, url: Optional[str] = None, api_key: Optional[str] = None) -> Elasticsearch:
+        """
+        Cliente de Elasticsearch de este proceso (uno por url + api_key).
+
+        Args:
+            url, api_key: si no se pasan se toman del entorno
+        """
+        self._verificar_proceso()
+        if not url or not api_key:
+            url_env, key_env = self.credenciales_elastic()
+            url, api_key = url or url_env, api_key or key_env
+        if not url:
+            raise ValueError("ELASTIC_CLOUD_URL no está configurada")
+        if not api_key:
+            raise ValueError("ELASTIC_API_KEY no está configurada")
+
+        clave = (url, api_key)
+        cliente = self._elastic.get(clave)
+        if cliente is not None:
+            return cliente
+
+        with self._lock:
+            if clave not in self._elastic:
+                cfg = self.config()
+                self._elastic[clave] = Elasticsearch(
+                    hosts=[url],
+                    api_key=api_key,
+                    connections_per_node=cfg["elastic_pool"],
+                    request_timeout=cfg["elastic_timeout"],
+                    # Reintentos para bulk y administración; las búsquedas
+                    # los desactivan (ElasticSearch.client_busqueda)
+                    max_retries=cfg["elastic_reintentos"],
+                    retry_on_timeout=True,
+                    http_compress=cfg["elastic_comprimir"],
+                )
+            return self._elastic[clave]
+
+    def mongo(self, uri: str):
+        """Cliente de MongoDB de este proceso (uno por URI)."""
+        self._verificar_proceso()
+        if not uri:
+            raise ValueError("MONGO_URI no está configurada")
+
+        cliente = self._mongo.get(uri)
+        if cliente is not None:
+            return cliente
+
+        with self._lock:
+            if uri not in self._mongo:
+                from pymongo import MongoClient  # import lazy
+
+                cfg = self.config()
+                self._mongo[uri] = MongoClient(
+                    uri,
+                    maxPoolSize=cfg["mongo_pool"],
+                    serverSelectionTimeoutMS=cfg["mongo_timeout_ms"],
+                    connectTimeoutMS=cfg["mongo_timeout_ms"],
+                    maxIdleTimeMS=cfg["mongo_max_idle_ms"],
+                    retryWrites=True,
+                    retryReads=True,
+                )
+            return self._mongo[uri]
+
+    # ------------------------------------------------------------------ #
+    #   WARM-UP
+    # ------------------------------------------------------------------ #
+
+    def calentar(self, elastic: bool = True, mongo_uri: Optional[str] = None) -> Dict:
+        """
+        Abre las conexiones por adelantado (TLS + pool) para que la primera
+        petición no pague ese costo. Pensado para el hook post_fork de
+        gunicorn (ver gunicorn.conf.py).
+
+        Returns:
+            {"elastic": bool, "mongo": bool} según qué conexiones respondieron
+        """
+        estado = {"elastic": False, "mongo": False}
+        if elastic:
+            try:
+                estado["elastic"] = bool(self.elastic().ping())
+            except Exception as e:
+                print(f"Warm-up de Elastic falló: {e}")
+        if mongo_uri:
+            try:
+                self.mongo(mongo_uri).admin.command("ping")
+                estado["mongo"] = True
+            except Exception as e:
+                print(f"Warm-up de MongoDB falló: {e}")
+        return estado
+
+    def cerrar_mongo(self, uri: str) -> None:
+        """Cierra y descarta el MongoClient de una URI (el próximo uso crea otro)."""
+        with self._lock:
+            cliente = self._mongo.pop(uri, None)
+        if cliente is not None:
+            cliente.close()
+
+    def cerrar(self) -> None:
+        """Cierra los clientes de este proceso."""
+        with self._lock:
+            for cliente in self._elastic.values():
+                cliente.close()
+            for cliente in self._mongo.values():
+                cliente.close()
+            self._elastic = {}
+            self._mongo = {}
+
+
+# Gestor compartido por la app, los helpers y los scripts
+conexiones = GestorConexiones()
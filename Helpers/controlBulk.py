@@ -0,0 +1,88 @@
+import random
+import threading
+from typing import Dict
+
+
+class ControlBulk:
+    """
+    Control adaptativo del tamaño de lote y la concurrencia del bulk.
+
+    Después de cada petición bulk se registra su latencia y cuántos
+    documentos rechazó el clúster (429 / es_rejected_execution_exception):
+
+      - con rechazos: la mitad de hilos y el lote un 25% más chico (cede
+        rápido; el rechazo suele venir de la cola de write llena)
+      - latencia > objetivo: lote un 25% más chico
+      - latencia < objetivo / 2 y sin rechazos: lote un 10% más grande y,
+        tras varias rondas de respuestas buenas, un hilo más (sube lento)
+
+    Los límites son [lote_min, lote_max] y [1, hilos_max].
+    """
+
+    def __init__(
+        self,
+        docs_por_lote: int = 500,
+        hilos: int = 4,
+        latencia_objetivo: float = 1.0,
+        adaptativo: bool = True,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        """
+        Args:
+            docs_por_lote: tamaño de lote inicial (el máximo es 4 veces éste)
+            hilos: concurrencia inicial y máxima
+            latencia_objetivo: segundos por petición bulk que se buscan
+            adaptativo: si es False el lote y los hilos quedan fijos
+            backoff_base, backoff_max: espera (s) para reintentar rechazados
+        """
+        self.adaptativo = adaptativo
+        self.latencia_objetivo = latencia_objetivo
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.docs_por_lote = max(1, docs_por_lote)
+        self.lote_min = max(1, min(self.docs_por_lote, 10, self.docs_por_lote // 20 or 1))
+        self.lote_max = self.docs_por_lote * 4
+        self.hilos_max = max(1, hilos)
+        self.hilos = self.hilos_max
+
+        self.peticiones = 0
+        self.rechazados = 0
+        self._buenas = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, latencia: float, enviados: int, rechazados: int) -> None:
+        """Ajusta lote e hilos según la respuesta de una petición bulk."""
+        with self._lock:
+            self.peticiones += 1
+            self.rechazados += rechazados
+            if not self.adaptativo:
+                return
+
+            if rechazados:
+                self.docs_por_lote = max(self.lote_min, int(self.docs_por_lote * 0.75))
+                self.hilos = max(1, self.hilos // 2)
+                self._buenas = 0
+            elif latencia > self.latencia_objetivo:
+                self.docs_por_lote = max(self.lote_min, int(self.docs_por_lote * 0.75))
+                self._buenas = 0
+            elif latencia < self.latencia_objetivo / 2:
+                self.docs_por_lote = min(self.lote_max, self.docs_por_lote + max(1, self.docs_por_lote // 10))
+                self._buenas += 1
+                if self._buenas >= 4 * self.hilos:
+                    self.hilos = min(self.hilos_max, self.hilos + 1)
+                    self._buenas = 0
+
+    def espera(self, intento: int) -> float:
+        """Backoff exponencial con jitter completo para el reintento n (desde 0)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** intento)))
+
+    def estado(self) -> Dict:
+        with self._lock:
+            return {
+                "docs_por_lote": self.docs_por_lote,
+                "hilos": self.hilos,
+                "peticiones": self.peticiones,
+                "rechazados": self.rechazados,
+            }
@@ -1,36 +1,73 @@
-from typing import Dict, List, Optional
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionError, AuthenticationException
 
+from Helpers import codecJson
+from Helpers.conexiones import conexiones
+from Helpers.controlBulk import ControlBulk
+from Helpers.metricas import medir
+
 
 class ElasticSearch:
+    # Generación de cada índice: se incrementa con cada carga bulk para
+    # invalidar las cachés de búsqueda que dependen de él.
+    _generaciones: Dict[str, int] = {}
+    _lock_generaciones = threading.Lock()
+
+    # Funciones (index, documentos) que se llaman después de cada carga
+    # bulk con los documentos indexados sin error (p. ej. autocompletado).
+    _suscriptores_indexacion: List[Callable[[str, List[Dict]], None]] = []
+
     def __init__(
         self,
-        cloud_url: str,
-        api_key: str,
+        cloud_url: Optional[str] = None,
+        api_key: Optional[str] = None,
         default_index: str = "index-boletin-semanal",
+        client: Optional[Elasticsearch] = None,
     ):
         """
         Inicializa conexión a ElasticSearch Cloud.
 
+        La conexión es perezosa: el cliente lo entrega el gestor de
+        conexiones (uno por proceso) la primera vez que se usa.
+
         Args:
-            cloud_url: URL del deployment de Elastic Cloud (https://....:443)
-            api_key:  API Key del cluster
+            cloud_url: URL del deployment de Elastic Cloud (https://....:443);
+                       si es None se toma del entorno
+            api_key:  API Key del cluster (si es None se toma del entorno)
             default_index: índice por defecto (por ejemplo, index-boletin-semanal)
+            client: cliente ya creado para reutilizar en lugar del del gestor
         """
-        if not cloud_url:
-            raise ValueError("ELASTIC_CLOUD_URL no está configurada")
-        if not api_key:
-            raise ValueError("ELASTIC_API_KEY no está configurada")
-
+        self.cloud_url = cloud_url
+        self.api_key = api_key
         self.default_index = default_index
+        self._client = client
+
+    @property
+    def client(self) -> Elasticsearch:
+        """Cliente de Elastic de este proceso (ValueError si falta configuración)."""
+        if self._client is not None:
+            return self._client
+        return conexiones.elastic(self.cloud_url, self.api_key)
 
-        # Cliente de Elastic
-        self.client = Elasticsearch(
-            hosts=[cloud_url],
-            api_key=api_key,
-        )
+    @client.setter
+    def client(self, client: Optional[Elasticsearch]) -> None:
+        self._client = client
+
+    @property
+    def client_busqueda(self) -> Elasticsearch:
+        """
+        Cliente para las búsquedas interactivas: sin reintentos, así una
+        caída de Elastic se nota en un solo timeout y el buscador pasa
+        enseguida al motor local. Bulk y administración usan client (con
+        los reintentos de ELASTIC_REINTENTOS).
+        """
+        return self.client.options(max_retries=0, retry_on_timeout=False)
 
     # ------------------------------------------------------------------ #
     #   UTILIDADES BÁSICAS
@@ -62,10 +99,36 @@ class ElasticSearch:
             print("Error al listar índices:", e)
             return []
 
+    @classmethod
+    def generacion_indice(cls, index: str) -> int:
+        """Generación actual del índice (cambia cada vez que se indexa en él)."""
+        return cls._generaciones.get(index, 0)
+
+    @classmethod
+    def invalidar_indice(cls, index: str) -> int:
+        """Marca el índice como modificado y devuelve la nueva generación."""
+        with cls._lock_generaciones:
+            cls._generaciones[index] = cls._generaciones.get(index, 0) + 1
+            return cls._generaciones[index]
+
+    @classmethod
+    def al_indexar(cls, callback: Callable[[str, List[Dict]], None]) -> None:
+        """Registra una función que recibe (index, documentos) tras cada carga bulk."""
+        cls._suscriptores_indexacion.append(callback)
+
+    @classmethod
+    def _notificar_indexacion(cls, index: str, documentos: List[Dict]) -> None:
+        for callback in cls._suscriptores_indexacion:
+            try:
+                callback(index, documentos)
+            except Exception as e:
+                print(f"Error en suscriptor de indexación {callback}: {e}")
+
     # ------------------------------------------------------------------ #
     #   OPERACIONES DE BÚSQUEDA
     # ------------------------------------------------------------------ #
 
+    @medir("buscar")
     def buscar(
         self,
         index: Optional[str] = None,
@@ -91,7 +154,7 @@ class ElasticSearch:
             body["aggs"] = aggs
 
         try:
-            resp = self.client.search(index=index, body=body, size=size)
+            resp = self.client_busqueda.search(index=index, body=body, size=size)
             return {
                 "success": True,
                 "total": resp["hits"]["total"]["value"],
@@ -102,13 +165,14 @@ class ElasticSearch:
             print(f"Error al ejecutar búsqueda: {e}")
             return {"success": False, "error": str(e)}
 
+    @medir("ejecutar_query")
     def ejecutar_query(self, query_json: Dict) -> Dict:
         """Ejecuta una query raw enviada como dict."""
         try:
             index = query_json.get("index", self.default_index)
             body = {k: v for k, v in query_json.items() if k != "index"}
 
-            resp = self.client.search(index=index, body=body)
+            resp = self.client_busqueda.search(index=index, body=body)
 
             return {
                 "success": True,
@@ -121,71 +185,522 @@ class ElasticSearch:
             print(f"Error al ejecutar_query: {e}")
             return {"success": False, "error": str(e)}
 
+    def buscar_multiple(
+        self,
+        consultas: List[Dict],
+        index: Optional[str] = None,
+        propagar_errores: bool = False,
+    ) -> List[Dict]:
+        """
+        Ejecuta varias búsquedas en una sola llamada _msearch.
+
+        Args:
+            consultas: lista de bodies de búsqueda (query, aggs, size, sort,
+                       _source...); cada uno puede traer su propio "index"
+            index: índice por defecto para las consultas que no lo traen
+            propagar_errores: si falla la llamada completa (conexión,
+                              timeout, 5xx) se relanza la excepción en lugar
+                              de devolver success=False (para usar un respaldo)
+
+        Returns:
+            una respuesta por consulta, en el mismo orden, con el mismo
+            formato que buscar(); si falla una sola, solo esa trae
+            success=False
+        """
+        if not consultas:
+            return []
+        if not index:
+            index = self.default_index
+
+        searches = []
+        for consulta in consultas:
+            body = {k: v for k, v in consulta.items() if k != "index"}
+            searches.append({"index": consulta.get("index", index)})
+            searches.append(body)
+
+        try:
+            resp = self.client_busqueda.msearch(searches=searches)
+        except Exception as e:
+            if propagar_errores:
+                raise
+            print(f"Error al ejecutar msearch: {e}")
+            return [{"success": False, "error": str(e)} for _ in consultas]
+
+        return self._resultados_msearch(resp)
+
+    @medir("buscar_plantilla")
+    def buscar_plantilla(self, plantilla: str, params: Dict, index: Optional[str] = None) -> Dict:
+        """
+        Ejecuta una plantilla de búsqueda guardada (search_template) y
+        devuelve la respuesta cruda de Elastic.
+
+        Args:
+            plantilla: id de la plantilla (ver Helpers/plantillas.py)
+            params: parámetros de la plantilla
+            index: índice; si los params traen pit_id no se envía (el PIT
+                   ya fija los índices)
+        """
+        if params.get("pit_id"):
+            return self.client_busqueda.search_template(id=plantilla, params=params)
+        return self.client_busqueda.search_template(index=index or self.default_index, id=plantilla, params=params)
+
+    def buscar_multiple_plantillas(
+        self,
+        consultas: List[Tuple],
+        index: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Como buscar_multiple pero con plantillas guardadas (un solo
+        _msearch/template): cada consulta es (id de plantilla, params) o
+        (id de plantilla, params, índice).
+
+        Las excepciones de Elastic se propagan (para que el llamador pueda
+        volver a registrar las plantillas); los errores de cada consulta
+        vienen con success=False como en buscar_multiple.
+        """
+        if not consultas:
+            return []
+        if not index:
+            index = self.default_index
+
+        search_templates = []
+        for plantilla, params, *indice in consultas:
+            search_templates.append({"index": indice[0] if indice else index})
+            search_templates.append({"id": plantilla, "params": params})
+
+        resp = self.client_busqueda.msearch_template(search_templates=search_templates)
+        return self._resultados_msearch(resp)
+
+    @staticmethod
+    def _resultados_msearch(resp: Dict) -> List[Dict]:
+        """Respuestas de _msearch con el mismo formato que buscar()."""
+        resultados = []
+        for r in resp["responses"]:
+            if "error" in r:
+                error = r["error"]
+                resultados.append({
+                    "success": False,
+                    "error": error.get("reason", str(error)) if isinstance(error, dict) else str(error),
+                    "tipo": error.get("type") if isinstance(error, dict) else None,
+                })
+                continue
+            resultados.append({
+                "success": True,
+                "total": r["hits"]["total"]["value"],
+                "hits": r["hits"]["hits"],
+                "aggs": r.get("aggregations", {}),
+            })
+        return resultados
+
     # ------------------------------------------------------------------ #
-    #   CARGA MASIVA (BULK)
+    #   EXPORTACIÓN (PIT + search_after)
     # ------------------------------------------------------------------ #
 
-    def indexar_bulk(
+    def _paginas_slice(
+        self,
+        pit: Dict,
+        query: Dict,
+        campos: Optional[List[str]],
+        lote: int,
+        slice_id: Optional[int],
+        slices: int,
+    ) -> Iterator[List[Dict]]:
+        """Páginas de hits de un slice del PIT (o de todo el PIT si slices=1)."""
+        search_after = None
+        while True:
+            cuerpo = {
+                "pit": {"id": pit["id"], "keep_alive": pit["keep_alive"]},
+                "size": lote,
+                "query": query,
+                "sort": [{"_shard_doc": "asc"}],
+                "track_total_hits": False,
+            }
+            if campos is not None:
+                cuerpo["_source"] = campos
+            if slices > 1:
+                cuerpo["slice"] = {"id": slice_id, "max": slices}
+            if search_after is not None:
+                cuerpo["search_after"] = search_after
+
+            resp = self.client.search(**cuerpo)
+            # Elastic puede renovar el id del PIT en cada respuesta
+            pit["id"] = resp.get("pit_id", pit["id"])
+            hits = resp["hits"]["hits"]
+            if not hits:
+                return
+            yield hits
+            if len(hits) < lote:
+                return
+            search_after = hits[-1]["sort"]
+
+    def exportar(
         self,
-        documentos: List[Dict],
         index: Optional[str] = None,
-    ) -> Dict:
+        query: Optional[Dict] = None,
+        campos: Optional[List[str]] = None,
+        lote: int = 1000,
+        slices: int = 1,
+        keep_alive: str = "5m",
+    ) -> Iterator[Dict]:
         """
-        Carga múltiples documentos a un índice usando la API bulk.
+        Recorre el índice completo (o lo que devuelva `query`) y entrega los
+        documentos de a uno, como {"_id": ..., **_source}.
 
-        Si el documento trae la clave '_id', se usa como ID en Elastic,
-        así evitas duplicados al reindexar.
+        Usa un point-in-time + search_after ordenado por _shard_doc: la
+        vista es consistente aunque se indexe mientras tanto, y no hay
+        límite de 10.000 como con from/size. Con slices > 1 cada slice del
+        PIT se lee en su propio hilo; en memoria hay como mucho 2 páginas
+        por slice (el orden entre slices no está definido).
 
         Args:
-            documentos: lista de diccionarios a indexar.
-            index: índice destino; si es None se usa el índice por defecto.
+            index: índice o alias (por defecto el índice por defecto)
+            query: query de Elastic (por defecto match_all)
+            campos: filtrado de _source (None: documento completo)
+            lote: documentos por página
+            slices: lecturas paralelas del PIT
+            keep_alive: vida del PIT entre páginas
         """
+        if not index:
+            index = self.default_index
+        query = query or {"match_all": {}}
+
+        pit_id = self.client.open_point_in_time(index=index, keep_alive=keep_alive)["id"]
+        pits = [{"id": pit_id, "keep_alive": keep_alive} for _ in range(max(1, slices))]
         try:
-            if not index:
-                index = self.default_index
+            if slices <= 1:
+                for hits in self._paginas_slice(pits[0], query, campos, lote, None, 1):
+                    for hit in hits:
+                        yield {"_id": hit["_id"], **(hit.get("_source") or {})}
+                return
+
+            paginas: "queue.Queue" = queue.Queue(maxsize=2 * slices)
+            detener = threading.Event()
+            FIN = object()
+
+            def poner(item) -> bool:
+                """put con espera acotada: se rinde si el consumidor ya cortó."""
+                while not detener.is_set():
+                    try:
+                        paginas.put(item, timeout=0.5)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+
+            def leer_slice(i: int) -> None:
+                try:
+                    for hits in self._paginas_slice(pits[i], query, campos, lote, i, slices):
+                        if not poner(hits):
+                            return
+                    poner(FIN)
+                except Exception as e:
+                    poner(e)
+
+            hilos = [threading.Thread(target=leer_slice, args=(i,), daemon=True,
+                                      name=f"exportar-{i}") for i in range(slices)]
+            for h in hilos:
+                h.start()
+
+            terminados = 0
+            try:
+                while terminados < slices:
+                    item = paginas.get()
+                    if item is FIN:
+                        terminados += 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        for hit in item:
+                            yield {"_id": hit["_id"], **(hit.get("_source") or {})}
+            finally:
+                # Si el consumidor corta (o hay error) los hilos se detienen
+                detener.set()
+        finally:
+            for pit in {p["id"] for p in pits}:
+                try:
+                    self.client.close_point_in_time(id=pit)
+                except Exception:
+                    pass
+
+    # ------------------------------------------------------------------ #
+    #   CARGA MASIVA (BULK)
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _lotes_bulk(
+        documentos: Iterable[Dict],
+        index: str,
+        control: ControlBulk,
+        bytes_por_lote: int,
+    ) -> Iterator[Tuple[List[Dict], List[bytes]]]:
+        """
+        Corta un iterable de documentos en lotes (documentos, líneas NDJSON)
+        de a lo sumo control.docs_por_lote documentos (se lee en cada lote,
+        cambia si el control es adaptativo) y ~bytes_por_lote bytes.
 
-            acciones = []
+        Un documento que solo ya supera bytes_por_lote va en un lote propio.
+        Un documento {"_id": ..., "_op_type": "delete"} genera un borrado.
+        """
+        docs: List[Dict] = []
+        lineas: List[bytes] = []
+        tamano = 0
+        try:
             for doc in documentos:
                 if not isinstance(doc, dict):
                     continue
+                if doc.get("_op_type") == "delete" and not doc.get("_id"):
+                    continue
 
-                # Si trae _id propio, lo usamos.
-                doc_id = doc.get("_id")
-                # No queremos mandar el _id dentro del documento fuente
-                # (suele ser mejor dejarlo solo en el meta).
-                doc_source = {k: v for k, v in doc.items() if k != "_id"}
+                # Si trae _id propio, lo usamos (evita duplicados al reindexar);
+                # no lo mandamos dentro del documento fuente.
+                # "_index" en el documento lo manda a otro índice (p. ej. el de su año)
+                op = "delete" if doc.get("_op_type") == "delete" else "index"
+                meta = {op: {"_index": doc.get("_index") or index}}
+                if doc.get("_id"):
+                    meta[op]["_id"] = doc["_id"]
 
-                meta = {"index": {"_index": index}}
-                if doc_id:
-                    meta["index"]["_id"] = doc_id
+                linea = codecJson.linea_ndjson(meta)
+                if op == "index":
+                    doc_source = {k: v for k, v in doc.items() if k not in ("_id", "_op_type", "_index")}
+                    linea += codecJson.linea_ndjson(doc_source)
+                largo = len(linea)
 
-                acciones.append(meta)
-                acciones.append(doc_source)
+                if docs and (len(docs) >= control.docs_por_lote or tamano + largo > bytes_por_lote):
+                    yield docs, lineas
+                    docs, lineas, tamano = [], [], 0
 
-            if not acciones:
-                return {
-                    "success": False,
-                    "error": "No hay acciones válidas para indexar",
-                    "indexados": 0,
-                    "fallidos": 0,
-                }
+                docs.append(doc)
+                lineas.append(linea)
+                tamano += largo
+        except Exception:
+            # Error leyendo la entrada: se envía lo ya leído antes de propagar
+            if docs:
+                yield docs, lineas
+            raise
+
+        if docs:
+            yield docs, lineas
+
+    @staticmethod
+    def _es_rechazo(status: Optional[int], error) -> bool:
+        """¿El clúster rechazó el documento por carga (reintentable)?"""
+        if status == 429:
+            return True
+        tipo = error.get("type") if isinstance(error, dict) else str(error or "")
+        return "es_rejected_execution_exception" in (tipo or "")
+
+    def _enviar_lote(self, docs: List[Dict], lineas: List[bytes], control: ControlBulk,
+                     reintentos: int) -> List[Dict]:
+        """
+        Envía un lote y devuelve un resultado por documento, en orden:
+        {"ok": bool, "_id", "status", "error", "intentos"}.
+
+        Solo los documentos rechazados por carga (429) se reenvían, con
+        backoff exponencial y jitter, hasta `reintentos` veces. Si falla la
+        petición entera con otro error, todo el lote queda como fallido.
+        """
+        resultados: List[Optional[Dict]] = [None] * len(docs)
+        pendientes = list(range(len(docs)))
+
+        for intento in range(reintentos + 1):
+            inicio = time.perf_counter()
+            rechazados: List[Tuple[int, Optional[int], str]] = []
+            try:
+                resp = self.client.bulk(operations=b"".join(lineas[i] for i in pendientes))
+                items = resp.get("items", [])
+            except Exception as e:
+                status = getattr(getattr(e, "meta", None), "status", None)
+                if not self._es_rechazo(status, str(e)):
+                    for i in pendientes:
+                        resultados[i] = {"ok": False, "_id": docs[i].get("_id"), "status": status,
+                                         "error": str(e), "intentos": intento + 1}
+                    return resultados
+                # Rechazo de la petición entera: se reintenta todo el lote
+                rechazados = [(i, status, str(e)) for i in pendientes]
+                items = None
+
+            for pos, i in enumerate(pendientes if items is not None else []):
+                info = next(iter(items[pos].values()), {}) if pos < len(items) else {}
+                error = info.get("error") if info else "sin respuesta para el documento"
+                status = info.get("status")
+                if status == 404 and info.get("result") == "not_found":
+                    error = None  # borrar algo que ya no estaba no es un error
+                if error and self._es_rechazo(status, error):
+                    rechazados.append((i, status, f"{error.get('type')}: {error.get('reason')}"
+                                       if isinstance(error, dict) else str(error)))
+                    continue
+                if isinstance(error, dict):
+                    error = f"{error.get('type')}: {error.get('reason')}"
+                resultados[i] = {"ok": not error, "_id": info.get("_id", docs[i].get("_id")),
+                                 "status": status, "error": error or None, "intentos": intento + 1}
+
+            control.registrar(time.perf_counter() - inicio, len(pendientes), len(rechazados))
+            if not rechazados:
+                break
+            if intento == reintentos:
+                for i, status, error in rechazados:
+                    resultados[i] = {"ok": False, "_id": docs[i].get("_id"), "status": status,
+                                     "error": f"rechazado tras {reintentos} reintentos: {error}",
+                                     "intentos": intento + 1}
+                break
 
-            # En algunas versiones es body=..., en otras operations=...
-            # Aquí mantenemos body por compatibilidad.
-            resp = self.client.bulk(body=acciones, refresh=True)
+            time.sleep(control.espera(intento))
+            pendientes = [i for i, _, _ in rechazados]
 
-            errores = 0
-            for item in resp.get("items", []):
-                info_index = item.get("index", {})
-                if info_index.get("error"):
-                    errores += 1
+        return resultados
 
+    @staticmethod
+    def leer_fallidos(ruta: str) -> Iterator[Dict]:
+        """
+        Lee un archivo de fallidos (dead-letter) de indexar_bulk y entrega
+        los documentos con su _id, listos para volver a indexar_bulk.
+        """
+        for registro in codecJson.leer_ndjson(ruta):
+            doc = dict(registro["documento"])
+            if registro.get("_id"):
+                doc["_id"] = registro["_id"]
+            yield doc
+
+    @medir("indexar_bulk")
+    def indexar_bulk(
+        self,
+        documentos: Iterable[Dict],
+        index: Optional[str] = None,
+        docs_por_lote: int = 500,
+        bytes_por_lote: int = 5 * 1024 * 1024,
+        hilos: int = 4,
+        refrescar: bool = True,
+        max_errores_reportados: int = 50,
+        adaptativo: bool = True,
+        latencia_objetivo: float = 1.0,
+        reintentos: int = 5,
+        archivo_fallidos: Optional[str] = None,
+    ) -> Dict:
+        """
+        Carga documentos a un índice usando la API bulk, en streaming.
+
+        Acepta cualquier iterable (lista o generador): se va consumiendo por
+        lotes que se envían en paralelo con un pool de hilos. En memoria hay
+        como mucho 2 * hilos lotes a la vez, no el corpus entero. El índice
+        se refresca una sola vez al final.
+
+        Con adaptativo=True el tamaño de lote y los hilos en uso se ajustan
+        con la latencia y los rechazos del clúster (ver ControlBulk). Los
+        documentos rechazados por carga (429) se reintentan con backoff; los
+        que fallan definitivamente se agregan a archivo_fallidos (NDJSON,
+        se reprocesan con indexar_bulk(ElasticSearch.leer_fallidos(ruta))).
+
+        Si el documento trae la clave '_id', se usa como ID en Elastic,
+        así evitas duplicados al reindexar. {"_id": ..., "_op_type": "delete"}
+        borra ese documento (un _id inexistente no cuenta como fallo). Con
+        '_index' el documento va a ese índice en lugar de `index`.
+
+        Args:
+            documentos: iterable de diccionarios a indexar.
+            index: índice destino; si es None se usa el índice por defecto.
+            docs_por_lote: documentos por petición bulk (inicial si es adaptativo).
+            bytes_por_lote: máximo (aprox.) de bytes por petición bulk.
+            hilos: peticiones bulk concurrentes (máximo si es adaptativo).
+            refrescar: refrescar el índice al terminar.
+            max_errores_reportados: cuántos errores individuales devolver.
+            adaptativo: ajustar lote y concurrencia durante la carga.
+            latencia_objetivo: segundos por petición bulk que se buscan.
+            reintentos: reintentos por documento rechazado (429).
+            archivo_fallidos: ruta NDJSON para los documentos fallidos.
+
+        Returns:
+            {"success", "indexados", "fallidos", "reintentados", "lotes",
+             "errores": [{"_id", "status", "error"}, ...], "docs_por_segundo",
+             "control": {"docs_por_lote", "hilos", ...}, "archivo_fallidos"}
+        """
+        if not index:
+            index = self.default_index
+
+        control = ControlBulk(docs_por_lote, hilos, latencia_objetivo, adaptativo)
+        inicio = time.perf_counter()
+        indexados = fallidos = reintentados = lotes = 0
+        errores: List[Dict] = []
+        dead_letter = None
+
+        def registrar(docs: List[Dict], resultados: List[Dict]) -> None:
+            nonlocal indexados, fallidos, reintentados, dead_letter
+            ok = []
+            for doc, r in zip(docs, resultados):
+                if r["intentos"] > 1:
+                    reintentados += 1
+                if r["ok"]:
+                    ok.append(doc)
+                    continue
+                fallidos += 1
+                if len(errores) < max_errores_reportados:
+                    errores.append({k: r[k] for k in ("_id", "status", "error")})
+                if archivo_fallidos:
+                    if dead_letter is None:
+                        dead_letter = open(archivo_fallidos, "ab")
+                    dead_letter.write(codecJson.linea_ndjson({
+                        "_index": index,
+                        "_id": doc.get("_id"),
+                        "status": r["status"],
+                        "error": r["error"],
+                        "documento": {k: v for k, v in doc.items() if k != "_id"},
+                    }))
+            indexados += len(ok)
+            if ok:
+                ElasticSearch._notificar_indexacion(index, ok)
+
+        with ThreadPoolExecutor(max_workers=control.hilos_max, thread_name_prefix="bulk") as pool:
+            pendientes = {}
+            try:
+                for docs, lineas in self._lotes_bulk(documentos, index, control, bytes_por_lote):
+                    # Ventana acotada de lotes en vuelo (memoria constante);
+                    # con el control adaptativo se achica si hay rechazos.
+                    while pendientes and len(pendientes) >= control.hilos:
+                        listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                        for futuro in listos:
+                            registrar(pendientes.pop(futuro), futuro.result())
+                    futuro = pool.submit(self._enviar_lote, docs, lineas, control, reintentos)
+                    pendientes[futuro] = docs
+                    lotes += 1
+            except Exception as e:
+                # Error leyendo la entrada: se corta ahí, lo ya enviado cuenta
+                print(f"Error en indexar_bulk: {e}")
+                errores.append({"_id": None, "status": None, "error": str(e)})
+
+            for futuro in as_completed(list(pendientes)):
+                registrar(pendientes.pop(futuro), futuro.result())
+
+        if dead_letter is not None:
+            dead_letter.close()
+
+        if lotes == 0 and not errores:
             return {
-                "success": errores == 0,
-                "indexados": len(documentos),
-                "fallidos": errores,
+                "success": False,
+                "error": "No hay acciones válidas para indexar",
+                "indexados": 0,
+                "fallidos": 0,
             }
 
-        except Exception as e:
-            print(f"Error en indexar_bulk: {e}")
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+        if indexados and refrescar:
+            try:
+                self.client.indices.refresh(index=index)
+            except Exception as e:
+                print(f"Error al refrescar {index}: {e}")
+        if indexados:
+            ElasticSearch.invalidar_indice(index)
+
+        segundos = time.perf_counter() - inicio
+        resultado = {
+            "success": fallidos == 0 and len(errores) == 0,
+            "indexados": indexados,
+            "fallidos": fallidos,
+            "reintentados": reintentados,
+            "lotes": lotes,
+            "errores": errores,
+            "docs_por_segundo": round(indexados / segundos, 1) if segundos else None,
+            "control": control.estado(),
+        }
+        if dead_letter is not None:
+            resultado["archivo_fallidos"] = archivo_fallidos
+        if errores:
+            resultado["error"] = errores[0]["error"]
+        return resultado
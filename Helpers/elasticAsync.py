@@ -0,0 +1,236 @@
+import asyncio
+import os
+import threading
+from typing import Dict, List, Optional
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import ApiError, NotFoundError
+
+from Helpers.conexiones import GestorConexiones
+from Helpers.busqueda import Busqueda, ORDEN_ESTABLE, CAMPOS_RESPUESTA, RESALTADO
+from Helpers.plantillas import PlantillasBusqueda, PLANTILLA_BUSQUEDA, PLANTILLA_FACETAS
+
+
+class ElasticSearchAsync:
+    """
+    Servicio de búsqueda asíncrono sobre AsyncElasticsearch.
+
+    Todo el I/O hacia Elastic corre en un único event loop (en un hilo
+    propio) con un pool de conexiones compartido. Las vistas de Flask
+    -sincrónicas- le entregan corrutinas con ejecutar() y esperan el
+    resultado, así con workers de hilos (gunicorn -k gthread) muchas
+    peticiones comparten el mismo loop y las mismas conexiones.
+
+    El loop y el cliente se crean en el primer uso, es decir, dentro del
+    proceso worker (después del fork de gunicorn --preload).
+    """
+
+    def __init__(
+        self,
+        cloud_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        default_index: str = "index-boletin-semanal",
+        conexiones_por_nodo: int = 32,
+        timeout: Optional[float] = None,
+        plantillas: Optional[PlantillasBusqueda] = None,
+    ):
+        """
+        Args:
+            cloud_url: URL del deployment de Elastic (si es None, del entorno)
+            api_key: API Key del cluster (si es None, del entorno)
+            default_index: índice por defecto
+            conexiones_por_nodo: tamaño del pool de conexiones compartido
+            timeout: timeout por petición en segundos (None: ELASTIC_TIMEOUT)
+            plantillas: plantillas guardadas a usar si están registradas
+                        (el registro lo hace el lado sincrónico)
+        """
+        self.cloud_url = cloud_url
+        self.api_key = api_key
+        self.default_index = default_index
+        self.conexiones_por_nodo = conexiones_por_nodo
+        self.timeout = timeout or GestorConexiones.config()["elastic_timeout"]
+        self.plantillas = plantillas
+
+        self.client: Optional[AsyncElasticsearch] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    #   EVENT LOOP COMPARTIDO
+    # ------------------------------------------------------------------ #
+
+    def _asegurar_loop(self) -> asyncio.AbstractEventLoop:
+        """Arranca (una sola vez por proceso) el loop de fondo y el cliente async."""
+        if self._pid != os.getpid():
+            # Proceso hijo (fork): el hilo del loop no existe aquí
+            self._pid = os.getpid()
+            self._loop = None
+            self.client = None
+            self._lock = threading.Lock()
+
+        if self._loop is not None:
+            return self._loop
+
+        with self._lock:
+            if self._loop is None:
+                url_env, key_env = GestorConexiones.credenciales_elastic()
+                self.cloud_url = self.cloud_url or url_env
+                self.api_key = self.api_key or key_env
+                if not self.cloud_url:
+                    raise ValueError("ELASTIC_CLOUD_URL no está configurada")
+                if not self.api_key:
+                    raise ValueError("ELASTIC_API_KEY no está configurada")
+
+                loop = asyncio.new_event_loop()
+                hilo = threading.Thread(
+                    target=loop.run_forever, name="elastic-async", daemon=True
+                )
+                hilo.start()
+
+                async def crear_cliente():
+                    return AsyncElasticsearch(
+                        hosts=[self.cloud_url],
+                        api_key=self.api_key,
+                        connections_per_node=self.conexiones_por_nodo,
+                        request_timeout=self.timeout,
+                    )
+
+                self.client = asyncio.run_coroutine_threadsafe(crear_cliente(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    def ejecutar(self, corrutina, timeout: Optional[float] = None):
+        """Ejecuta una corrutina en el loop compartido y espera su resultado."""
+        loop = self._asegurar_loop()
+        futuro = asyncio.run_coroutine_threadsafe(corrutina, loop)
+        return futuro.result(timeout or self.timeout * 3)
+
+    def close(self):
+        """Cierra el cliente async y detiene el loop."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self.client = None
+
+    # ------------------------------------------------------------------ #
+    #   BÚSQUEDA CON FAN-OUT
+    # ------------------------------------------------------------------ #
+
+    async def _con_plantilla(self, plantilla: str, params: Dict, sin_plantilla, index: str) -> Dict:
+        """
+        search_template si las plantillas están registradas; si no (o si
+        Elastic ya no la tiene) la consulta armada por sin_plantilla().
+        """
+        if self.plantillas is None or not self.plantillas.activas:
+            return await sin_plantilla()
+        try:
+            if params.get("pit_id"):
+                return await self.client.search_template(id=plantilla, params=params)
+            return await self.client.search_template(index=index, id=plantilla, params=params)
+        except ApiError as e:
+            if not PlantillasBusqueda.falta_plantilla(e):
+                raise
+            # Se vuelven a registrar en la próxima petición (lado sincrónico)
+            self.plantillas.olvidar()
+            return await sin_plantilla()
+
+    async def _pagina(self, filtros: Dict, page_size: int, keep_alive: str, index: str) -> Dict:
+        """Primera página sobre un point-in-time (mismo orden que /buscar-elastic)."""
+        pit = await self.client.open_point_in_time(index=index, keep_alive=keep_alive)
+        pit_id = pit["id"]
+
+        resp = await self._con_plantilla(
+            PLANTILLA_BUSQUEDA,
+            Busqueda.parametros_plantilla(filtros, page_size, pit_id, keep_alive),
+            lambda: self.client.search(
+                pit={"id": pit_id, "keep_alive": keep_alive},
+                size=page_size,
+                query=Busqueda.construir_query(filtros),
+                sort=ORDEN_ESTABLE,
+                source=CAMPOS_RESPUESTA,
+                highlight=RESALTADO,
+                track_total_hits=True,
+            ),
+            index,
+        )
+        hits = resp["hits"]["hits"]
+        pit_id = resp.get("pit_id", pit_id)
+
+        if len(hits) < page_size:
+            try:
+                await self.client.close_point_in_time(id=pit_id)
+            except NotFoundError:
+                pass
+            pit_id = None
+
+        return {"total": resp["hits"]["total"]["value"], "hits": hits, "pit": pit_id}
+
+    async def _facetas(self, filtros: Dict, index: str) -> Dict:
+        resp = await self._con_plantilla(
+            PLANTILLA_FACETAS,
+            Busqueda.parametros_plantilla(filtros),
+            lambda: self.client.search(
+                index=index,
+                size=0,
+                query=Busqueda.construir_query(filtros),
+                aggs=Busqueda.construir_facetas(),
+            ),
+            index,
+        )
+        return {
+            nombre: [
+                {"valor": b["key"], "total": b["doc_count"]}
+                for b in agg.get("buckets", [])
+            ]
+            for nombre, agg in resp.get("aggregations", {}).items()
+        }
+
+    async def _sugerencias(self, texto: str) -> List[str]:
+        resp = await self.client.search(
+            index=self.default_index,
+            size=0,
+            suggest=Busqueda.construir_sugerencias(texto),
+        )
+        sugerencias = []
+        for entradas in resp.get("suggest", {}).values():
+            for entrada in entradas:
+                for opcion in entrada.get("options", []):
+                    if opcion["text"] not in sugerencias:
+                        sugerencias.append(opcion["text"])
+        return sugerencias
+
+    async def buscar_completo(
+        self,
+        filtros: Dict,
+        page_size: int = 20,
+        keep_alive: str = "2m",
+        index: Optional[str] = None,
+    ) -> Dict:
+        """
+        Lanza en paralelo la búsqueda principal, las facetas y las sugerencias.
+
+        Si facetas o sugerencias fallan la búsqueda igual responde (vacías);
+        un error en la búsqueda principal se propaga. `index` (p. ej. el
+        índice del año filtrado) aplica a la búsqueda y las facetas; las
+        sugerencias siempre usan el índice por defecto.
+        """
+        index = index or self.default_index
+        pagina, facetas, sugerencias = await asyncio.gather(
+            self._pagina(filtros, page_size, keep_alive, index),
+            self._facetas(filtros, index),
+            self._sugerencias(filtros["texto"]),
+            return_exceptions=True,
+        )
+        if isinstance(pagina, BaseException):
+            raise pagina
+        if isinstance(facetas, BaseException):
+            print(f"Error al calcular facetas: {facetas}")
+            facetas = {}
+        if isinstance(sugerencias, BaseException):
+            print(f"Error al calcular sugerencias: {sugerencias}")
+            sugerencias = []
+
+        return {**pagina, "facetas": facetas, "sugerencias": sugerencias}
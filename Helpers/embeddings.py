@@ -0,0 +1,145 @@
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from Helpers.cache import CacheResultados
+
+# Mismo modelo que Helpers/PLN.py (multilingüe, 384 dimensiones)
+MODELO_EMBEDDINGS = "paraphrase-multilingual-MiniLM-L12-v2"
+DIMENSIONES = 384
+
+# Campo dense_vector del índice (ver MAPEO_BOLETINES en Helpers/indices.py)
+CAMPO_VECTOR = "embedding"
+
+# Campos del boletín que forman el texto a vectorizar
+CAMPOS_VECTORIZADOS = ["tema_central", "temas_portada", "eventos"]
+
+
+class Embeddings:
+    """
+    Embeddings de texto con SentenceTransformer para la búsqueda kNN.
+
+    El modelo se carga en el primer uso (no al importar: pesa cientos de
+    MB y la app solo lo necesita en el modo híbrido). Los vectores salen
+    normalizados, así "cosine" y "dot_product" dan el mismo orden.
+
+    Las consultas se vectorizan una vez y se guardan en una caché LRU:
+    la misma búsqueda repetida (o paginada) no vuelve a pasar por el modelo.
+    """
+
+    def __init__(
+        self,
+        nombre_modelo: str = MODELO_EMBEDDINGS,
+        modelo=None,
+        max_consultas_cache: int = 2048,
+    ):
+        """
+        Args:
+            nombre_modelo: modelo de SentenceTransformer
+            modelo: modelo ya cargado para reutilizar (p. ej. PLN().model_embeddings)
+            max_consultas_cache: vectores de consulta guardados en memoria
+        """
+        self.nombre_modelo = nombre_modelo
+        self._modelo = modelo
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self.cache_consultas = CacheResultados(max_entradas=max_consultas_cache, ttl_segundos=24 * 3600)
+
+    @property
+    def modelo(self):
+        """Modelo cargado (RuntimeError si sentence-transformers no está disponible)."""
+        if self._modelo is not None:
+            return self._modelo
+        with self._lock:
+            if self._modelo is None:
+                if self._error:
+                    raise RuntimeError(self._error)
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    print(f"Cargando modelo de embeddings '{self.nombre_modelo}'...")
+                    self._modelo = SentenceTransformer(self.nombre_modelo)
+                except Exception as e:
+                    self._error = f"Modelo de embeddings no disponible: {e}"
+                    raise RuntimeError(self._error)
+        return self._modelo
+
+    def disponible(self) -> bool:
+        """True si el modelo se pudo cargar (lo carga si hace falta)."""
+        try:
+            self.modelo
+            return True
+        except RuntimeError:
+            return False
+
+    # ------------------------------------------------------------------ #
+    #   VECTORES
+    # ------------------------------------------------------------------ #
+
+    def vectorizar(self, textos: List[str], lote: int = 32) -> List[List[float]]:
+        """Vectores (listas de float normalizadas) de varios textos."""
+        if not textos:
+            return []
+        vectores = self.modelo.encode(
+            textos, batch_size=lote, normalize_embeddings=True, show_progress_bar=False,
+        )
+        return [v.tolist() for v in vectores]
+
+    def vectorizar_consulta(self, texto: str) -> List[float]:
+        """Vector de una consulta (texto ya normalizado), con caché."""
+        vector = self.cache_consultas.obtener(texto)
+        if vector is None:
+            vector = self.vectorizar([texto])[0]
+            self.cache_consultas.guardar(texto, vector)
+        return vector
+
+    @staticmethod
+    def texto_documento(doc: Dict) -> str:
+        """Texto del boletín que se vectoriza (tema central, temas y eventos)."""
+        partes = []
+        for campo in CAMPOS_VECTORIZADOS:
+            valor = doc.get(campo)
+            if isinstance(valor, list):
+                partes.extend(str(v) for v in valor if v)
+            elif valor:
+                partes.append(str(valor))
+        return ". ".join(partes)
+
+    def agregar_vectores(self, documentos: Iterable[Dict], lote: int = 64) -> Iterator[Dict]:
+        """
+        Generador que agrega el campo CAMPO_VECTOR a cada documento,
+        vectorizando de a `lote` documentos (se puede encadenar con
+        indexar_bulk sin cargar todo en memoria).
+
+        Los borrados (_op_type "delete") y los documentos sin texto pasan
+        sin vector. Si el modelo no está disponible los documentos pasan
+        sin cambios (la búsqueda híbrida queda solo léxica).
+        """
+        if not self.disponible():
+            print(f"{self._error}. Se indexa sin {CAMPO_VECTOR}.")
+            yield from documentos
+            return
+
+        pendientes: List[Dict] = []
+        for doc in documentos:
+            pendientes.append(doc)
+            if len(pendientes) >= lote:
+                yield from self._vectorizar_lote(pendientes)
+                pendientes = []
+        if pendientes:
+            yield from self._vectorizar_lote(pendientes)
+
+    def _vectorizar_lote(self, documentos: List[Dict]) -> List[Dict]:
+        con_texto = [
+            (doc, self.texto_documento(doc)) for doc in documentos
+            if doc.get("_op_type") != "delete"
+        ]
+        con_texto = [(doc, texto) for doc, texto in con_texto if texto]
+        vectores = self.vectorizar([texto for _, texto in con_texto])
+        for (doc, _), vector in zip(con_texto, vectores):
+            doc[CAMPO_VECTOR] = vector
+        return documentos
+
+
+def embeddings_habilitados() -> bool:
+    """Los scripts de carga vectorizan salvo EMBEDDINGS=0 en el entorno."""
+    return os.getenv("EMBEDDINGS", "1").lower() not in ("0", "false", "no")
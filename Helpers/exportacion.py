@@ -0,0 +1,100 @@
+import gzip
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from Helpers import codecJson
+
+
+class Exportador:
+    """
+    Escritura en streaming de documentos (p. ej. ElasticSearch.exportar)
+    a NDJSON o Parquet, con memoria constante: NDJSON se escribe línea a
+    línea y Parquet por grupos de filas.
+
+    Los archivos se escriben con extensión .tmp y se renombran al final,
+    así una exportación cortada no deja un archivo a medias con el nombre
+    final.
+    """
+
+    @staticmethod
+    def a_ndjson(documentos: Iterable[Dict], ruta: str) -> int:
+        """
+        Escribe NDJSON (gzip si la ruta termina en .gz).
+
+        Returns:
+            número de documentos escritos
+        """
+        temporal = f"{ruta}.tmp"
+        abrir = gzip.open if ruta.endswith(".gz") else open
+        with abrir(temporal, "wb") as f:
+            n = codecJson.escribir_ndjson(f, documentos)
+        os.replace(temporal, ruta)
+        return n
+
+    @staticmethod
+    def a_parquet(documentos: Iterable[Dict], ruta: str, filas_por_grupo: int = 5000,
+                  esquema=None) -> int:
+        """
+        Escribe Parquet por grupos de filas (requiere pyarrow).
+
+        El esquema se infiere del primer grupo si no se pasa uno; en los
+        grupos siguientes los campos que no están en el esquema se
+        descartan y los que faltan quedan nulos.
+
+        Returns:
+            número de documentos escritos
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Para exportar a Parquet hay que instalar pyarrow (pip install pyarrow)")
+
+        temporal = f"{ruta}.tmp"
+        escritor = None
+        n = 0
+        try:
+            for grupo in Exportador._grupos(documentos, filas_por_grupo):
+                tabla = pa.Table.from_pylist(grupo, schema=esquema)
+                if escritor is None:
+                    esquema = tabla.schema
+                    escritor = pq.ParquetWriter(temporal, esquema, compression="zstd")
+                escritor.write_table(tabla)
+                n += len(grupo)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        if escritor is None:
+            return 0
+        os.replace(temporal, ruta)
+        return n
+
+    @staticmethod
+    def _grupos(documentos: Iterable[Dict], tamano: int) -> Iterator[List[Dict]]:
+        grupo: List[Dict] = []
+        for doc in documentos:
+            grupo.append(doc)
+            if len(grupo) >= tamano:
+                yield grupo
+                grupo = []
+        if grupo:
+            yield grupo
+
+    @staticmethod
+    def ndjson_en_trozos(documentos: Iterable[Dict], tamano: int = 64 * 1024) -> Iterator[bytes]:
+        """Trozos de ~tamano bytes de NDJSON, para una respuesta HTTP en streaming."""
+        buffer = bytearray()
+        for doc in documentos:
+            buffer += codecJson.linea_ndjson(doc)
+            if len(buffer) >= tamano:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    @staticmethod
+    def formato_de_ruta(ruta: str, formato: Optional[str] = None) -> str:
+        """"parquet" o "ndjson" según el formato pedido o la extensión."""
+        if formato:
+            return formato.lower()
+        return "parquet" if ruta.lower().endswith(".parquet") else "ndjson"
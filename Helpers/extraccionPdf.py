@@ -0,0 +1,362 @@
+import hashlib
+import io
+import os
+import re
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from Helpers import codecJson
+
+VERSION_CACHE = 1
+
+# DPI máximo para rasterizar una página para OCR (memoria por página ~ dpi²)
+DPI_OCR_MAX = 300
+
+# Caracteres "normales" de un texto en español (el resto cuenta como basura)
+_NORMALES = re.compile(r"[\wáéíóúüñÁÉÍÓÚÜÑ\s.,;:()%/\-–—\"'¿?¡!°+=<>\[\]]")
+_CID = re.compile(r"\(cid:\d+\)")
+
+
+def hash_archivo(ruta: str, bloque: int = 1024 * 1024) -> str:
+    """sha256 del contenido (la clave de la caché: no depende del nombre ni del mtime)."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(bloque), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def _paginas_pypdf(origen: Union[str, bytes]) -> List[str]:
+    """Texto de cada página con PyPDF2 (ruta o contenido; corre en los procesos del pool)."""
+    import PyPDF2  # import lazy
+
+    with (io.BytesIO(origen) if isinstance(origen, bytes) else open(origen, "rb")) as f:
+        lector = PyPDF2.PdfReader(f)
+        return [pagina.extract_text() or "" for pagina in lector.pages]
+
+
+def pagina_sin_texto(texto: str, min_caracteres: int = 40, min_proporcion: float = 0.85) -> bool:
+    """
+    True si la capa de texto de una página falta o es basura: muy pocos
+    caracteres alfanuméricos, glifos sin mapear ("(cid:12)", "\ufffd") o
+    una proporción baja de caracteres normales (fuentes mal codificadas).
+    """
+    texto = _CID.sub("\ufffd", texto or "").strip()
+    if sum(c.isalnum() for c in texto) < min_caracteres:
+        return True
+    normales = len(_NORMALES.findall(texto))
+    return normales / len(texto) < min_proporcion
+
+
+def _ocr_pagina(ruta: str, indice: int, dpi: int, idioma: str) -> Dict:
+    """
+    OCR de una sola página (corre en los procesos del pool): se rasteriza
+    solo esa página, así la memoria es la de una imagen y no la del PDF.
+    """
+    try:
+        from pdf2image import convert_from_path  # import lazy
+        import pytesseract                       # import lazy
+
+        imagenes = convert_from_path(ruta, dpi=dpi, first_page=indice + 1, last_page=indice + 1)
+        try:
+            return {"texto": pytesseract.image_to_string(imagenes[0], lang=idioma)}
+        finally:
+            for imagen in imagenes:
+                imagen.close()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def ocr_disponible() -> Optional[str]:
+    """None si pdf2image + pytesseract + tesseract están instalados; si no, el motivo."""
+    try:
+        import pdf2image  # noqa: F401
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        return f"OCR no disponible ({type(e).__name__}: {e})"
+    return None
+
+
+def _extraer(origen: Union[str, bytes]) -> Dict:
+    """Unidad de trabajo del pool: nunca lanza, el error viaja en el resultado."""
+    try:
+        return {"paginas": _paginas_pypdf(origen)}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+class ExtractorPdf:
+    """
+    Extracción de texto de PDFs en lote, con un pool de procesos y una
+    caché en disco del texto de cada página.
+
+    La clave de la caché es el sha256 del contenido del PDF: en una
+    segunda corrida un PDF sin cambios cuesta solo leerlo para el hash
+    (aunque se haya renombrado o copiado); uno modificado se vuelve a
+    extraer. Cada entrada es <carpeta_cache>/<2 primeros>/<hash>.json con
+    la lista de textos por página.
+
+    Con ocr=True (modo híbrido) las páginas sin capa de texto o con texto
+    basura (pagina_sin_texto) se pasan por OCR: solo esas, de a una página
+    rasterizada por tarea con DPI acotado, repartidas en el mismo pool.
+    El OCR de cada página queda en la misma entrada de la caché (por DPI
+    e idioma), así no se repite en las corridas siguientes.
+    """
+
+    def __init__(
+        self,
+        carpeta_cache: str = ".cache_pdf",
+        procesos: int = 0,
+        ocr: bool = False,
+        dpi_ocr: int = 200,
+        idioma_ocr: str = "spa",
+    ):
+        """
+        Args:
+            carpeta_cache: carpeta de la caché (None: sin caché)
+            procesos: procesos del pool (0: uno por CPU; 1: sin pool)
+            ocr: OCR de las páginas sin texto útil (pdf2image + pytesseract)
+            dpi_ocr: resolución de rasterizado (máximo DPI_OCR_MAX)
+            idioma_ocr: idioma de tesseract
+        """
+        self.carpeta_cache = carpeta_cache
+        self.procesos = procesos or os.cpu_count() or 1
+        self.ocr = ocr
+        self.dpi_ocr = min(int(dpi_ocr), DPI_OCR_MAX)
+        self.idioma_ocr = idioma_ocr
+        self._ocr_error: Optional[str] = None
+        self._ocr_ok = False   # ocr_disponible() ya respondió que sí (no se vuelve a preguntar)
+        self.reiniciar_estadisticas()
+
+    def reiniciar_estadisticas(self) -> None:
+        self.pdfs = 0
+        self.paginas = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.errores = 0
+        self.segundos = 0.0
+        self.paginas_ocr = 0
+        self.aciertos_ocr = 0
+
+    def estadisticas(self) -> Dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "pdfs": self.pdfs,
+            "paginas": self.paginas,
+            "errores": self.errores,
+            "aciertos_cache": self.aciertos,
+            "fallos_cache": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else None,
+            "paginas_ocr": self.paginas_ocr,
+            "aciertos_ocr": self.aciertos_ocr,
+            "segundos": round(self.segundos, 3),
+            "paginas_por_segundo": round(self.paginas / self.segundos, 1) if self.segundos else None,
+        }
+
+    # ------------------------------------------------------------------ #
+    #   CACHÉ
+    # ------------------------------------------------------------------ #
+
+    def _ruta_cache(self, digest: str) -> str:
+        return os.path.join(self.carpeta_cache, digest[:2], f"{digest}.json")
+
+    def leer_cache(self, digest: str) -> Optional[Dict]:
+        if not self.carpeta_cache:
+            return None
+        try:
+            entrada = codecJson.leer(self._ruta_cache(digest))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entrada, dict) or entrada.get("version") != VERSION_CACHE:
+            return None
+        return entrada
+
+    def guardar_cache(self, digest: str, entrada: Dict) -> None:
+        """Escritura atómica (temporal + os.replace): dos procesos no se pisan."""
+        if not self.carpeta_cache:
+            return
+        ruta = self._ruta_cache(digest)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        codecJson.guardar(temporal, dict(entrada, version=VERSION_CACHE))
+        os.replace(temporal, ruta)
+
+    # ------------------------------------------------------------------ #
+    #   EXTRACCIÓN
+    # ------------------------------------------------------------------ #
+
+    def extraer(self, rutas: Iterable[str], en_vuelo_por_proceso: int = 2) -> Iterator[Dict]:
+        """
+        Extrae el texto de varios PDFs, en el mismo orden de `rutas`.
+
+        Los aciertos de caché salen sin pasar por el pool; los demás se
+        reparten entre los procesos con una ventana acotada de tareas en
+        vuelo (la memoria no depende de la cantidad de PDFs).
+
+        Yields:
+            {"ruta", "hash", "paginas": [texto por página], "cache": bool}
+            o {"ruta", "hash", "error"} si el PDF no se pudo leer
+        """
+        inicio = time.perf_counter()
+        try:
+            if self.procesos <= 1:
+                for ruta in rutas:
+                    digest = self._hash(ruta)
+                    resultado = self._de_cache(ruta, digest)
+                    if resultado is None:
+                        resultado = self._completar(ruta, digest, _extraer(ruta))
+                    yield self._contar(self._aplicar_ocr(resultado))
+                return
+
+            from concurrent.futures import Future, ProcessPoolExecutor
+
+            limite = en_vuelo_por_proceso * self.procesos
+            with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+                # (ruta, hash, resultado o Future), en el orden de entrada
+                pendientes = deque()
+                for ruta in rutas:
+                    digest = self._hash(ruta)
+                    resultado = self._de_cache(ruta, digest)
+                    if resultado is None:
+                        resultado = pool.submit(_extraer, ruta)
+                    pendientes.append((ruta, digest, resultado))
+
+                    # Entrega lo que ya está listo; si la ventana se llenó, espera
+                    while pendientes and (
+                        len(pendientes) > limite
+                        or not isinstance(pendientes[0][2], Future)
+                        or pendientes[0][2].done()
+                    ):
+                        yield self._contar(self._aplicar_ocr(self._resolver(*pendientes.popleft()), pool))
+
+                while pendientes:
+                    yield self._contar(self._aplicar_ocr(self._resolver(*pendientes.popleft()), pool))
+        finally:
+            self.segundos += time.perf_counter() - inicio
+
+    def texto(self, ruta: str) -> str:
+        """Texto completo de un PDF (con caché, sin pool); "" si no se pudo leer."""
+        digest = self._hash(ruta)
+        resultado = self._de_cache(ruta, digest)
+        if resultado is None:
+            resultado = self._completar(ruta, digest, _extraer(ruta))
+        resultado = self._contar(self._aplicar_ocr(resultado))
+        if "error" in resultado:
+            return ""
+        return self.unir(resultado["paginas"])
+
+    def extraer_bytes(self, datos: bytes, nombre: str, pool=None) -> Dict:
+        """
+        Extrae un PDF que está en memoria (p. ej. un miembro de un ZIP),
+        con la misma caché por contenido que extraer(). Sin OCR: el
+        rasterizado necesita el archivo en disco.
+
+        Args:
+            datos: contenido del PDF
+            nombre: nombre para los mensajes y el campo "ruta" del resultado
+            pool: ProcessPoolExecutor donde extraer (None: en este hilo)
+        """
+        inicio = time.perf_counter()
+        try:
+            digest = hashlib.sha256(datos).hexdigest()
+            resultado = self._de_cache(nombre, digest)
+            if resultado is None:
+                extraido = pool.submit(_extraer, datos).result() if pool is not None else _extraer(datos)
+                resultado = self._completar(nombre, digest, extraido)
+            return self._contar(resultado)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+
+    @staticmethod
+    def unir(paginas: List[str]) -> str:
+        """Texto de las páginas en un solo string (un join, no concatenaciones)."""
+        return "\n".join(paginas).strip()
+
+    def _hash(self, ruta: str) -> Optional[str]:
+        try:
+            return hash_archivo(ruta)
+        except OSError:
+            return None
+
+    def _de_cache(self, ruta: str, digest: Optional[str]) -> Optional[Dict]:
+        """Resultado desde la caché (o el error de lectura), None si hay que extraer."""
+        if digest is None:
+            return {"ruta": ruta, "hash": None, "error": "no se pudo leer el archivo"}
+        entrada = self.leer_cache(digest)
+        if entrada is None:
+            return None
+        return {"ruta": ruta, "hash": digest, "paginas": entrada["paginas"], "cache": True}
+
+    def _completar(self, ruta: str, digest: str, extraido: Dict) -> Dict:
+        if "error" in extraido:
+            print(f"Error al extraer texto del PDF {ruta}: {extraido['error']}")
+            return {"ruta": ruta, "hash": digest, "error": extraido["error"]}
+        self.guardar_cache(digest, {"paginas": extraido["paginas"]})
+        return {"ruta": ruta, "hash": digest, "paginas": extraido["paginas"], "cache": False}
+
+    def _aplicar_ocr(self, resultado: Dict, pool=None) -> Dict:
+        """
+        Modo híbrido: reemplaza el texto de las páginas sin texto útil por
+        su OCR (desde la caché o calculado, una tarea por página).
+        """
+        if not self.ocr or "error" in resultado:
+            return resultado
+        faltan = [i for i, texto in enumerate(resultado["paginas"]) if pagina_sin_texto(texto)]
+        if not faltan:
+            return resultado
+
+        clave = f"{self.dpi_ocr}-{self.idioma_ocr}"
+        entrada = self.leer_cache(resultado["hash"]) or {"paginas": resultado["paginas"]}
+        hechos: Dict[str, str] = dict((entrada.get("ocr") or {}).get(clave, {}))
+        pendientes = [i for i in faltan if str(i) not in hechos]
+        self.aciertos_ocr += len(faltan) - len(pendientes)
+
+        if pendientes and not self._ocr_ok and self._ocr_error is None:
+            self._ocr_error = ocr_disponible()
+            self._ocr_ok = self._ocr_error is None
+            if self._ocr_error:
+                print(f"{self._ocr_error}: las páginas sin texto quedan sin OCR")
+        if pendientes and not self._ocr_error:
+            argumentos = [(resultado["ruta"], i, self.dpi_ocr, self.idioma_ocr) for i in pendientes]
+            if pool is not None:
+                futuros = [pool.submit(_ocr_pagina, *a) for a in argumentos]
+                respuestas = [f.result() for f in futuros]
+            else:
+                respuestas = [_ocr_pagina(*a) for a in argumentos]
+
+            nuevos = 0
+            for i, respuesta in zip(pendientes, respuestas):
+                if "error" in respuesta:
+                    print(f"Error de OCR en {resultado['ruta']} página {i + 1}: {respuesta['error']}")
+                    continue
+                hechos[str(i)] = respuesta["texto"]
+                nuevos += 1
+            self.paginas_ocr += nuevos
+            if nuevos:
+                entrada.setdefault("ocr", {})[clave] = hechos
+                self.guardar_cache(resultado["hash"], entrada)
+
+        paginas = list(resultado["paginas"])
+        for i in faltan:
+            if str(i) in hechos:
+                paginas[i] = hechos[str(i)]
+        return dict(resultado, paginas=paginas, ocr=[i for i in faltan if str(i) in hechos])
+
+    def _resolver(self, ruta: str, digest: Optional[str], valor) -> Dict:
+        if isinstance(valor, dict):
+            return valor
+        return self._completar(ruta, digest, valor.result())
+
+    def _contar(self, resultado: Dict) -> Dict:
+        self.pdfs += 1
+        if "error" in resultado:
+            self.errores += 1
+            return resultado
+        self.paginas += len(resultado["paginas"])
+        if resultado["cache"]:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        return resultado
@@ -1,11 +1,14 @@
 import os
 import zipfile
 import requests
-import json
-from typing import Dict, List
+import re
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 import shutil
 
+from Helpers import codecJson
+
 
 class Funciones:
     # ==========================================================
@@ -101,6 +104,33 @@ class Funciones:
             print(f"Error al descargar y descomprimir: {e}")
             return []
 
+    @staticmethod
+    def descargar_zip_spooled(url: str, max_memoria: int = 64 * 1024 * 1024,
+                              timeout: float = 60):
+        """
+        Descarga un ZIP a un SpooledTemporaryFile: queda en memoria hasta
+        max_memoria bytes y recién ahí pasa a un temporal anónimo (sin
+        temp.zip con nombre ni extracción a disco). Se lee con
+        zipfile.ZipFile(archivo) o con IngestaZip (Helpers/ingestaZip.py).
+
+        Returns:
+            archivo posicionado al inicio, o None si la descarga falló
+        """
+        import tempfile
+
+        archivo = tempfile.SpooledTemporaryFile(max_size=max_memoria)
+        try:
+            with requests.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    archivo.write(chunk)
+            archivo.seek(0)
+            return archivo
+        except Exception as e:
+            print(f"Error al descargar el ZIP {url}: {e}")
+            archivo.close()
+            return None
+
     @staticmethod
     def allowed_file(filename: str, extensions: List[str]) -> bool:
         """Verifica si un archivo tiene extensión permitida"""
@@ -117,33 +147,36 @@ class Funciones:
         try:
             import PyPDF2  # import lazy
 
-            texto = ""
+            # Un join al final: "texto += ..." por página copia todo el
+            # texto acumulado en cada vuelta. Para lotes con caché y pool
+            # de procesos ver Helpers/extraccionPdf.py (ExtractorPdf).
             with open(ruta_pdf, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    contenido = page.extract_text() or ""
-                    texto += contenido + "\n"
-            return texto.strip()
+                paginas = [page.extract_text() or "" for page in pdf_reader.pages]
+            return "\n".join(paginas).strip()
         except Exception as e:
             print(f"Error al extraer texto del PDF {ruta_pdf}: {e}")
             return ""
 
     @staticmethod
-    def extraer_texto_pdf_ocr(ruta_pdf: str) -> str:
+    def extraer_texto_pdf_ocr(ruta_pdf: str, dpi: int = 200) -> str:
         """
-        Extrae texto de un PDF usando OCR (útil para PDFs escaneados)
+        Extrae texto de un PDF usando OCR (útil para PDFs escaneados).
+        Rasteriza de a una página (no el PDF entero en memoria) con DPI
+        acotado; para OCR solo de las páginas sin texto ver ExtractorPdf(ocr=True).
         """
         try:
-            from pdf2image import convert_from_path   # lazy import
-            import pytesseract                        # lazy import
-
-            images = convert_from_path(ruta_pdf)
-
-            texto = ""
-            for image in images:
-                texto += pytesseract.image_to_string(image, lang='spa') + "\n"
-
-            return texto.strip()
+            from pdf2image import pdfinfo_from_path   # lazy import
+            from Helpers.extraccionPdf import DPI_OCR_MAX, _ocr_pagina
+
+            total = pdfinfo_from_path(ruta_pdf)["Pages"]
+            paginas = []
+            for i in range(total):
+                resultado = _ocr_pagina(ruta_pdf, i, min(dpi, DPI_OCR_MAX), "spa")
+                if "error" in resultado:
+                    raise RuntimeError(f"página {i + 1}: {resultado['error']}")
+                paginas.append(resultado["texto"])
+            return "\n".join(paginas).strip()
         except Exception as e:
             print(f"Error al extraer texto con OCR del PDF {ruta_pdf}: {e}")
             return ""
@@ -179,27 +212,76 @@ class Funciones:
     def leer_json(ruta_json: str) -> Dict:
         """Lee un archivo JSON y retorna su contenido"""
         try:
-            with open(ruta_json, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return codecJson.leer(ruta_json)
         except Exception as e:
             print(f"Error al leer JSON {ruta_json}: {e}")
             return {}
 
     @staticmethod
-    def guardar_json(ruta_json: str, datos: Dict) -> bool:
-        """Guarda datos en un archivo JSON"""
+    def guardar_json(ruta_json: str, datos: Dict, indentar: bool = True) -> bool:
+        """Guarda datos en un archivo JSON (indentado; indentar=False para compacto)"""
         try:
             directorio = os.path.dirname(ruta_json)
             if directorio:
                 Funciones.crear_carpeta(directorio)
 
-            with open(ruta_json, 'w', encoding='utf-8') as f:
-                json.dump(datos, f, indent=4, ensure_ascii=False)
+            codecJson.guardar(ruta_json, datos, indentar)
             return True
         except Exception as e:
             print(f"Error al guardar JSON: {e}")
             return False
 
+    # ==========================================================
+    # FECHAS DE LOS BOLETINES
+    # ==========================================================
+    MESES = {
+        "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+        "julio": 7, "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10,
+        "noviembre": 11, "diciembre": 12,
+    }
+    _RANGO_FECHAS = re.compile(
+        r"(\d{1,2})(?:\s+de\s+([a-záéíóú]+))?(?:\s+de\s+(\d{4}))?\s+al\s+"
+        r"(\d{1,2})\s+de\s+([a-záéíóú]+)\s+de\s+(\d{4})",
+        re.IGNORECASE,
+    )
+
+    @staticmethod
+    def rango_a_fechas(rango: str) -> Optional[Tuple[str, str]]:
+        """
+        Convierte el rango_fechas de un boletín en fechas ISO.
+
+        "29 de marzo al 4 de abril de 2020" -> ("2020-03-29", "2020-04-04")
+        "27 de diciembre de 2020 al 2 de enero de 2021" también se entiende.
+
+        Returns:
+            (fecha_inicio, fecha_fin) o None si el texto no se reconoce o el
+            rango es incoherente (una semana epidemiológica dura 7 días; se
+            acepta hasta un mes)
+        """
+        m = Funciones._RANGO_FECHAS.search(rango or "")
+        if not m:
+            return None
+        dia_ini, mes_ini, anio_ini, dia_fin, mes_fin, anio_fin = m.groups()
+        mes_fin_n = Funciones.MESES.get(mes_fin.lower())
+        mes_ini_n = Funciones.MESES.get(mes_ini.lower()) if mes_ini else mes_fin_n
+        if not mes_ini_n or not mes_fin_n:
+            return None
+
+        anio_fin_n = int(anio_fin)
+        if anio_ini:
+            anio_ini_n = int(anio_ini)
+        else:
+            # "28 de diciembre al 3 de enero de 2021": empieza el año anterior
+            anio_ini_n = anio_fin_n - 1 if mes_ini_n > mes_fin_n else anio_fin_n
+        try:
+            inicio = datetime(anio_ini_n, mes_ini_n, int(dia_ini))
+            fin = datetime(anio_fin_n, mes_fin_n, int(dia_fin))
+        except ValueError:
+            return None
+        if not 0 <= (fin - inicio).days <= 31:
+            return None
+        return inicio.strftime("%Y-%m-%d"), fin.strftime("%Y-%m-%d")
+
     # ==========================================================
     # LISTAR ARCHIVOS GENERALES
     # ==========================================================
@@ -235,6 +317,115 @@ class Funciones:
     # ==========================================================
     # FUNCIONES ESPECÍFICAS PARA TUS BOLETINES (JSON)
     # ==========================================================
+    @staticmethod
+    def recorrer_archivos(ruta_carpeta: str, extension: str = ".json",
+                          recursivo: bool = True) -> Iterator[str]:
+        """
+        Recorre una carpeta con os.scandir y entrega las rutas de los
+        archivos con la extensión dada, de a uno (sin armar la lista).
+
+        Baja por subcarpetas (p. ej. data/2020/, data/2021/...) si
+        recursivo=True. Se omiten archivos y carpetas ocultos (".algo").
+        """
+        pendientes = [ruta_carpeta]
+        while pendientes:
+            carpeta = pendientes.pop()
+            try:
+                with os.scandir(carpeta) as it:
+                    entradas = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                print(f"Error al recorrer {carpeta}: {e}")
+                continue
+
+            subcarpetas = []
+            for entrada in entradas:
+                if entrada.name.startswith("."):
+                    continue
+                if entrada.is_dir(follow_symlinks=False):
+                    if recursivo:
+                        subcarpetas.append(entrada.path)
+                elif entrada.name.lower().endswith(extension):
+                    yield entrada.path
+            # En orden alfabético (la pila saca el último primero)
+            pendientes.extend(reversed(subcarpetas))
+
+    @staticmethod
+    def boletines_de_json(data) -> List[Dict]:
+        """
+        Boletines de un JSON ya leído: un boletín, una lista de boletines
+        o {"boletines": [...]}. Lo que no es un dict se descarta.
+        """
+        if isinstance(data, dict) and isinstance(data.get("boletines"), list):
+            data = data["boletines"]
+        crudos = data if isinstance(data, list) else [data]
+        return [b for b in crudos if isinstance(b, dict)]
+
+    @staticmethod
+    def _boletines_de_archivos(rutas: List[str], con_id: bool = False,
+                               preparar: Optional[Callable[[Dict], Dict]] = None) -> List[Dict]:
+        """Lee y normaliza los boletines de varios JSON (unidad de trabajo del pool)."""
+        boletines = []
+        for ruta in rutas:
+            data = Funciones.leer_json(ruta)
+            if not data:
+                continue
+
+            for b in Funciones.boletines_de_json(data):
+                if preparar is not None:
+                    boletines.append(preparar(b))
+                    continue
+                doc = Funciones._normalizar_boletin(b, ruta)
+                if con_id:
+                    doc["_id"] = doc["id_boletin"]
+                boletines.append(doc)
+        return boletines
+
+    @staticmethod
+    def iterar_boletines(ruta_carpeta: str, recursivo: bool = True, procesos: int = 0,
+                         archivos_por_tarea: int = 32, con_id: bool = True,
+                         preparar: Optional[Callable[[Dict], Dict]] = None) -> Iterator[Dict]:
+        """
+        Generador de boletines normalizados (_normalizar_boletin), de a uno.
+
+        La memoria no depende del tamaño del corpus: se leen los archivos a
+        medida que se consumen los documentos. Para indexar se pasa el mismo
+        preparar que usan las demás cargas, así el _id y los campos coinciden:
+        ElasticSearch.indexar_bulk(Funciones.iterar_boletines(carpeta, preparar=limpiar_documento)).
+
+        Args:
+            ruta_carpeta: carpeta raíz (puede tener subcarpetas)
+            recursivo: bajar por subcarpetas
+            procesos: > 1 para parsear en paralelo con un pool de procesos
+                      (con una ventana acotada de tareas en vuelo)
+            archivos_por_tarea: archivos por tarea enviada al pool
+            con_id: agregar "_id" = id_boletin (evita duplicados al reindexar)
+            preparar: función dict -> documento aplicada a cada boletín tal
+                      como está en el JSON, en lugar de _normalizar_boletin
+                      (con procesos > 1 tiene que poder serializarse)
+        """
+        rutas = Funciones.recorrer_archivos(ruta_carpeta, ".json", recursivo)
+
+        if procesos <= 1:
+            for ruta in rutas:
+                yield from Funciones._boletines_de_archivos([ruta], con_id, preparar)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import islice
+
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            en_vuelo = deque()
+            while True:
+                # Mantiene ~2 tareas por proceso; los resultados salen en orden
+                while len(en_vuelo) < 2 * procesos:
+                    tarea = list(islice(rutas, archivos_por_tarea))
+                    if not tarea:
+                        break
+                    en_vuelo.append(pool.submit(Funciones._boletines_de_archivos, tarea, con_id, preparar))
+                if not en_vuelo:
+                    break
+                yield from en_vuelo.popleft().result()
+
     @staticmethod
     def cargar_boletines_desde_carpeta(ruta_carpeta: str) -> List[Dict]:
         """
@@ -254,30 +445,13 @@ class Funciones:
         { "boletines": [ { ... }, { ... } ] }
 
         Devuelve una lista de documentos listos para indexar en Elastic.
+        Para corpus grandes usar iterar_boletines (no arma la lista).
         """
-        boletines: List[Dict] = []
-
-        archivos_json = Funciones.listar_archivos_json(ruta_carpeta)
-        if not archivos_json:
+        boletines = list(Funciones.iterar_boletines(ruta_carpeta, recursivo=False, con_id=False))
+        if not boletines:
             print(f"No se encontraron JSON en {ruta_carpeta}")
             return []
 
-        for info_archivo in archivos_json:
-            ruta = info_archivo["ruta"]
-            data = Funciones.leer_json(ruta)
-            if not data:
-                continue
-
-            # Si el JSON trae una lista "boletines"
-            if isinstance(data, dict) and "boletines" in data and isinstance(data["boletines"], list):
-                for b in data["boletines"]:
-                    doc = Funciones._normalizar_boletin(b, ruta)
-                    boletines.append(doc)
-            else:
-                # Asumimos que el JSON ya es un solo boletín
-                doc = Funciones._normalizar_boletin(data, ruta)
-                boletines.append(doc)
-
         print(f"Boletines cargados desde JSON: {len(boletines)}")
         return boletines
 
@@ -0,0 +1,629 @@
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from elasticsearch.exceptions import NotFoundError
+
+from Helpers.elastic import ElasticSearch
+from Helpers.embeddings import CAMPO_VECTOR, DIMENSIONES
+
+
+# Análisis en español: minúsculas, sin tildes, stopwords y stemming
+ANALISIS_ESPANOL = {
+    "filter": {
+        "espanol_stop": {"type": "stop", "stopwords": "_spanish_"},
+        "espanol_stemmer": {"type": "stemmer", "language": "light_spanish"},
+    },
+    "analyzer": {
+        "espanol": {
+            "tokenizer": "standard",
+            "filter": ["lowercase", "asciifolding", "espanol_stop", "espanol_stemmer"],
+        },
+    },
+    "normalizer": {
+        "minusculas": {"type": "custom", "filter": ["lowercase", "asciifolding"]},
+    },
+}
+
+_TEXTO = {"type": "text", "analyzer": "espanol",
+          "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}}
+
+# Mapeo declarado de los boletines (ver limpiar_documento en cargarjson.py)
+MAPEO_BOLETINES = {
+    "dynamic_templates": [
+        {"textos": {"match_mapping_type": "string", "mapping": _TEXTO}},
+    ],
+    "properties": {
+        "anio": {"type": "integer"},
+        "semana": {"type": "integer"},
+        "semana_epidemiologica": {"type": "keyword"},
+        "fecha_inicio": {"type": "date", "format": "strict_date"},
+        "fecha_fin": {"type": "date", "format": "strict_date"},
+        "rango_fechas": {"type": "text", "analyzer": "espanol"},
+        "tema_central": _TEXTO,
+        "temas_portada": _TEXTO,
+        "eventos": _TEXTO,
+        "tipo_archivo": {"type": "keyword", "normalizer": "minusculas"},
+        "publicacion_en_linea": {"type": "keyword"},
+        "pdf_url": {"type": "keyword", "index": False},
+        # Embedding del tema/temas/eventos (Helpers/embeddings.py) para kNN
+        CAMPO_VECTOR: {"type": "dense_vector", "dims": DIMENSIONES,
+                       "index": True, "similarity": "cosine"},
+    },
+}
+
+
+# Mapeo de los pasajes del cuerpo de los PDFs (Helpers/pasajes.py): un
+# documento hijo por pasaje, ligado al boletín por boletin_id (keyword con
+# doc_values: es el campo del collapse). Los campos del boletín van
+# copiados para filtrar y pintar el resultado sin otra consulta.
+MAPEO_PASAJES = {
+    "dynamic": "strict",
+    "properties": {
+        "boletin_id": {"type": "keyword"},
+        "pagina": {"type": "integer"},
+        "pasaje": {"type": "integer"},
+        "texto": {"type": "text", "analyzer": "espanol"},
+        "anio": {"type": "integer"},
+        "semana": {"type": "integer"},
+        "semana_epidemiologica": {"type": "keyword"},
+        "rango_fechas": {"type": "text", "analyzer": "espanol"},
+        "tema_central": {"type": "text", "analyzer": "espanol"},
+        "temas_portada": {"type": "text", "analyzer": "espanol"},
+        "tipo_archivo": {"type": "keyword", "normalizer": "minusculas"},
+        "pdf_url": {"type": "keyword", "index": False},
+    },
+}
+
+
+class GestorIndices:
+    """
+    Índices versionados detrás de un alias, para reindexar sin cortar la
+    búsqueda.
+
+    Cada carga completa va a un índice nuevo ("<alias>-v20240101120000")
+    creado con el mapeo declarado y con refresh_interval=-1 y 0 réplicas
+    (la carga no paga refrescos ni replicación). Al terminar se restauran
+    los settings, se hace force-merge y el alias se mueve al índice nuevo
+    en una sola operación atómica: la app siempre busca contra el alias.
+    """
+
+    def __init__(
+        self,
+        elastic: ElasticSearch,
+        alias: Optional[str] = None,
+        mapeo: Optional[Dict] = None,
+        replicas: int = 1,
+        refresh_interval: str = "1s",
+    ):
+        """
+        Args:
+            elastic: helper de Elastic (Helpers.elastic.ElasticSearch)
+            alias: alias de lectura (por defecto el índice por defecto del helper)
+            mapeo: mapeo de los índices nuevos (por defecto MAPEO_BOLETINES)
+            replicas: réplicas a restaurar después de la carga
+            refresh_interval: refresh_interval a restaurar después de la carga
+        """
+        self.elastic = elastic
+        self.alias = alias or elastic.default_index
+        self.mapeo = mapeo or MAPEO_BOLETINES
+        self.replicas = replicas
+        self.refresh_interval = refresh_interval
+
+    @property
+    def client(self):
+        return self.elastic.client
+
+    # ------------------------------------------------------------------ #
+    #   VERSIONES
+    # ------------------------------------------------------------------ #
+
+    def nombre_version(self) -> str:
+        return f"{self.alias}-v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+    def crear_version(self, nombre: Optional[str] = None, shards: int = 1) -> str:
+        """
+        Crea un índice nuevo listo para carga masiva (sin refresco ni réplicas).
+
+        Returns:
+            nombre del índice creado
+        """
+        nombre = nombre or self.nombre_version()
+        self.client.indices.create(
+            index=nombre,
+            settings={
+                "number_of_shards": shards,
+                "number_of_replicas": 0,
+                "refresh_interval": "-1",
+                "analysis": ANALISIS_ESPANOL,
+            },
+            mappings=self.mapeo,
+        )
+        return nombre
+
+    def finalizar_carga(self, nombre: str, max_segmentos: int = 1,
+                        timeout_merge: float = 600) -> None:
+        """Restaura refresco y réplicas, refresca y hace force-merge."""
+        self.client.indices.put_settings(
+            index=nombre,
+            settings={"index": {
+                "number_of_replicas": self.replicas,
+                "refresh_interval": self.refresh_interval,
+            }},
+        )
+        self.client.indices.refresh(index=nombre)
+        self.client.options(request_timeout=timeout_merge).indices.forcemerge(
+            index=nombre, max_num_segments=max_segmentos,
+        )
+        # Con réplicas en un clúster de un nodo la salud queda en yellow
+        self.client.options(request_timeout=timeout_merge).cluster.health(
+            index=nombre, wait_for_status="yellow", timeout=f"{int(timeout_merge)}s",
+        )
+
+    def indice_activo(self) -> Optional[str]:
+        """Índice al que apunta hoy el alias (None si el alias no existe)."""
+        try:
+            return next(iter(self.client.indices.get_alias(name=self.alias)), None)
+        except NotFoundError:
+            return None
+
+    def cambiar_alias(self, nombre: str) -> Optional[str]:
+        """
+        Mueve el alias al índice `nombre` en una sola llamada _aliases.
+
+        Si todavía existe un índice concreto con el nombre del alias (el
+        índice viejo de mapeo dinámico), se borra en la misma operación:
+        no hay un instante en que el nombre no resuelva.
+
+        Returns:
+            índice al que apuntaba antes el alias (o None)
+        """
+        anterior = self.indice_activo()
+        acciones: List[Dict] = []
+        if anterior and anterior != nombre:
+            acciones.append({"remove": {"index": anterior, "alias": self.alias}})
+        elif anterior is None and self.client.indices.exists(index=self.alias):
+            acciones.append({"remove_index": {"index": self.alias}})
+        acciones.append({"add": {"index": nombre, "alias": self.alias, "is_write_index": True}})
+
+        self.client.indices.update_aliases(actions=acciones)
+        ElasticSearch.invalidar_indice(self.alias)
+        return anterior
+
+    def versiones(self) -> List[Dict]:
+        """Índices versionados del alias, del más nuevo al más viejo."""
+        try:
+            resp = self.client.indices.get(index=f"{self.alias}-v*")
+        except NotFoundError:
+            return []
+        activo = self.indice_activo()
+        return [
+            {"indice": nombre, "activo": nombre == activo}
+            for nombre in sorted(resp, reverse=True)
+        ]
+
+    def borrar_versiones_viejas(self, conservar: int = 2) -> List[str]:
+        """
+        Borra las versiones más viejas sin alias, dejando `conservar`
+        versiones (la activa siempre se conserva; sirve para volver atrás
+        con cambiar_alias).
+        """
+        borrados = []
+        for v in self.versiones()[conservar:]:
+            if not v["activo"]:
+                self.client.indices.delete(index=v["indice"])
+                borrados.append(v["indice"])
+        return borrados
+
+    # ------------------------------------------------------------------ #
+    #   REINDEXACIÓN COMPLETA
+    # ------------------------------------------------------------------ #
+
+    def reindexar(self, documentos: Iterable[Dict], max_fallidos: float = 0.01,
+                  **opciones_bulk) -> Dict:
+        """
+        Carga completa sin cortar la búsqueda: índice nuevo, bulk, settings
+        de producción + force-merge y cambio atómico del alias.
+
+        Si falla más de max_fallidos (fracción) de los documentos el alias
+        no se toca y el índice nuevo se borra.
+
+        Args:
+            documentos: iterable de documentos (como los de limpiar_documento)
+            max_fallidos: fracción de documentos fallidos tolerada
+            opciones_bulk: se pasan a ElasticSearch.indexar_bulk
+
+        Returns:
+            {"success", "indice", "anterior", "bulk", "segundos"} o
+            {"success": False, "error", ...}
+        """
+        inicio = time.perf_counter()
+        try:
+            nombre = self.crear_version()
+        except Exception as e:
+            print(f"Error al crear el índice nuevo: {e}")
+            return {"success": False, "error": str(e)}
+
+        opciones_bulk.setdefault("refrescar", False)
+        resultado = self.elastic.indexar_bulk(documentos, index=nombre, **opciones_bulk)
+        total = resultado.get("indexados", 0) + resultado.get("fallidos", 0)
+
+        if not resultado.get("indexados") or resultado.get("fallidos", 0) > max_fallidos * total:
+            print(f"Carga incompleta en {nombre}; el alias {self.alias} no se cambia")
+            try:
+                self.client.indices.delete(index=nombre)
+            except Exception as e:
+                print(f"Error al borrar {nombre}: {e}")
+            return {"success": False, "error": resultado.get("error") or "carga incompleta",
+                    "indice": nombre, "bulk": resultado}
+
+        try:
+            self.finalizar_carga(nombre)
+            anterior = self.cambiar_alias(nombre)
+        except Exception as e:
+            print(f"Error al finalizar {nombre}: {e}")
+            return {"success": False, "error": str(e), "indice": nombre, "bulk": resultado}
+
+        return {
+            "success": True,
+            "indice": nombre,
+            "anterior": anterior,
+            "bulk": resultado,
+            "segundos": round(time.perf_counter() - inicio, 1),
+        }
+
+
+class IndicesPorAnio:
+    """
+    Un índice por año detrás del alias de lectura.
+
+    Cada año tiene su alias ("<alias>-2020") que apunta a una versión
+    concreta ("<alias>-2020-v20240101120000", ver GestorIndices), y todas
+    las versiones activas están además en el alias de lectura ("<alias>").
+    Las búsquedas con filtro de año van directo al índice de ese año; las
+    demás, al alias de lectura.
+
+    Los años anteriores al actual se dejan en un solo segmento y en solo
+    lectura (index.blocks.write): para corregir un año viejo se reindexa
+    ese año completo (reindexar(..., anios={2020})), que es barato. Una
+    carga incremental que toca un año congelado (asignar_indice) le levanta
+    el bloqueo; solo congelar_anteriores (reindex_boletinn.py congelar) lo
+    vuelve a poner, así una carga nunca bloquea un año en el que otro
+    proceso sigue escribiendo.
+    """
+
+    _PATRON_ANIO = re.compile(r"-(\d{4})$")
+
+    def __init__(
+        self,
+        elastic: ElasticSearch,
+        alias: Optional[str] = None,
+        mapeo: Optional[Dict] = None,
+        replicas: int = 1,
+        cache_segundos: float = 60,
+    ):
+        """
+        Args:
+            elastic: helper de Elastic
+            alias: alias de lectura (por defecto el índice por defecto del helper)
+            mapeo: mapeo de los índices por año (por defecto MAPEO_BOLETINES)
+            replicas: réplicas de los índices terminados
+            cache_segundos: vida de la lista de años conocida (para el ruteo)
+        """
+        self.elastic = elastic
+        self.alias = alias or elastic.default_index
+        self.mapeo = mapeo or MAPEO_BOLETINES
+        self.replicas = replicas
+        self.cache_segundos = cache_segundos
+        self._anios: Optional[Tuple[int, float, Dict[int, str]]] = None
+        # {anio: momento en que se vio escribible} (se revisa cada cache_segundos)
+        self._lock = threading.Lock()
+        self._escribibles: Dict[int, float] = {}
+
+    @property
+    def client(self):
+        return self.elastic.client
+
+    def alias_anio(self, anio: int) -> str:
+        return f"{self.alias}-{int(anio)}"
+
+    def gestor(self, anio: int) -> GestorIndices:
+        """GestorIndices del alias de un año (versiones, force-merge, rollback)."""
+        return GestorIndices(self.elastic, alias=self.alias_anio(anio), mapeo=self.mapeo,
+                             replicas=self.replicas)
+
+    # ------------------------------------------------------------------ #
+    #   RUTEO DE BÚSQUEDAS
+    # ------------------------------------------------------------------ #
+
+    def anios(self) -> Dict[int, str]:
+        """
+        {anio: alias del año} de los años que existen. Se guarda en memoria
+        `cache_segundos` y se recalcula antes si cambia la generación del
+        alias de lectura (cargas bulk y cambios de alias en este proceso).
+        """
+        generacion = ElasticSearch.generacion_indice(self.alias)
+        cache = self._anios
+        if cache and cache[0] == generacion and time.monotonic() - cache[1] < self.cache_segundos:
+            return cache[2]
+
+        anios: Dict[int, str] = {}
+        try:
+            resp = self.client.indices.get_alias(name=f"{self.alias}-*")
+            for datos in resp.values():
+                for nombre in datos.get("aliases", {}):
+                    m = self._PATRON_ANIO.search(nombre)
+                    if m and nombre == self.alias_anio(int(m.group(1))):
+                        anios[int(m.group(1))] = nombre
+        except NotFoundError:
+            pass
+        except Exception as e:
+            # Se sigue con lo último conocido (sin reintentar en cada búsqueda)
+            print(f"Error al listar los índices por año: {e}")
+            anios = cache[2] if cache else {}
+
+        self._anios = (generacion, time.monotonic(), anios)
+        return anios
+
+    def activo(self) -> bool:
+        """True si el alias de lectura ya está organizado por años."""
+        return bool(self.anios())
+
+    def indice_para(self, anio: Optional[int] = None) -> str:
+        """Índice a consultar: el del año si existe, si no el alias de lectura."""
+        if anio is not None:
+            return self.anios().get(int(anio), self.alias)
+        return self.alias
+
+    # ------------------------------------------------------------------ #
+    #   ESCRITURA
+    # ------------------------------------------------------------------ #
+
+    def asignar_indice(self, doc: Dict) -> Dict:
+        """
+        Pone en doc["_index"] el alias de su año (para cargas incrementales
+        con indexar_bulk). Si el año todavía no tiene índice se crea vacío;
+        si está congelado se le levanta el bloqueo de escritura (queda
+        abierto hasta el próximo congelar_anteriores). Los documentos sin
+        año válido quedan sin "_index".
+        """
+        try:
+            anio = int(doc["anio"])
+        except (KeyError, TypeError, ValueError):
+            return doc
+        anios = self.anios()
+        if anio not in anios:
+            self._crear_anio(anio)
+        else:
+            self._descongelar(anio)
+        doc["_index"] = self.alias_anio(anio)
+        return doc
+
+    def _descongelar(self, anio: int) -> None:
+        """Levanta el bloqueo de escritura del año si lo tiene."""
+        with self._lock:
+            visto = self._escribibles.get(anio)
+            if visto is not None and time.monotonic() - visto < self.cache_segundos:
+                return
+            indice = self.gestor(anio).indice_activo()
+            if indice and self._bloqueado(indice):
+                self._bloquear(indice, False)
+                print(f"Año {anio} descongelado para escribir: {indice} "
+                      "(python reindex_boletinn.py congelar lo vuelve a cerrar)")
+            self._escribibles[anio] = time.monotonic()
+
+    def _bloqueado(self, indice: str) -> bool:
+        resp = self.client.indices.get_settings(index=indice, name="index.blocks.write")
+        valor = (resp.get(indice, {}).get("settings", {}).get("index", {})
+                 .get("blocks", {}).get("write"))
+        return str(valor).lower() == "true"
+
+    def _bloquear(self, indice: str, bloquear: bool) -> None:
+        self.client.indices.put_settings(index=indice,
+                                         settings={"index": {"blocks": {"write": bloquear}}})
+
+    def _crear_anio(self, anio: int) -> None:
+        gestor = self.gestor(anio)
+        nombre = gestor.crear_version()
+        self.client.indices.put_settings(
+            index=nombre,
+            settings={"index": {"number_of_replicas": self.replicas,
+                                "refresh_interval": gestor.refresh_interval}},
+        )
+        self.client.indices.update_aliases(actions=[
+            {"add": {"index": nombre, "alias": gestor.alias, "is_write_index": True}},
+            {"add": {"index": nombre, "alias": self.alias}},
+        ])
+        print(f"Índice nuevo para {anio}: {nombre}")
+        ElasticSearch.invalidar_indice(self.alias)
+        self._anios = None
+
+    def congelar(self, indice: str) -> None:
+        """Force-merge a un segmento y solo lectura (bloquea escrituras)."""
+        self.client.options(request_timeout=600).indices.forcemerge(index=indice, max_num_segments=1)
+        self._bloquear(indice, True)
+        with self._lock:
+            self._escribibles.clear()
+
+    def congelar_anteriores(self, anio_actual: Optional[int] = None) -> List[str]:
+        """Congela los índices de todos los años anteriores a anio_actual."""
+        anio_actual = anio_actual or datetime.now().year
+        congelados = []
+        for anio in sorted(self.anios()):
+            if anio < anio_actual:
+                indice = self.gestor(anio).indice_activo()
+                if indice:
+                    self.congelar(indice)
+                    congelados.append(indice)
+        return congelados
+
+    # ------------------------------------------------------------------ #
+    #   REINDEXACIÓN POR AÑO
+    # ------------------------------------------------------------------ #
+
+    def anio_de_version(self, indice: str) -> Optional[int]:
+        """Año de una versión "<alias>-2020-v..." (None si no es de un año)."""
+        m = re.match(rf"^{re.escape(self.alias)}-(\d{{4}})-v\d+$", indice)
+        return int(m.group(1)) if m else None
+
+    def volver(self, indice: str) -> Optional[str]:
+        """
+        Rollback de un año: su alias y el alias de lectura pasan a la
+        versión `indice` en una sola operación.
+
+        Returns:
+            versión que estaba activa antes (o None)
+        """
+        anio = self.anio_de_version(indice)
+        if anio is None:
+            raise ValueError(f"{indice} no es una versión por año de {self.alias}")
+        gestor = self.gestor(anio)
+        anterior = gestor.indice_activo()
+        acciones: List[Dict] = []
+        if anterior and anterior != indice:
+            acciones.append({"remove": {"index": anterior, "alias": gestor.alias}})
+            acciones.append({"remove": {"index": anterior, "alias": self.alias}})
+        acciones.append({"add": {"index": indice, "alias": gestor.alias, "is_write_index": True}})
+        acciones.append({"add": {"index": indice, "alias": self.alias}})
+        self.client.indices.update_aliases(actions=acciones)
+        ElasticSearch.invalidar_indice(self.alias)
+        ElasticSearch.invalidar_indice(gestor.alias)
+        self._anios = None
+        self._escribibles.clear()
+        return anterior
+
+    def _heredados(self) -> List[str]:
+        """Índices del alias de lectura que no son de un año (índice único viejo)."""
+        try:
+            resp = self.client.indices.get_alias(name=self.alias)
+        except NotFoundError:
+            return [self.alias] if self.client.indices.exists(index=self.alias) else []
+        return [indice for indice in resp if self.anio_de_version(indice) is None]
+
+    def reindexar(
+        self,
+        documentos: Iterable[Dict],
+        anios: Optional[Set[int]] = None,
+        max_fallidos: float = 0.01,
+        anio_actual: Optional[int] = None,
+        **opciones_bulk,
+    ) -> Dict:
+        """
+        Carga los documentos en versiones nuevas de sus índices por año y
+        cambia todos los alias en una sola operación atómica.
+
+        Los índices por año se crean a medida que aparece cada año (la
+        entrada se recorre una sola vez). Al terminar cada índice se
+        deja en un segmento; los años anteriores a anio_actual además en
+        solo lectura.
+
+        Args:
+            documentos: iterable de documentos (con "anio")
+            anios: solo reindexar estos años (el resto de la entrada se
+                   ignora); None = todos, y además saca del alias de
+                   lectura el índice único anterior
+            max_fallidos: fracción de documentos fallidos tolerada
+            anio_actual: años menores quedan en solo lectura (por defecto el actual)
+            opciones_bulk: se pasan a ElasticSearch.indexar_bulk
+
+        Returns:
+            {"success", "indices": {anio: índice}, "anteriores", "bulk",
+             "sin_anio", "segundos"} o {"success": False, "error", ...}
+        """
+        inicio = time.perf_counter()
+        anio_actual = anio_actual or datetime.now().year
+        heredados = self._heredados()
+        if anios is not None and heredados:
+            return {"success": False,
+                    "error": f"El alias {self.alias} todavía apunta a {heredados}: "
+                             "hace falta una reindexación completa por año primero"}
+
+        nuevos: Dict[int, str] = {}
+        sin_anio = 0
+
+        def con_indice() -> Iterator[Dict]:
+            nonlocal sin_anio
+            for doc in documentos:
+                try:
+                    anio = int(doc["anio"])
+                except (KeyError, TypeError, ValueError):
+                    sin_anio += 1
+                    continue
+                if anios is not None and anio not in anios:
+                    continue
+                if anio not in nuevos:
+                    nuevos[anio] = self.gestor(anio).crear_version()
+                doc["_index"] = nuevos[anio]
+                yield doc
+
+        opciones_bulk.setdefault("refrescar", False)
+        try:
+            resultado = self.elastic.indexar_bulk(con_indice(), index=self.alias, **opciones_bulk)
+        except Exception as e:
+            resultado = {"success": False, "error": str(e), "indexados": 0}
+        if sin_anio:
+            print(f"{sin_anio} documentos sin año válido no se indexaron")
+
+        total = resultado.get("indexados", 0) + resultado.get("fallidos", 0)
+        if not resultado.get("indexados") or resultado.get("fallidos", 0) > max_fallidos * total:
+            print(f"Carga incompleta; los alias de {self.alias} no se cambian")
+            self._borrar(list(nuevos.values()))
+            return {"success": False, "error": resultado.get("error") or "carga incompleta",
+                    "bulk": resultado, "sin_anio": sin_anio}
+
+        acciones: List[Dict] = []
+        anteriores: Dict[int, Optional[str]] = {}
+        try:
+            for anio, nombre in sorted(nuevos.items()):
+                gestor = self.gestor(anio)
+                gestor.finalizar_carga(nombre)
+                if anio < anio_actual:
+                    self.client.indices.put_settings(
+                        index=nombre, settings={"index": {"blocks": {"write": True}}}
+                    )
+                anterior = gestor.indice_activo()
+                anteriores[anio] = anterior
+                if anterior:
+                    acciones.append({"remove": {"index": anterior, "alias": gestor.alias}})
+                    acciones.append({"remove": {"index": anterior, "alias": self.alias}})
+                acciones.append({"add": {"index": nombre, "alias": gestor.alias, "is_write_index": True}})
+                acciones.append({"add": {"index": nombre, "alias": self.alias}})
+
+            # Carga completa: el índice único anterior sale del alias de
+            # lectura en la misma operación (las versiones quedan para volver atrás)
+            if anios is None:
+                for indice in heredados:
+                    if indice == self.alias:
+                        acciones.append({"remove_index": {"index": indice}})
+                    else:
+                        acciones.append({"remove": {"index": indice, "alias": self.alias}})
+
+            self.client.indices.update_aliases(actions=acciones)
+        except Exception as e:
+            print(f"Error al finalizar los índices por año: {e}")
+            return {"success": False, "error": str(e), "indices": nuevos, "bulk": resultado}
+
+        ElasticSearch.invalidar_indice(self.alias)
+        for anio in nuevos:
+            ElasticSearch.invalidar_indice(self.alias_anio(anio))
+        self._anios = None
+        self._escribibles.clear()
+
+        return {
+            "success": True,
+            "indices": nuevos,
+            "anteriores": anteriores,
+            "heredados": heredados if anios is None else [],
+            "bulk": resultado,
+            "sin_anio": sin_anio,
+            "segundos": round(time.perf_counter() - inicio, 1),
+        }
+
+    def _borrar(self, indices: List[str]) -> None:
+        for indice in indices:
+            try:
+                self.client.indices.delete(index=indice)
+            except Exception as e:
+                print(f"Error al borrar {indice}: {e}")
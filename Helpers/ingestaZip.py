@@ -0,0 +1,269 @@
+import hashlib
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Dict, Iterator, List, Optional, Union
+
+from Helpers import codecJson
+from Helpers.elastic import ElasticSearch
+from Helpers.extraccionPdf import ExtractorPdf
+from Helpers.metadatosPdf import ExtractorMetadatos, parsear_portada
+
+# Miembros del ZIP que se procesan (el resto se lista como omitido)
+EXTENSIONES_ZIP = (".json", ".pdf", ".txt")
+
+
+class IngestaZip:
+    """
+    Ingesta de un ZIP directo a Elastic, sin extraerlo a disco.
+
+    Cada miembro se lee del ZIP a memoria y pasa al parser que le toca
+    (JSON, PDF con ExtractorPdf, texto) en un pool de hilos con una
+    ventana acotada de miembros en vuelo; los documentos salen en el
+    orden del ZIP y se consumen con indexar_bulk a medida que se generan.
+    La memoria queda acotada por max_bytes_en_vuelo (bytes descomprimidos
+    de los miembros en vuelo) y por max_bytes_miembro, no por el tamaño
+    del ZIP.
+
+    El ZIP puede ser cualquier archivo con seek: el stream de una subida
+    de Flask, un archivo abierto o Funciones.descargar_zip_spooled(url).
+    """
+
+    def __init__(
+        self,
+        elastic: ElasticSearch,
+        preparar: Optional[Callable[[Dict], Optional[Dict]]] = None,
+        extractor: Optional[ExtractorPdf] = None,
+        metadatos: Optional[ExtractorMetadatos] = None,
+        hilos: int = 4,
+        max_bytes_miembro: int = 32 * 1024 * 1024,
+        max_bytes_en_vuelo: int = 64 * 1024 * 1024,
+    ):
+        """
+        Args:
+            elastic: helper de Elastic
+            preparar: función dict -> documento (p. ej. limpiar_documento);
+                      si devuelve None el documento no se indexa
+            extractor: extractor de PDFs (su caché y su pool de procesos)
+            metadatos: arma el registro del boletín desde la portada del PDF
+            hilos: miembros procesados en paralelo
+            max_bytes_miembro: miembros más grandes (descomprimidos) se omiten
+            max_bytes_en_vuelo: tope de bytes leídos a la vez entre todos los
+                                miembros en vuelo (uno solo puede pasarlo)
+        """
+        self.elastic = elastic
+        self.preparar = preparar
+        self.extractor = extractor or ExtractorPdf(procesos=1)
+        self.metadatos = metadatos or ExtractorMetadatos(procesos=1)
+        self.hilos = hilos
+        self.max_bytes_miembro = max_bytes_miembro
+        self.max_bytes_en_vuelo = max_bytes_en_vuelo
+
+    # ------------------------------------------------------------------ #
+    #   MIEMBROS
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def describir(info: zipfile.ZipInfo) -> Dict:
+        """Datos de un miembro (mismo formato que Funciones.descomprimir_zip_local)."""
+        carpeta = os.path.dirname(info.filename)
+        nombre = os.path.basename(info.filename)
+        return {
+            "carpeta": carpeta if carpeta else "raiz",
+            "nombre": nombre,
+            "ruta": info.filename,
+            "extension": os.path.splitext(nombre)[1].lower(),
+            "tamano": info.file_size,
+        }
+
+    @staticmethod
+    def id_miembro(ruta: str, datos: bytes) -> str:
+        """
+        _id de un documento que no es un boletín (texto, PDF sin portada de
+        boletín): ruta en el ZIP + hash del contenido, así subir el mismo
+        ZIP otra vez actualiza el documento en lugar de duplicarlo.
+        """
+        contenido = hashlib.sha1(datos).hexdigest()
+        return "zip-" + hashlib.sha1(f"{ruta}:{contenido}".encode("utf-8")).hexdigest()
+
+    def _procesar(self, zf: zipfile.ZipFile, info: zipfile.ZipInfo, pool_pdf=None,
+                  preparar: Optional[Callable[[Dict], Optional[Dict]]] = None) -> Dict:
+        """
+        Unidad de trabajo de los hilos: lee un miembro y arma sus documentos.
+        Nunca lanza, el error viaja en el resultado. Los documentos para los
+        que preparar devuelve None se descartan (se cuentan en "omitidos").
+        """
+        extension = os.path.splitext(info.filename)[1].lower()
+        nombre = os.path.splitext(os.path.basename(info.filename))[0]
+        try:
+            with zf.open(info) as f:
+                datos = f.read()
+
+            if extension == ".json":
+                documentos = self._de_json(codecJson.loads(datos))
+            elif extension == ".pdf":
+                documentos = self._de_pdf(datos, info.filename, nombre, pool_pdf)
+            else:
+                texto = datos.decode("utf-8", errors="replace").strip()
+                documentos = [{"_id": self.id_miembro(info.filename, datos), "titulo": nombre,
+                               "contenido": texto, "tipo_archivo": "txt"}] if texto else []
+
+            omitidos = 0
+            if preparar is not None:
+                preparados = [preparar(d) for d in documentos]
+                documentos = [d for d in preparados if d is not None]
+                omitidos = len(preparados) - len(documentos)
+            return {"documentos": documentos, "omitidos": omitidos}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    @staticmethod
+    def _de_json(data) -> List[Dict]:
+        """Un boletín, una lista de boletines o {"boletines": [...]}."""
+        if isinstance(data, dict) and isinstance(data.get("boletines"), list):
+            data = data["boletines"]
+        crudos = data if isinstance(data, list) else [data]
+        return [dict(b) for b in crudos if isinstance(b, dict)]
+
+    def _de_pdf(self, datos: bytes, ruta: str, nombre: str, pool_pdf) -> List[Dict]:
+        """
+        Registro del boletín armado con su portada (como generar_metadatos.py);
+        un PDF que no es un boletín se indexa con su texto completo.
+        """
+        resultado = self.extractor.extraer_bytes(datos, ruta, pool=pool_pdf)
+        if "error" in resultado:
+            raise ValueError(resultado["error"])
+        paginas = resultado["paginas"]
+        registro = parsear_portada(paginas[0]) if paginas else {}
+        if "semana_epidemiologica" in registro and "rango_fechas" in registro:
+            return [self.metadatos.completar_registro(nombre, registro)]
+        texto = ExtractorPdf.unir(paginas)
+        if not texto:
+            return []
+        return [{"_id": self.id_miembro(ruta, datos), "titulo": nombre,
+                 "contenido": texto, "tipo_archivo": "pdf"}]
+
+    # ------------------------------------------------------------------ #
+    #   INGESTA
+    # ------------------------------------------------------------------ #
+
+    def documentos(self, zf: zipfile.ZipFile, archivos: List[Dict], pool_pdf=None,
+                   en_vuelo_por_hilo: int = 2,
+                   preparar: Optional[Callable[[Dict], Optional[Dict]]] = None) -> Iterator[Dict]:
+        """
+        Generador de documentos de todos los miembros del ZIP, en orden.
+        Completa en `archivos` (una entrada por miembro) el estado de cada
+        uno y, en "_ids", los _id que generó (para asignar los fallos).
+        preparar reemplaza a self.preparar en esta llamada.
+        """
+        preparar = preparar or self.preparar
+        limite = en_vuelo_por_hilo * self.hilos
+        with ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="zip") as pool:
+            pendientes = deque()
+            en_vuelo = 0  # bytes descomprimidos de los miembros pendientes
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                archivo = self.describir(info)
+                archivos.append(archivo)
+                if archivo["extension"] not in EXTENSIONES_ZIP:
+                    archivo["estado"] = "omitido"
+                    continue
+                if info.file_size > self.max_bytes_miembro:
+                    archivo.update(estado="omitido", error="supera el tamaño máximo por miembro")
+                    continue
+                # Si el miembro no entra en el presupuesto de bytes, espera
+                # a que terminen los anteriores antes de leerlo
+                while pendientes and en_vuelo + info.file_size > self.max_bytes_en_vuelo:
+                    en_vuelo -= pendientes[0][0]["tamano"]
+                    yield from self._entregar(*pendientes.popleft())
+                pendientes.append((archivo, pool.submit(self._procesar, zf, info, pool_pdf, preparar)))
+                en_vuelo += info.file_size
+
+                # Entrega lo que ya está listo; si la ventana se llenó, espera
+                while pendientes and (len(pendientes) > limite or pendientes[0][1].done()):
+                    en_vuelo -= pendientes[0][0]["tamano"]
+                    yield from self._entregar(*pendientes.popleft())
+
+            while pendientes:
+                yield from self._entregar(*pendientes.popleft())
+
+    @staticmethod
+    def _entregar(archivo: Dict, futuro) -> List[Dict]:
+        resultado = futuro.result()
+        if "error" in resultado:
+            print(f"Error al procesar {archivo['ruta']} del ZIP: {resultado['error']}")
+            archivo.update(estado="error", error=resultado["error"])
+            return []
+        documentos = resultado["documentos"]
+        if resultado.get("omitidos") and not documentos:
+            archivo.update(estado="omitido", error="descartado al preparar (p. ej. no es un boletín)")
+            return []
+        archivo.update(estado="indexado", documentos=len(documentos))
+        if resultado.get("omitidos"):
+            archivo["omitidos"] = resultado["omitidos"]
+        archivo["_ids"] = [d["_id"] for d in documentos if d.get("_id")]
+        return documentos
+
+    def ingerir(self, origen: Union[str, IO[bytes]], index: Optional[str] = None,
+                preparar: Optional[Callable[[Dict], Optional[Dict]]] = None,
+                procesos_pdf: int = 1, **opciones_bulk) -> Dict:
+        """
+        Procesa todos los miembros del ZIP y los indexa por bulk.
+
+        Args:
+            origen: ruta o archivo con seek del ZIP
+            index: índice destino (por defecto el del helper)
+            preparar: reemplaza a self.preparar en esta carga
+            procesos_pdf: > 1 para extraer los PDFs en un pool de procesos
+            opciones_bulk: se pasan a ElasticSearch.indexar_bulk
+
+        Returns:
+            {"success", "archivos": [{"nombre", "carpeta", "extension",
+             "tamano", "estado", "documentos"}], "indexados", "fallidos",
+             "errores", "segundos"} o {"success": False, "error"}
+        """
+        inicio = time.perf_counter()
+        archivos: List[Dict] = []
+        pool_pdf = None
+        try:
+            with zipfile.ZipFile(origen) as zf:
+                if procesos_pdf > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+                    pool_pdf = ProcessPoolExecutor(max_workers=procesos_pdf)
+                opciones_bulk.setdefault("max_errores_reportados", 1000)
+                resultado = self.elastic.indexar_bulk(
+                    self.documentos(zf, archivos, pool_pdf, preparar=preparar),
+                    index=index, **opciones_bulk,
+                )
+        except zipfile.BadZipFile as e:
+            print(f"Error al leer el ZIP: {e}")
+            return {"success": False, "error": f"ZIP inválido: {e}"}
+        except Exception as e:
+            print(f"Error en la ingesta del ZIP: {e}")
+            return {"success": False, "error": str(e), "archivos": self._sin_ids(archivos)}
+        finally:
+            if pool_pdf is not None:
+                pool_pdf.shutdown()
+
+        # Documentos rechazados por Elastic -> estado del miembro que los generó
+        fallidos = {e.get("_id") for e in resultado.get("errores", []) if e.get("_id")}
+        for archivo in archivos:
+            malos = [i for i in archivo.get("_ids", []) if i in fallidos]
+            if malos:
+                archivo.update(estado="error", error=f"{len(malos)} documento(s) rechazados por Elastic")
+
+        return {
+            "success": bool(resultado.get("success")) and not any(a.get("estado") == "error" for a in archivos),
+            "archivos": self._sin_ids(archivos),
+            "indexados": resultado.get("indexados", 0),
+            "fallidos": resultado.get("fallidos", 0),
+            "errores": resultado.get("errores", []),
+            "segundos": round(time.perf_counter() - inicio, 2),
+        }
+
+    @staticmethod
+    def _sin_ids(archivos: List[Dict]) -> List[Dict]:
+        return [{k: v for k, v in a.items() if k != "_ids"} for a in archivos]
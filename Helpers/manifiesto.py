@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from Helpers import codecJson
+from Helpers.elastic import ElasticSearch
+from Helpers.funciones import Funciones
+
+
+class ManifiestoIngesta:
+    """
+    Manifiesto local de lo que ya se indexó, para cargas incrementales.
+
+    Por cada archivo de la carpeta (y sus subcarpetas) guarda ruta
+    relativa, mtime, tamaño, hash (sha256) del contenido y los _id con que
+    quedaron en Elastic sus boletines (un archivo puede traer una lista,
+    como en Funciones.iterar_boletines). En cada
+    corrida solo se envían los archivos nuevos o modificados (upsert con
+    su _id determinístico) y se borran de Elastic los que desaparecieron.
+
+    mtime y tamaño iguales se toman como "sin cambios" sin leer el archivo;
+    si cambiaron se compara el hash, así un `touch` no reindexa nada.
+    """
+
+    VERSION = 1
+
+    def __init__(self, ruta: str, index: str):
+        """
+        Args:
+            ruta: archivo JSON del manifiesto
+            index: índice (o alias) al que corresponde; si cambia, el
+                   manifiesto no sirve y todo se considera nuevo
+        """
+        self.ruta = ruta
+        self.index = index
+        self.archivos: Dict[str, Dict] = {}
+        self.cargar()
+
+    # ------------------------------------------------------------------ #
+    #   PERSISTENCIA
+    # ------------------------------------------------------------------ #
+
+    def cargar(self) -> None:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return
+        if datos.get("version") == self.VERSION and datos.get("index") == self.index:
+            self.archivos = datos.get("archivos", {})
+        else:
+            print(f"Manifiesto {self.ruta} es de otro índice o versión: se ignora")
+
+    def guardar(self) -> None:
+        """Escritura atómica (archivo temporal + os.replace)."""
+        directorio = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(directorio, exist_ok=True)
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "index": self.index, "archivos": self.archivos},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporal, self.ruta)
+
+    @staticmethod
+    def documentos_de(entrada: Dict) -> Dict[str, Optional[str]]:
+        """{_id: _index} de una entrada (las entradas viejas guardan un solo _id)."""
+        if "documentos" in entrada:
+            return entrada["documentos"]
+        if entrada.get("_id"):
+            return {entrada["_id"]: entrada.get("_index")}
+        return {}
+
+    @staticmethod
+    def hash_archivo(ruta: str, bloque: int = 1024 * 1024) -> str:
+        h = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for parte in iter(lambda: f.read(bloque), b""):
+                h.update(parte)
+        return h.hexdigest()
+
+    # ------------------------------------------------------------------ #
+    #   DIFERENCIAS
+    # ------------------------------------------------------------------ #
+
+    def comparar(self, carpeta: str, extension: str = ".json") -> Dict:
+        """
+        Compara la carpeta con el manifiesto.
+
+        Returns:
+            {"cambiados": [{"rel", "ruta", "mtime_ns", "size", "hash"}, ...],
+             "borrados": [rel, ...], "tocados": {rel: entrada}, "sin_cambios": n}
+            ("tocados" son archivos con mtime nuevo pero el mismo contenido)
+        """
+        cambiados: List[Dict] = []
+        tocados: Dict[str, Dict] = {}
+        vistos: Set[str] = set()
+        sin_cambios = 0
+
+        # Mismo recorrido que --completo (Funciones.iterar_boletines)
+        for ruta in Funciones.recorrer_archivos(carpeta, extension):
+            rel = os.path.relpath(ruta, carpeta).replace(os.sep, "/")
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                continue
+            vistos.add(rel)
+            previo = self.archivos.get(rel)
+
+            if previo and previo["mtime_ns"] == st.st_mtime_ns and previo["size"] == st.st_size:
+                sin_cambios += 1
+                continue
+
+            digest = self.hash_archivo(ruta)
+            if previo and previo["hash"] == digest:
+                tocados[rel] = dict(previo, mtime_ns=st.st_mtime_ns, size=st.st_size)
+                sin_cambios += 1
+                continue
+
+            cambiados.append({"rel": rel, "ruta": ruta, "mtime_ns": st.st_mtime_ns,
+                              "size": st.st_size, "hash": digest})
+
+        borrados = sorted(set(self.archivos) - vistos)
+        return {"cambiados": sorted(cambiados, key=lambda c: c["rel"]), "borrados": borrados,
+                "tocados": tocados, "sin_cambios": sin_cambios}
+
+    # ------------------------------------------------------------------ #
+    #   SINCRONIZACIÓN
+    # ------------------------------------------------------------------ #
+
+    def sincronizar(
+        self,
+        elastic: ElasticSearch,
+        carpeta: str,
+        preparar: Callable[[Dict], Dict],
+        enriquecer: Optional[Callable[[Iterable[Dict]], Iterable[Dict]]] = None,
+        **opciones_bulk,
+    ) -> Dict:
+        """
+        Lleva a Elastic solo lo que cambió en la carpeta desde la última corrida.
+
+        Args:
+            elastic: helper de Elastic
+            carpeta: carpeta con los JSON de los boletines
+            preparar: función dict -> documento con _id determinístico
+                      (p. ej. limpiar_documento de cargarjson.py); si no
+                      pone _id se usa el nombre del archivo (más "-n"
+                      desde el segundo boletín de una lista)
+            enriquecer: generador opcional aplicado a las acciones antes del
+                        bulk (p. ej. Embeddings.agregar_vectores)
+            opciones_bulk: se pasan a ElasticSearch.indexar_bulk
+
+        Returns:
+            {"success", "nuevos", "modificados", "borrados", "sin_cambios",
+             "fallidos", "segundos", "bulk"}
+        """
+        inicio = time.perf_counter()
+        plan = self.comparar(carpeta)
+        self.archivos.update(plan["tocados"])
+
+        # rel -> {_id: "_index" o None} de los cambiados que se pudieron leer
+        # ("_index" p. ej. el alias del año)
+        nuevos_ids: Dict[str, Dict[str, Optional[str]]] = {}
+        nuevos = sum(1 for c in plan["cambiados"] if c["rel"] not in self.archivos)
+        resumen = {
+            "nuevos": nuevos,
+            "modificados": len(plan["cambiados"]) - nuevos,
+            "borrados": len(plan["borrados"]),
+            "sin_cambios": plan["sin_cambios"],
+            "fallidos": 0,
+        }
+
+        if not plan["cambiados"] and not plan["borrados"]:
+            if plan["tocados"]:
+                self.guardar()
+            resumen.update(success=True, segundos=round(time.perf_counter() - inicio, 4))
+            return resumen
+
+        # _id que siguen en uso por archivos que no se borran (dos archivos
+        # pueden compartir anio + semana: no se borra un _id que otro usa)
+        cambiados_rel = {c["rel"] for c in plan["cambiados"]}
+        borrados_rel = set(plan["borrados"])
+        ids_en_uso = {
+            doc_id for rel, e in self.archivos.items()
+            if rel not in borrados_rel and rel not in cambiados_rel
+            for doc_id in self.documentos_de(e)
+        }
+
+        def acciones() -> Iterator[Dict]:
+            for c in plan["cambiados"]:
+                try:
+                    boletines = Funciones.boletines_de_json(codecJson.leer(c["ruta"]))
+                except (OSError, ValueError) as e:
+                    print(f"Error leyendo {c['ruta']}: {e}")
+                    continue
+                if not boletines:
+                    print(f"Formato no reconocido en {c['rel']}. Se omite.")
+                    continue
+                base = os.path.splitext(c["rel"])[0]
+                documentos = nuevos_ids[c["rel"]] = {}
+                for n, datos in enumerate(boletines):
+                    doc = preparar(datos)
+                    doc.setdefault("_id", f"{base}-{n}" if n else base)
+                    documentos[doc["_id"]] = doc.get("_index") or None
+                    ids_en_uso.add(doc["_id"])
+                    yield doc
+
+            # Borrados: archivos que ya no están y _id que cambiaron
+            # (al índice donde quedaron, si se indexaron con "_index"). Un
+            # cambiado que no se pudo leer no produjo _id: sus documentos
+            # siguen en Elastic hasta que el archivo vuelva a ser válido.
+            indice_viejo: Dict[str, Optional[str]] = {}
+            for rel in plan["borrados"]:
+                indice_viejo.update(self.documentos_de(self.archivos[rel]))
+            for rel in cambiados_rel:
+                if rel in self.archivos and rel in nuevos_ids:
+                    indice_viejo.update(self.documentos_de(self.archivos[rel]))
+            for doc_id in sorted(set(indice_viejo) - ids_en_uso):
+                borrado = {"_id": doc_id, "_op_type": "delete"}
+                if indice_viejo[doc_id]:
+                    borrado["_index"] = indice_viejo[doc_id]
+                yield borrado
+
+        total = len(plan["cambiados"]) + len(plan["borrados"])
+        opciones_bulk.setdefault("index", self.index)
+        opciones_bulk.setdefault("max_errores_reportados", total + 1)
+        documentos = acciones()
+        if enriquecer is not None:
+            documentos = enriquecer(documentos)
+        resultado = elastic.indexar_bulk(documentos, **opciones_bulk)
+        fallidos_ids = {e.get("_id") for e in resultado.get("errores", [])}
+
+        # Solo se registra lo que quedó bien: lo fallido se reintenta la próxima vez
+        for c in plan["cambiados"]:
+            documentos = nuevos_ids.get(c["rel"])
+            if documentos and not fallidos_ids.intersection(documentos):
+                self.archivos[c["rel"]] = {"mtime_ns": c["mtime_ns"], "size": c["size"],
+                                           "hash": c["hash"], "documentos": documentos}
+        for rel in plan["borrados"]:
+            if not fallidos_ids.intersection(self.documentos_de(self.archivos[rel])):
+                del self.archivos[rel]
+        self.guardar()
+
+        resumen.update(
+            success=resultado.get("success", False) or not resultado.get("fallidos"),
+            fallidos=resultado.get("fallidos", 0),
+            segundos=round(time.perf_counter() - inicio, 4),
+            bulk=resultado,
+        )
+        return resumen
@@ -0,0 +1,459 @@
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from Helpers import codecJson
+from Helpers.extraccionPdf import ExtractorPdf, hash_archivo
+from Helpers.funciones import Funciones
+
+# Los PDFs se publican en la biblioteca digital del INS con el mismo nombre
+URL_BOLETINES = "https://www.ins.gov.co/BibliotecaDigital/"
+
+# ---------------------------------------------------------------------- #
+#   PATRONES (compilados una vez por proceso)
+# ---------------------------------------------------------------------- #
+
+# "2020-boletin-epidemiologico-semana-29"
+_NOMBRE = re.compile(r"(?P<anio>\d{4}).*?semana-(?P<semana>\d{1,2})\b", re.IGNORECASE)
+
+# "Semana epidemiológica 18" (también "epidmiológica", con erratas de la
+# portada). Primero la que va seguida del rango de fechas: un título de
+# la portada puede mencionar otra semana ("... a semana epidemiológica 15").
+_SEMANA = re.compile(r"Semana\s+ep\w*gica\s+(\d{1,2})\b", re.IGNORECASE)
+_SEMANA_CON_RANGO = re.compile(r"Semana\s+ep\w*gica\s+(\d{1,2})\s*(?:/\s*|\n\s*)(?=\d)", re.IGNORECASE)
+
+# "29 de nov. al 5 de dic. de 2020", "27 de febrero a 5 de marzo de 2022",
+# "29 de diciembre de 2019 al 4 de enero de 2020"
+_MES = r"[a-záéíóú]+\.?"
+_RANGO = re.compile(
+    rf"(\d{{1,2}})(?:\s+de\s+({_MES}))?(?:\s+de\s+(\d{{4}}))?\s+al?\s+"
+    rf"(\d{{1,2}})\s+de\s+({_MES})\s+de\s+(\d{{4}})",
+    re.IGNORECASE,
+)
+
+# PyPDF2 separa a veces los dígitos de un número: "1 1 al 17 de abril"
+_DIGITOS_SEPARADOS = re.compile(r"\b(\d) (\d)\b")
+
+_DOI = re.compile(r"https?://doi\.org/10\.\d{4,}/[\w.()/-]+|\b10\.33610/[\w.-]+", re.IGNORECASE)
+
+_ESPACIOS = re.compile(r"\s+")
+
+# Secciones fijas de la portada -> nombre normalizado en temas_portada
+TEMAS_PORTADA = [
+    ("Situación nacional", re.compile(r"Situaci[oó]n\s+nacional", re.IGNORECASE)),
+    ("Mortalidad", re.compile(r"^Mortalidad\s*$", re.MULTILINE)),
+    ("Eventos trazadores", re.compile(r"Eventos\s+trazadores", re.IGNORECASE)),
+    ("Brotes", re.compile(r"^Brotes\s*$", re.MULTILINE)),
+    ("Situación COVID-19", re.compile(r"^Situaci[oó]n\s*\n?\s*COVID-?19\s*\n\s*Colombia", re.MULTILINE)),
+    ("Sarampión", re.compile(r"^Sarampi[oó]n\s*\n\s*Seguimiento", re.MULTILINE)),
+    ("Tablas de mando", re.compile(r"T\s?ablas\s+de\s+mando", re.IGNORECASE)),
+    ("Eventos de interés en salud pública",
+     re.compile(r"eventos\s+de\s+inter[eé]s\s+en\s+salud\s+p[uú]blica", re.IGNORECASE)),
+]
+
+# Portada de 2020-2022: el tema central es el primer bloque después del
+# texto fijo del recuadro "Tablas de mando"
+_FIN_RECUADROS = "brotes en salud pública."
+
+# Portada impresa desde la web (2021): el tema es el último bloque de
+# líneas cortas (el título en la columna derecha)
+_EVENTO_CENTRAL = re.compile(r"EVENTO\s+CENTRAL")
+_LINEA_TITULO = 34
+_FIN_PARRAFO = (".", ":", ")")
+
+# Una línea que empieza en mayúscula abre otro tema, salvo que la
+# anterior termine en coma o en un conector ("... de", "... y")
+_CONECTORES = {"de", "del", "la", "las", "los", "el", "y", "e", "en", "a", "al", "por", "con"}
+_PALABRAS_TEMA = 4
+_MAX_TEMA = 200
+
+
+def _entero(valor) -> Optional[int]:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _comparable(campo: str, valor):
+    """Valor de un campo normalizado para comparar ("01" == 1, rangos por fechas)."""
+    if campo in ("anio", "semana_epidemiologica"):
+        return _entero(valor)
+    if campo == "rango_fechas":
+        return Funciones.rango_a_fechas(valor or "") or valor
+    return valor
+
+
+def datos_de_nombre(nombre: str) -> Dict:
+    """{"anio", "semana"} del nombre del archivo ({} si no los tiene)."""
+    m = _NOMBRE.search(os.path.basename(nombre))
+    if not m:
+        return {}
+    return {"anio": int(m.group("anio")), "semana": int(m.group("semana"))}
+
+
+def _mes(texto: str) -> Optional[str]:
+    """Nombre completo del mes ("sept." -> "septiembre", "dic" -> "diciembre")."""
+    texto = texto.lower().rstrip(".")
+    for mes in Funciones.MESES:
+        if mes.startswith(texto) and len(texto) >= 3:
+            return mes
+    return None
+
+
+def normalizar_rango(texto: str) -> Optional[str]:
+    """
+    Rango de fechas de la portada en el formato de rango_fechas
+    ("29 de noviembre al 5 de diciembre de 2020"), o None.
+    """
+    m = _RANGO.search(_DIGITOS_SEPARADOS.sub(r"\1\2", texto or ""))
+    if not m:
+        return None
+    dia_ini, mes_ini, anio_ini, dia_fin, mes_fin, anio_fin = m.groups()
+    mes_fin = _mes(mes_fin)
+    if mes_fin is None:
+        return None
+    inicio = str(int(dia_ini))
+    if mes_ini:
+        mes_ini = _mes(mes_ini)
+        if mes_ini is None:
+            return None
+        inicio += f" de {mes_ini}"
+    if anio_ini:
+        inicio += f" de {anio_ini}"
+    return f"{inicio} al {int(dia_fin)} de {mes_fin} de {anio_fin}"
+
+
+def anio_de_rango(rango: Optional[str]) -> Optional[int]:
+    """
+    Año epidemiológico de un rango: el del miércoles de la semana (el año
+    que tiene más días de esa semana; la semana 1 de 2020 empieza en 2019).
+    """
+    fechas = Funciones.rango_a_fechas(rango or "")
+    if not fechas:
+        return None
+    return (datetime.strptime(fechas[0], "%Y-%m-%d") + timedelta(days=3)).year
+
+
+def _limpiar(texto: str) -> str:
+    return _ESPACIOS.sub(" ", texto).strip(" •-–")
+
+
+def _primer_tema(lineas: List[str]) -> Optional[str]:
+    """Primer tema de un bloque de líneas (corta en la viñeta o título siguiente)."""
+    partes: List[str] = []
+    for linea in lineas:
+        limpia = _limpiar(linea)
+        if not limpia:
+            if partes:
+                break
+            continue
+        if partes:
+            anterior = partes[-1]
+            nueva_vineta = linea.lstrip().startswith("•")
+            ultima = anterior.rsplit(" ", 1)[-1].lower()
+            nuevo_titulo = (
+                limpia[0].isupper()
+                and not anterior.endswith((",", "-", "/"))
+                and ultima not in _CONECTORES
+                and len(" ".join(partes).split()) >= _PALABRAS_TEMA
+            )
+            if nueva_vineta or nuevo_titulo:
+                break
+        partes.append(limpia)
+    tema = " ".join(partes)[:_MAX_TEMA].strip()
+    return tema or None
+
+
+def _tema_central(texto: str) -> Optional[str]:
+    if _EVENTO_CENTRAL.search(texto):
+        lineas = [l.strip() for l in texto.rstrip().split("\n")]
+        titulo: List[str] = []
+        for linea in reversed(lineas):
+            if (not linea or len(linea) > _LINEA_TITULO or linea.endswith(_FIN_PARRAFO)
+                    or linea == "Análisis" or _EVENTO_CENTRAL.search(linea)):
+                break
+            titulo.insert(0, linea)
+        # Restos del párrafo anterior ("2021", "1).") antes del título
+        while titulo and not titulo[0][0].isalpha():
+            titulo.pop(0)
+        return _limpiar(" ".join(titulo))[:_MAX_TEMA] or None
+
+    fin = texto.lower().rfind(_FIN_RECUADROS)
+    if fin < 0:
+        return None
+    return _primer_tema(texto[fin + len(_FIN_RECUADROS):].split("\n"))
+
+
+def parsear_portada(texto: str) -> Dict:
+    """
+    Campos del boletín a partir del texto de la portada (página 1).
+
+    Returns:
+        dict con los campos encontrados (semana_epidemiologica, rango_fechas,
+        tema_central, publicacion_en_linea, temas_portada, anio)
+    """
+    registro: Dict = {}
+
+    m = _SEMANA_CON_RANGO.search(texto) or _SEMANA.search(texto)
+    if m:
+        registro["semana_epidemiologica"] = f"{int(m.group(1)):02d}"  # como en data/*.json
+
+    # El rango va después de la semana (si se encontró)
+    rango = normalizar_rango(texto[m.start():] if m else texto) or normalizar_rango(texto)
+    if rango:
+        registro["rango_fechas"] = rango
+
+    tema = _tema_central(texto)
+    if tema:
+        registro["tema_central"] = tema
+
+    m = _DOI.search(texto)
+    if m:
+        doi = m.group(0)
+        registro["publicacion_en_linea"] = doi if doi.startswith("http") else f"https://doi.org/{doi}"
+
+    temas = [nombre for nombre, patron in TEMAS_PORTADA if patron.search(texto)]
+    if temas:
+        registro["temas_portada"] = temas
+
+    anio = anio_de_rango(rango)
+    if anio:
+        registro["anio"] = anio
+
+    return registro
+
+
+def _portada(ruta: str, carpeta_cache: Optional[str]) -> Dict:
+    """
+    Unidad de trabajo del pool: texto de la portada (desde la caché de
+    ExtractorPdf si el PDF ya se extrajo, si no solo la página 1) y sus
+    campos. Nunca lanza, el error viaja en el resultado.
+    """
+    try:
+        texto = None
+        if carpeta_cache:
+            entrada = ExtractorPdf(carpeta_cache=carpeta_cache, procesos=1).leer_cache(hash_archivo(ruta))
+            if entrada and entrada["paginas"]:
+                texto = entrada["paginas"][0]
+        if texto is None:
+            import PyPDF2  # import lazy
+
+            with open(ruta, "rb") as f:
+                texto = PyPDF2.PdfReader(f).pages[0].extract_text() or ""
+        return {"ruta": ruta, "registro": parsear_portada(texto)}
+    except Exception as e:
+        return {"ruta": ruta, "error": f"{type(e).__name__}: {e}"}
+
+
+class ExtractorMetadatos:
+    """
+    Genera los registros de boletín (data/*.json) a partir de la portada
+    de cada PDF, en paralelo y con patrones precompilados.
+
+    Los registros se escriben a medida que salen del pool (escritura
+    atómica, un archivo por PDF con su mismo nombre), así una corrida
+    cortada deja escritos los que ya terminó. Además se arma un reporte
+    de validación con los campos que no coinciden con el nombre del
+    archivo o con el registro que ya existía.
+    """
+
+    CAMPOS_COMPARADOS = ["anio", "semana_epidemiologica", "rango_fechas"]
+
+    def __init__(self, procesos: int = 0, carpeta_cache: Optional[str] = ".cache_pdf",
+                 url_base: str = URL_BOLETINES):
+        """
+        Args:
+            procesos: procesos del pool (0: uno por CPU; 1: sin pool)
+            carpeta_cache: caché de ExtractorPdf a reutilizar (None: no leerla)
+            url_base: prefijo de pdf_url
+        """
+        self.procesos = procesos or os.cpu_count() or 1
+        self.carpeta_cache = carpeta_cache
+        self.url_base = url_base
+
+    # ------------------------------------------------------------------ #
+    #   EXTRACCIÓN
+    # ------------------------------------------------------------------ #
+
+    def extraer(self, rutas: Iterable[str], lote: int = 4) -> Iterator[Dict]:
+        """
+        Registros de varios PDFs, en el orden de `rutas`.
+
+        Yields:
+            {"ruta", "registro"} o {"ruta", "error"}
+        """
+        rutas = list(rutas)
+        if self.procesos <= 1 or len(rutas) <= 1:
+            for ruta in rutas:
+                yield self._completar(_portada(ruta, self.carpeta_cache))
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+            for resultado in pool.map(_portada, rutas, [self.carpeta_cache] * len(rutas), chunksize=lote):
+                yield self._completar(resultado)
+
+    def _completar(self, resultado: Dict) -> Dict:
+        if "error" in resultado:
+            return resultado
+        nombre = os.path.splitext(os.path.basename(resultado["ruta"]))[0]
+        self.completar_registro(nombre, resultado["registro"])
+        return resultado
+
+    def completar_registro(self, nombre: str, registro: Dict) -> Dict:
+        """
+        Agrega a un registro de parsear_portada los campos fijos y los que
+        faltan a partir del nombre del PDF (sin extensión).
+        """
+        del_nombre = datos_de_nombre(nombre)
+        if "anio" not in registro and "anio" in del_nombre:
+            registro["anio"] = del_nombre["anio"]
+        if "semana_epidemiologica" not in registro and "semana" in del_nombre:
+            registro["semana_epidemiologica"] = f"{del_nombre['semana']:02d}"
+        registro["tipo_archivo"] = "pdf"
+        registro["pdf_url"] = f"{self.url_base}{nombre}.pdf"
+        return registro
+
+    # ------------------------------------------------------------------ #
+    #   VALIDACIÓN
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def validar(nombre: str, registro: Dict, existente: Optional[Dict] = None) -> List[Dict]:
+        """
+        Diferencias de un registro con el nombre del archivo y con el
+        registro existente (si hay).
+
+        Returns:
+            [{"archivo", "campo", "nombre", "pdf", "json"}] (las claves que
+            no aplican no van)
+        """
+        del_nombre = datos_de_nombre(nombre)
+        fuentes = {"pdf": registro} if registro else {}
+        if existente:
+            fuentes["json"] = existente
+        diferencias = []
+
+        for campo in ExtractorMetadatos.CAMPOS_COMPARADOS:
+            valores = {}  # fuente -> valor tal como está
+            clave_nombre = {"anio": "anio", "semana_epidemiologica": "semana"}.get(campo)
+            if clave_nombre in del_nombre:
+                valores["nombre"] = del_nombre[clave_nombre]
+            for fuente, doc in fuentes.items():
+                if doc.get(campo) is not None:
+                    valores[fuente] = doc[campo]
+            if len({str(_comparable(campo, v)) for v in valores.values()}) > 1:
+                diferencias.append({"archivo": nombre, "campo": campo, **valores})
+
+        # El año de cada registro contra su propio rango de fechas
+        for fuente, doc in fuentes.items():
+            anio_rango = anio_de_rango(doc.get("rango_fechas"))
+            if anio_rango and _entero(doc.get("anio")) not in (None, anio_rango):
+                diferencias.append({"archivo": nombre, "campo": "anio/rango_fechas", fuente: {
+                    "anio": doc.get("anio"), "rango_fechas": doc.get("rango_fechas"),
+                }})
+        return diferencias
+
+    # ------------------------------------------------------------------ #
+    #   GENERACIÓN
+    # ------------------------------------------------------------------ #
+
+    def generar(self, carpeta_pdfs: str, carpeta_json: str, sobrescribir: bool = False,
+                ruta_reporte: Optional[str] = None) -> Dict:
+        """
+        Extrae los registros de todos los PDFs de carpeta_pdfs y los
+        escribe en carpeta_json como <nombre del PDF>.json.
+
+        Los registros existentes no se tocan salvo sobrescribir=True (y
+        solo si cambió algo); igual se comparan en el reporte. Al
+        sobrescribir solo cambian los campos leídos del PDF, el resto del
+        registro existente se conserva. Los JSON sin PDF también se
+        validan contra su nombre.
+
+        Args:
+            carpeta_pdfs: carpeta con los PDFs
+            carpeta_json: carpeta de los registros (p. ej. data/)
+            sobrescribir: actualizar los registros existentes
+            ruta_reporte: JSON con el reporte de validación (None: no se escribe)
+
+        Returns:
+            {"success", "pdfs", "escritos", "sin_cambios", "omitidos",
+             "errores", "diferencias", "segundos", "pdfs_por_minuto"}
+        """
+        inicio = time.perf_counter()
+        try:
+            rutas = sorted(
+                os.path.join(carpeta_pdfs, f) for f in os.listdir(carpeta_pdfs)
+                if f.lower().endswith(".pdf")
+            )
+            os.makedirs(carpeta_json, exist_ok=True)
+        except OSError as e:
+            print(f"Error al listar {carpeta_pdfs}: {e}")
+            return {"success": False, "error": str(e)}
+
+        resumen = {"pdfs": len(rutas), "escritos": 0, "sin_cambios": 0, "omitidos": 0, "errores": []}
+        diferencias: List[Dict] = []
+        vistos = set()
+
+        for resultado in self.extraer(rutas):
+            nombre = os.path.splitext(os.path.basename(resultado["ruta"]))[0]
+            vistos.add(nombre)
+            if "error" in resultado:
+                print(f"Error al leer la portada de {resultado['ruta']}: {resultado['error']}")
+                resumen["errores"].append({"archivo": nombre, "error": resultado["error"]})
+                continue
+
+            registro = resultado["registro"]
+            ruta_json = os.path.join(carpeta_json, f"{nombre}.json")
+            existente = self._leer(ruta_json)
+            diferencias.extend(self.validar(nombre, registro, existente))
+
+            if existente is not None:
+                # Solo se reemplazan los campos que se leyeron del PDF; lo que
+                # no está en la portada (p. ej. el DOI) se conserva
+                registro = {**existente, **registro}
+                if registro == existente or not sobrescribir:
+                    resumen["sin_cambios" if registro == existente else "omitidos"] += 1
+                    continue
+            self._escribir(ruta_json, registro)
+            resumen["escritos"] += 1
+
+        # Registros sin PDF: solo contra su nombre y su propio rango
+        for archivo in sorted(os.listdir(carpeta_json)):
+            nombre, extension = os.path.splitext(archivo)
+            if extension.lower() != ".json" or nombre in vistos:
+                continue
+            existente = self._leer(os.path.join(carpeta_json, archivo))
+            if existente is not None:
+                diferencias.extend(self.validar(nombre, {}, existente))
+
+        segundos = time.perf_counter() - inicio
+        resumen.update({
+            "success": not resumen["errores"],
+            "diferencias": diferencias,
+            "segundos": round(segundos, 2),
+            "pdfs_por_minuto": round(len(rutas) * 60 / segundos) if segundos else None,
+        })
+        if ruta_reporte:
+            self._escribir(ruta_reporte, resumen)
+        return resumen
+
+    @staticmethod
+    def _leer(ruta: str) -> Optional[Dict]:
+        try:
+            datos = codecJson.leer(ruta)
+        except (OSError, ValueError):
+            return None
+        return datos if isinstance(datos, dict) else None
+
+    @staticmethod
+    def _escribir(ruta: str, datos: Dict) -> None:
+        """Escritura atómica (temporal + os.replace), con el formato de data/."""
+        temporal = f"{ruta}.tmp"
+        codecJson.guardar(temporal, datos, indentar=True)
+        os.replace(temporal, ruta)
+
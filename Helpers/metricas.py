@@ -0,0 +1,193 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Buckets por defecto (segundos): de 1 ms a 10 s
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _etiquetas(etiquetas: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    partes = [f'{k}="{_escapar(v)}"' for k, v in etiquetas]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Contador monotónico con etiquetas (tipo counter de Prometheus)."""
+
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._valores: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1, **etiquetas) -> None:
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def lineas(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.nombre}{_etiquetas(clave)} {_numero(valor)}"
+                for clave, valor in sorted(self._valores.items())
+            ]
+
+
+class Histograma:
+    """Histograma acumulado con etiquetas (tipo histogram de Prometheus)."""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, buckets: Iterable[float] = BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(sorted(buckets))
+        # clave -> [conteos por bucket..., conteo +Inf, suma]
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **etiquetas) -> None:
+        clave = tuple(sorted(etiquetas.items()))
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[i] += 1
+            serie[-1] += valor
+
+    def lineas(self) -> List[str]:
+        salida = []
+        with self._lock:
+            for clave, serie in sorted(self._series.items()):
+                acumulado = 0
+                for limite, conteo in zip(self.buckets + (float("inf"),), serie[:-1]):
+                    acumulado += conteo
+                    le = 'le="%s"' % _numero(limite)
+                    salida.append(f"{self.nombre}_bucket{_etiquetas(clave, le)} {acumulado}")
+                salida.append(f"{self.nombre}_sum{_etiquetas(clave)} {_numero(serie[-1])}")
+                salida.append(f"{self.nombre}_count{_etiquetas(clave)} {acumulado}")
+        return salida
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas del proceso, exportable en formato de texto de
+    Prometheus (GET /metrics).
+
+    Además de contadores e histogramas admite "colectores": funciones que
+    en cada exportación devuelven valores ya calculados en otro lado (por
+    ejemplo los contadores de CacheResultados).
+    """
+
+    def __init__(self):
+        self._metricas: Dict[str, object] = {}
+        self._colectores: List[Callable[[], Iterable[Tuple[str, str, str, float]]]] = []
+        self._lock = threading.Lock()
+
+    def contador(self, nombre: str, ayuda: str) -> Contador:
+        with self._lock:
+            if nombre not in self._metricas:
+                self._metricas[nombre] = Contador(nombre, ayuda)
+            return self._metricas[nombre]
+
+    def histograma(self, nombre: str, ayuda: str,
+                   buckets: Iterable[float] = BUCKETS_SEGUNDOS) -> Histograma:
+        with self._lock:
+            if nombre not in self._metricas:
+                self._metricas[nombre] = Histograma(nombre, ayuda, buckets)
+            return self._metricas[nombre]
+
+    def agregar_colector(self, colector: Callable[[], Iterable[Tuple[str, str, str, float]]]) -> None:
+        """colector() -> [(nombre, tipo, ayuda, valor), ...]"""
+        self._colectores.append(colector)
+
+    def exportar(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus."""
+        salida = []
+        with self._lock:
+            metricas = list(self._metricas.values())
+        for m in metricas:
+            salida.append(f"# HELP {m.nombre} {m.ayuda}")
+            salida.append(f"# TYPE {m.nombre} {m.tipo}")
+            salida.extend(m.lineas())
+
+        for colector in self._colectores:
+            try:
+                for nombre, tipo, ayuda, valor in colector():
+                    salida.append(f"# HELP {nombre} {ayuda}")
+                    salida.append(f"# TYPE {nombre} {tipo}")
+                    salida.append(f"{nombre} {_numero(valor)}")
+            except Exception as e:
+                print(f"Error en colector de métricas: {e}")
+
+        return "\n".join(salida) + "\n"
+
+
+# Registro por defecto del proceso
+registro = RegistroMetricas()
+
+etapas_busqueda = registro.histograma(
+    "busqueda_etapa_segundos",
+    "Duración de cada etapa de una búsqueda (parseo, construccion, elastic, serializacion)",
+)
+operaciones_elastic = registro.histograma(
+    "elastic_operacion_segundos",
+    "Duración (reloj de pared) de las operaciones de Helpers.elastic",
+)
+errores_elastic = registro.contador(
+    "elastic_operacion_errores_total",
+    "Operaciones de Helpers.elastic que terminaron en error",
+)
+
+
+@contextmanager
+def etapa(nombre: str, histograma: Optional[Histograma] = None):
+    """Mide un bloque: with etapa("elastic"): ..."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histograma or etapas_busqueda).observar(time.perf_counter() - inicio, etapa=nombre)
+
+
+def medir(operacion: str):
+    """
+    Decorador para operaciones contra Elastic: registra la duración y
+    cuenta como error tanto una excepción como un resultado
+    {"success": False, ...} (así reportan los errores los helpers).
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcion(*args, **kwargs)
+            except Exception:
+                errores_elastic.inc(operacion=operacion)
+                raise
+            finally:
+                operaciones_elastic.observar(time.perf_counter() - inicio, operacion=operacion)
+            if isinstance(resultado, dict) and resultado.get("success") is False:
+                errores_elastic.inc(operacion=operacion)
+            return resultado
+        return envoltura
+    return decorador
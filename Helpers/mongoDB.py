@@ -1,13 +1,17 @@
-from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 from typing import Dict, List, Optional
 
+from Helpers.conexiones import conexiones
+
 
 class MongoDB:
     def __init__(self, uri: str, db_name: str):
         """
         Inicializa la conexión a MongoDB.
 
+        El MongoClient lo entrega el gestor de conexiones: se crea al primer
+        uso y uno por proceso (no se comparte entre workers tras un fork).
+
         Args:
             uri: cadena de conexión a MongoDB (por ejemplo MongoDB Atlas)
             db_name: nombre de la base de datos
@@ -15,8 +19,17 @@ class MongoDB:
         if not uri:
             raise ValueError("MONGO_URI no está configurada")
 
-        self.client = MongoClient(uri)
-        self.db = self.client[db_name]
+        self.uri = uri
+        self.db_name = db_name
+
+    @property
+    def client(self):
+        """MongoClient de este proceso."""
+        return conexiones.mongo(self.uri)
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
 
     def test_connection(self) -> bool:
         """Prueba la conexión a MongoDB (ping a la base admin)."""
@@ -97,5 +110,10 @@ class MongoDB:
             return False
 
     def close(self):
-        """Cierra la conexión al cliente Mongo."""
-        self.client.close()
\ No newline at end of file
+        """
+        Cierra la conexión al cliente Mongo.
+
+        OJO: el cliente es compartido en el proceso; solo conviene cerrarlo
+        al terminar (scripts), no después de cada petición.
+        """
+        conexiones.cerrar_mongo(self.uri)
\ No newline at end of file
@@ -0,0 +1,93 @@
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Tamaño de los pasajes en palabras y solape entre pasajes consecutivos de
+# la misma página (una frase partida en el borde queda entera en uno de
+# los dos).
+PALABRAS_PASAJE = 120
+SOLAPE_PASAJE = 30
+
+# Páginas con menos palabras que esto no generan pasajes (portadas
+# vacías, pies de página sueltos)
+MIN_PALABRAS = 8
+
+# Campos del boletín copiados en cada pasaje (ver MAPEO_PASAJES en
+# Helpers/indices.py): filtros del buscador y datos del resultado.
+CAMPOS_BOLETIN = [
+    "anio",
+    "semana",
+    "semana_epidemiologica",
+    "rango_fechas",
+    "tema_central",
+    "temas_portada",
+    "tipo_archivo",
+    "pdf_url",
+]
+
+_PALABRA = re.compile(r"\S+")
+
+
+def indice_pasajes(alias: str) -> str:
+    """Alias del índice de pasajes de un índice de boletines."""
+    return f"{alias}-pasajes"
+
+
+def dividir_pasajes(texto: str, palabras: int = PALABRAS_PASAJE,
+                    solape: int = SOLAPE_PASAJE) -> List[str]:
+    """
+    Divide un texto en ventanas de `palabras` palabras que se solapan en
+    `solape` palabras. El último pasaje no se repite si el anterior ya
+    llegó al final del texto.
+    """
+    tokens = _PALABRA.findall(texto or "")
+    if len(tokens) < MIN_PALABRAS:
+        return []
+    paso = max(1, palabras - solape)
+    pasajes = []
+    for inicio in range(0, len(tokens), paso):
+        pasajes.append(" ".join(tokens[inicio:inicio + palabras]))
+        if inicio + palabras >= len(tokens):
+            break
+    return pasajes
+
+
+def documentos_pasajes(
+    resultados: Iterable[Dict],
+    boletin_de: Callable[[str], Optional[Dict]],
+    palabras: int = PALABRAS_PASAJE,
+    solape: int = SOLAPE_PASAJE,
+) -> Iterator[Dict]:
+    """
+    Generador de documentos de pasaje a partir de la extracción por
+    páginas (ExtractorPdf.extraer), listo para indexar_bulk.
+
+    Cada pasaje lleva _id "<boletin_id>-p<página>-<n>" (determinístico:
+    reindexar el mismo PDF sobrescribe los mismos documentos).
+
+    Args:
+        resultados: {"ruta", "paginas"} por PDF (los errores se omiten)
+        boletin_de: ruta del PDF -> documento del boletín con su "_id"
+                    (como el de limpiar_documento), o None para omitirlo
+        palabras: tamaño de los pasajes
+        solape: palabras repetidas entre pasajes consecutivos
+    """
+    for resultado in resultados:
+        if "error" in resultado:
+            continue
+        boletin = boletin_de(resultado["ruta"])
+        if not boletin or not boletin.get("_id"):
+            print(f"Sin boletín para {resultado['ruta']}. Se omite.")
+            continue
+
+        comunes = {"boletin_id": boletin["_id"]}
+        comunes.update({c: boletin[c] for c in CAMPOS_BOLETIN if c in boletin})
+
+        for i, texto in enumerate(resultado["paginas"]):
+            for n, pasaje in enumerate(dividir_pasajes(texto, palabras, solape)):
+                yield dict(
+                    comunes,
+                    _id=f"{boletin['_id']}-p{i + 1}-{n}",
+                    pagina=i + 1,
+                    pasaje=n,
+                    texto=pasaje,
+                )
@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from elasticsearch.exceptions import ApiError, NotFoundError
+
+from Helpers.busqueda import Busqueda, CAMPOS_TEXTO, CAMPOS_RESPUESTA, ORDEN_ESTABLE, RESALTADO
+from Helpers.elastic import ElasticSearch
+
+T = TypeVar("T")
+
+# Los ids llevan versión: si cambia la forma de una consulta se sube la
+# versión y los procesos viejos siguen usando la plantilla anterior
+# mientras dure el despliegue.
+PLANTILLA_BUSQUEDA = "boletines-busqueda-v2"
+PLANTILLA_FACETAS = "boletines-facetas-v1"
+
+
+def _json(valor) -> str:
+    """JSON de una constante para incrustar en la plantilla (nunca contiene "{{")."""
+    return json.dumps(valor, ensure_ascii=False)
+
+
+# Las fuentes se arman concatenando (no con f-strings: "{{...}}" son
+# etiquetas mustache) y con una clave por línea, así una llave del JSON
+# nunca queda pegada a una etiqueta ("{{{" es otra cosa en mustache).
+
+# Cuerpo común: multi_match sobre CAMPOS_TEXTO + cláusulas filter ya armadas
+_QUERY = "".join([
+    '{"bool": {"must": [{"multi_match": {',
+    '"query": {{#toJson}}texto{{/toJson}}, ',
+    '"fields": ', _json(CAMPOS_TEXTO), ', "type": "best_fields"}}], ',
+    '"filter": {{#toJson}}filtros{{/toJson}} }}',
+])
+
+# Página de resultados. Con PIT se agrega el desempate por _shard_doc
+# (sin PIT no está permitido, p. ej. en el _msearch de /buscar-elastic-lote).
+_FUENTE_BUSQUEDA = "\n".join([
+    '{',
+    '  {{#pit_id}}"pit": {"id": {{#toJson}}pit_id{{/toJson}}, "keep_alive": {{#toJson}}keep_alive{{/toJson}} },{{/pit_id}}',
+    '  {{#pagina_siguiente}}"search_after": {{#toJson}}search_after{{/toJson}},{{/pagina_siguiente}}',
+    '  "size": {{size}},',
+    '  "track_total_hits": {{total}},',
+    '  "query": ' + _QUERY + ',',
+    '  "sort": [' + ", ".join(_json(o) for o in ORDEN_ESTABLE[:-1])
+    + '{{#pit_id}}, ' + _json(ORDEN_ESTABLE[-1]) + '{{/pit_id}}],',
+    '  "_source": ' + _json(CAMPOS_RESPUESTA) + ',',
+    '  "highlight": ' + _json(RESALTADO),
+    '}',
+])
+
+# Facetas del buscador (solo agregaciones)
+_FUENTE_FACETAS = "\n".join([
+    '{',
+    '  "size": 0,',
+    '  "track_total_hits": false,',
+    '  "query": ' + _QUERY + ',',
+    '  "aggs": ' + _json(Busqueda.construir_facetas()),
+    '}',
+])
+
+PLANTILLAS = {
+    PLANTILLA_BUSQUEDA: _FUENTE_BUSQUEDA,
+    PLANTILLA_FACETAS: _FUENTE_FACETAS,
+}
+
+
+class PlantillasBusqueda:
+    """
+    Plantillas de búsqueda guardadas en Elastic (stored search templates).
+
+    Las formas de consulta del buscador se registran una vez por proceso
+    con put_script y después cada petición envía solo el id y los
+    parámetros (search_template / msearch_template). Si no se pueden
+    registrar (permisos, clúster caído) las vistas usan la consulta
+    armada en Python; se vuelve a intentar cada `reintentar_cada` segundos.
+    """
+
+    def __init__(
+        self,
+        elastic: ElasticSearch,
+        plantillas: Optional[Dict[str, str]] = None,
+        reintentar_cada: float = 60,
+    ):
+        """
+        Args:
+            elastic: helper de Elastic
+            plantillas: {id: fuente mustache} (por defecto PLANTILLAS)
+            reintentar_cada: segundos entre intentos de registro fallidos
+        """
+        self.elastic = elastic
+        self.plantillas = plantillas or PLANTILLAS
+        self.reintentar_cada = reintentar_cada
+        self.activas = False
+        self._ultimo_intento = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self) -> bool:
+        """
+        Guarda las plantillas que falten o hayan cambiado (idempotente:
+        las que ya están iguales no se vuelven a escribir en el estado
+        del clúster).
+        """
+        client = self.elastic.client
+        try:
+            for id_plantilla, fuente in self.plantillas.items():
+                try:
+                    actual = client.get_script(id=id_plantilla)["script"]["source"]
+                except NotFoundError:
+                    actual = None
+                if actual != fuente:
+                    client.put_script(id=id_plantilla, script={"lang": "mustache", "source": fuente})
+        except Exception as e:
+            print(f"Error al registrar plantillas de búsqueda: {e}")
+            self.activas = False
+            return False
+        self.activas = True
+        return True
+
+    def asegurar(self) -> bool:
+        """True si las plantillas están registradas (registra en el primer uso)."""
+        if self.activas:
+            return True
+        with self._lock:
+            if self.activas:
+                return True
+            if time.monotonic() - self._ultimo_intento < self.reintentar_cada:
+                return False
+            self._ultimo_intento = time.monotonic()
+            return self.registrar()
+
+    def olvidar(self) -> None:
+        """Marca las plantillas como no registradas (p. ej. clúster restaurado)."""
+        self.activas = False
+        self._ultimo_intento = 0.0
+
+    @staticmethod
+    def falta_plantilla(error: Exception) -> bool:
+        """True si el error de Elastic es por una plantilla que no existe."""
+        if not isinstance(error, ApiError) or error.meta.status not in (400, 404):
+            return False
+        return "resource_not_found" in str(error) or "unable to find script" in str(error)
+
+    def ejecutar(
+        self,
+        con_plantilla: Callable[[], T],
+        sin_plantilla: Callable[[], T],
+        faltante: Optional[Callable[[T], bool]] = None,
+    ) -> T:
+        """
+        Ejecuta con_plantilla si las plantillas están disponibles y si no
+        sin_plantilla (la consulta armada en Python). Si Elastic responde
+        que la plantilla no existe se registra de nuevo y se reintenta una vez.
+
+        Args:
+            con_plantilla: búsqueda con search_template / msearch_template
+            sin_plantilla: la misma búsqueda con el cuerpo completo
+            faltante: para respuestas que no lanzan excepción (msearch),
+                      función resultado -> True si faltaba la plantilla
+        """
+        if not self.asegurar():
+            return sin_plantilla()
+        try:
+            resultado = con_plantilla()
+            if faltante is None or not faltante(resultado):
+                return resultado
+            error = "respuesta sin plantilla"
+        except ApiError as e:
+            if not self.falta_plantilla(e):
+                raise
+            error = e
+        print(f"Plantilla de búsqueda no encontrada, se registra de nuevo: {error}")
+        self.olvidar()
+        if self.asegurar():
+            return con_plantilla()
+        return sin_plantilla()
+
+    @staticmethod
+    def falta_en_msearch(resultados: List[Dict]) -> bool:
+        """faltante para ElasticSearch.buscar_multiple_plantillas."""
+        return any(r.get("tipo") == "resource_not_found_exception" for r in resultados)
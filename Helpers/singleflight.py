@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+try:
+    import fcntl  # solo POSIX; en Windows se coalesce solo entre hilos
+except ImportError:
+    fcntl = None
+
+
+class _Vuelo:
+    """Una llamada en curso: los que esperan comparten su resultado."""
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas idénticas concurrentes ("single-flight").
+
+    Si varias peticiones piden la misma clave al mismo tiempo, solo la
+    primera ejecuta la función (p. ej. es.search); las demás esperan y
+    reciben el mismo resultado (o la misma excepción).
+
+    Entre hilos de un worker se usa un lock + Event por clave. Si se indica
+    carpeta_locks, además se coalesce entre workers (procesos) de la misma
+    máquina con un lock de archivo (fcntl.flock) por clave: el worker que
+    espera el lock reutiliza el resultado que el otro dejó en disco, por
+    eso en ese modo el resultado debe ser serializable a JSON. Los archivos
+    de las claves que no se usan hace más de ttl_archivos se borran (cada
+    proceso barre la carpeta como mucho una vez por ttl_archivos).
+    """
+
+    def __init__(self, carpeta_locks: Optional[str] = None, ttl_archivos: float = 300):
+        """
+        Args:
+            carpeta_locks: carpeta para los locks entre procesos; None
+                           coalesce solo dentro del proceso
+            ttl_archivos: segundos sin uso tras los que se borran el lock y
+                          el resultado de una clave
+        """
+        self.carpeta_locks = carpeta_locks if fcntl else None
+        self.ttl_archivos = ttl_archivos
+        self._proximo_barrido = 0.0
+        if self.carpeta_locks:
+            os.makedirs(self.carpeta_locks, exist_ok=True)
+
+        self._vuelos: Dict[Hashable, _Vuelo] = {}
+        self._lock = threading.Lock()
+
+        self.lideres = 0
+        self.coalescidas = 0
+        self.compartidas_entre_procesos = 0
+        self.archivos_borrados = 0
+
+    def ejecutar(self, clave: Hashable, funcion: Callable[[], Any]) -> Any:
+        """Ejecuta funcion() una sola vez por clave entre las llamadas concurrentes."""
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            if vuelo is not None:
+                self.coalescidas += 1
+                lider = False
+            else:
+                vuelo = _Vuelo()
+                self._vuelos[clave] = vuelo
+                self.lideres += 1
+                lider = True
+
+        if not lider:
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado
+
+        try:
+            if self.carpeta_locks:
+                vuelo.resultado = self._ejecutar_entre_procesos(clave, funcion)
+            else:
+                vuelo.resultado = funcion()
+            return vuelo.resultado
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                self._vuelos.pop(clave, None)
+            vuelo.listo.set()
+
+    def _ejecutar_entre_procesos(self, clave: Hashable, funcion: Callable[[], Any]) -> Any:
+        nombre = hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()
+        ruta_lock = os.path.join(self.carpeta_locks, f"{nombre}.lock")
+        ruta_resultado = os.path.join(self.carpeta_locks, f"{nombre}.json")
+
+        inicio = time.time()
+        self._barrer(inicio)
+        with open(ruta_lock, "a+") as lock:
+            # El mtime del lock marca el último uso de la clave (ver _barrer)
+            os.utime(ruta_lock)
+            # Bloquea mientras otro worker ejecuta la misma clave
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                # Si otro worker terminó mientras esperábamos, usamos su resultado
+                try:
+                    if os.path.getmtime(ruta_resultado) >= inicio:
+                        with open(ruta_resultado, "r", encoding="utf-8") as f:
+                            resultado = json.load(f)
+                        with self._lock:
+                            self.compartidas_entre_procesos += 1
+                        return resultado
+                except (OSError, ValueError):
+                    pass
+
+                resultado = funcion()
+
+                temporal = f"{ruta_resultado}.{os.getpid()}.tmp"
+                with open(temporal, "w", encoding="utf-8") as f:
+                    json.dump(resultado, f, ensure_ascii=False)
+                os.replace(temporal, ruta_resultado)
+                return resultado
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _barrer(self, ahora: float) -> None:
+        """
+        Borra los locks y resultados de claves sin uso hace más de
+        ttl_archivos (la carpeta no crece con el espacio de consultas).
+        Un lock tomado por otro worker no se borra; en el peor caso dos
+        workers ejecutan la misma clave una vez, sin coalescer.
+        """
+        with self._lock:
+            if ahora < self._proximo_barrido:
+                return
+            self._proximo_barrido = ahora + self.ttl_archivos
+
+        limite = ahora - self.ttl_archivos
+        borrados = 0
+        try:
+            with os.scandir(self.carpeta_locks) as it:
+                entradas = [e for e in it if e.name.endswith((".lock", ".json", ".tmp"))]
+        except OSError as e:
+            print(f"Error al barrer {self.carpeta_locks}: {e}")
+            return
+
+        for entrada in entradas:
+            try:
+                if entrada.stat().st_mtime >= limite:
+                    continue
+                if entrada.name.endswith(".lock"):
+                    with open(entrada.path, "a+") as lock:
+                        try:
+                            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except OSError:
+                            continue  # en uso por otro worker
+                        os.remove(entrada.path)
+                else:
+                    os.remove(entrada.path)
+                borrados += 1
+            except OSError:
+                pass  # otro worker ya lo borró
+
+        if borrados:
+            with self._lock:
+                self.archivos_borrados += borrados
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "en_curso": len(self._vuelos),
+                "lideres": self.lideres,
+                "coalescidas": self.coalescidas,
+                "compartidas_entre_procesos": self.compartidas_entre_procesos,
+                "archivos_borrados": self.archivos_borrados,
+            }
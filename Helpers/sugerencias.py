@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List
+
+from Helpers.bm25 import plegar_acentos
+
+
+# Campos de los boletines que alimentan el autocompletado
+CAMPOS_SUGERENCIAS = ["tema_central", "temas_portada", "eventos"]
+
+
+class IndiceSugerencias:
+    """
+    Índice de prefijos en memoria para el autocompletado (/sugerir).
+
+    Es un arreglo ordenado de claves (frases sin acentos y en minúsculas)
+    que se recorre con bisect. Cada frase se indexa también desde cada una
+    de sus palabras, así "mat" completa "Mortalidad materna". El ranking es
+    por frecuencia: en cuántos boletines aparece la frase.
+    """
+
+    def __init__(self, max_recorrido: int = 5000):
+        """
+        Args:
+            max_recorrido: máximo de claves a revisar por prefijo (acota los
+                           prefijos muy cortos como "m")
+        """
+        self.max_recorrido = max_recorrido
+
+        self._claves: List[str] = []               # ordenadas
+        self._frase_de_clave: Dict[str, str] = {}  # clave -> frase (texto original)
+        self._frecuencia: Dict[str, int] = {}      # frase -> nº de boletines
+        self._por_documento: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _frases(doc: Dict) -> List[str]:
+        frases = []
+        for campo in CAMPOS_SUGERENCIAS:
+            valor = doc.get(campo)
+            valores = valor if isinstance(valor, (list, tuple)) else [valor]
+            for v in valores:
+                texto = " ".join(str(v).split()) if v else ""
+                if texto and texto not in frases:
+                    frases.append(texto)
+        return frases
+
+    def _sumar(self, frase: str, delta: int) -> None:
+        """Actualiza la frecuencia de una frase (y sus claves si es nueva)."""
+        actual = self._frecuencia.get(frase, 0)
+        self._frecuencia[frase] = actual + delta
+        if actual or delta <= 0:
+            return
+
+        palabras = plegar_acentos(frase).split()
+        for i in range(len(palabras)):
+            clave = " ".join(palabras[i:])
+            # Si dos frases pliegan igual gana la primera que llegó
+            if clave not in self._frase_de_clave:
+                self._frase_de_clave[clave] = frase
+                insort(self._claves, clave)
+
+    def agregar(self, documentos: Iterable[Dict]) -> int:
+        """
+        Agrega (o reemplaza) boletines en el índice, de forma incremental.
+
+        Un documento con un "_id" ya visto reemplaza sus frases anteriores,
+        así reindexar el mismo boletín no infla las frecuencias.
+
+        Returns:
+            número de documentos procesados
+        """
+        n = 0
+        with self._lock:
+            for doc in documentos:
+                if not isinstance(doc, dict):
+                    continue
+                doc_id = str(doc.get("_id") or doc.get("id_boletin") or id(doc))
+                for frase in self._por_documento.pop(doc_id, []):
+                    self._sumar(frase, -1)
+
+                frases = self._frases(doc)
+                for frase in frases:
+                    self._sumar(frase, 1)
+                self._por_documento[doc_id] = frases
+                n += 1
+        return n
+
+    def sugerir(self, prefijo: str, n: int = 8) -> List[Dict]:
+        """
+        Completa un prefijo.
+
+        Returns:
+            lista de {"texto", "frecuencia"} ordenada por frecuencia desc
+        """
+        prefijo = " ".join(plegar_acentos(prefijo or "").split())
+        if not prefijo:
+            return []
+
+        encontradas: Dict[str, int] = {}
+        with self._lock:
+            i = bisect_left(self._claves, prefijo)
+            fin = min(len(self._claves), i + self.max_recorrido)
+            while i < fin and self._claves[i].startswith(prefijo):
+                frase = self._frase_de_clave[self._claves[i]]
+                frecuencia = self._frecuencia.get(frase, 0)
+                if frecuencia > 0:
+                    encontradas[frase] = frecuencia
+                i += 1
+
+        mejores = sorted(encontradas.items(), key=lambda x: (-x[1], x[0]))[:n]
+        return [{"texto": t, "frecuencia": f} for t, f in mejores]
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "claves": len(self._claves),
+                "frases": sum(1 for f in self._frecuencia.values() if f > 0),
+                "documentos": len(self._por_documento),
+            }
@@ -1,10 +1,10 @@
 import requests
 from bs4 import BeautifulSoup
-import json
 from urllib.parse import urljoin
 import os
 from typing import List, Dict
 from Helpers.funciones import Funciones
+from Helpers import codecJson
 
 
 class WebScraping:
@@ -177,12 +177,11 @@ class WebScraping:
         """Carga links desde un archivo JSON"""
         if os.path.exists(json_file_path):
             try:
-                with open(json_file_path, "r", encoding="utf-8") as f:
-                    json_data = json.load(f)
+                json_data = codecJson.leer(json_file_path)
                 all_links = json_data.get("links", [])
                 print(f"Cargados {len(all_links)} links desde {json_file_path}")
                 return all_links
-            except json.JSONDecodeError:
+            except ValueError:
                 print(f"Advertencia: {json_file_path} contiene JSON inválido. Inicializando con lista vacía.")
                 return []
         else:
@@ -196,8 +195,7 @@ class WebScraping:
             if directorio:
                 os.makedirs(directorio, exist_ok=True)
 
-            with open(json_file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            codecJson.guardar(json_file_path, data, indentar=True)
             print(f"Links guardados en {json_file_path}")
         except Exception as e:
             print(f"Error al guardar JSON: {e}")
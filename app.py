@@ -1,11 +1,31 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session
-from elasticsearch import Elasticsearch
+from flask import Flask, render_template, request, redirect, url_for, jsonify, session, g, Response, stream_with_context
+from elasticsearch.exceptions import NotFoundError, ApiError, TransportError
 from datetime import timedelta
 import os
+import time
+import zlib
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from Helpers.busqueda import Busqueda, ORDEN_ESTABLE, CAMPOS_RESPUESTA, RESALTADO
+from Helpers.cache import CacheResultados
+from Helpers.elastic import ElasticSearch
+from Helpers.elasticAsync import ElasticSearchAsync
+from Helpers.bm25 import MotorBM25
+from Helpers.sugerencias import IndiceSugerencias
+from Helpers.singleflight import SingleFlight
+from Helpers.exportacion import Exportador
+from Helpers.plantillas import PlantillasBusqueda, PLANTILLA_BUSQUEDA
+from Helpers.embeddings import Embeddings, CAMPO_VECTOR
+from Helpers.indices import IndicesPorAnio
+from Helpers.pasajes import indice_pasajes
+from Helpers.funciones import Funciones
+from Helpers.ingestaZip import IngestaZip
+from Helpers import codecJson, metricas
+from Helpers.metricas import etapa
+from cargarjson import limpiar_documento
+
 app = Flask(__name__)
 app.secret_key = "tu_clave_secreta"
 app.permanent_session_lifetime = timedelta(hours=5)
@@ -17,17 +37,181 @@ ELASTIC_ENDPOINT = os.getenv("ELASTIC_ENDPOINT")
 ELASTIC_API_KEY = os.getenv("ELASTIC_API_KEY")
 ELASTIC_INDEX = "index-boletin-semanal"
 
-if not ELASTIC_ENDPOINT:
-    raise RuntimeError("ELASTIC_ENDPOINT no está configurada (revisa tu .env)")
-if not ELASTIC_API_KEY:
-    raise RuntimeError("ELASTIC_API_KEY no está configurada (revisa tu .env)")
+# Paginación con point-in-time + search_after
+PAGE_SIZE_DEFECTO = 20
+PAGE_SIZE_MAX = 100
+PIT_KEEP_ALIVE = "2m"
+PIT_KEEP_ALIVE_SEGUNDOS = 120
+
+# Máximo de consultas por llamada a /buscar-elastic-lote
+LOTE_MAX_CONSULTAS = 50
+
+# Modo híbrido ("modo": "hibrido"): candidatos por cada lado (léxico y
+# kNN) que se fusionan con RRF; las páginas salen de esa lista fusionada.
+HIBRIDO_VENTANA = int(os.getenv("HIBRIDO_VENTANA", "50"))
+
+# Modo pasajes ("modo": "pasajes"): busca en el cuerpo de los PDFs
+# (python cargar_pasajes.py) y agrupa los pasajes por boletín.
+ELASTIC_INDEX_PASAJES = os.getenv("ELASTIC_INDEX_PASAJES") or indice_pasajes(ELASTIC_INDEX)
+PASAJES_POR_BOLETIN = int(os.getenv("PASAJES_POR_BOLETIN", "3"))
+
+# Helper de Elastic usando ENDPOINT (no cloud_id). El cliente lo crea el
+# gestor de conexiones en el primer uso, uno por worker; si faltan
+# ELASTIC_ENDPOINT / ELASTIC_API_KEY el error sale en esa primera petición.
+elastic = ElasticSearch(
+    cloud_url=ELASTIC_ENDPOINT,
+    api_key=ELASTIC_API_KEY,
+    default_index=ELASTIC_INDEX,
+)
 
-# Cliente de Elasticsearch usando ENDPOINT (no cloud_id)
-es = Elasticsearch(
-    hosts=[ELASTIC_ENDPOINT],
+# Índices por año detrás de ELASTIC_INDEX (reindex_boletinn.py por-anio):
+# las búsquedas filtradas por año van directo al índice de ese año. Si el
+# alias todavía es un índice único, todo va a ELASTIC_INDEX.
+indices_anio = IndicesPorAnio(elastic, ELASTIC_INDEX)
+
+# Formas de consulta del buscador guardadas en Elastic como plantillas
+# (search_template): se registran en la primera búsqueda de cada worker y
+# las peticiones solo envían parámetros. Sin permisos para guardarlas se
+# usa la consulta armada en Python.
+plantillas = PlantillasBusqueda(elastic)
+
+# Embeddings de consultas para el modo híbrido (el modelo se carga en la
+# primera búsqueda híbrida; los vectores de consulta quedan en caché).
+embeddings = Embeddings()
+
+# Servicio async (loop propio + AsyncElasticsearch) para /buscar-elastic-async.
+# Se conecta en el primer uso, ya dentro del worker.
+es_async = ElasticSearchAsync(
+    cloud_url=ELASTIC_ENDPOINT,
     api_key=ELASTIC_API_KEY,
+    default_index=ELASTIC_INDEX,
+    conexiones_por_nodo=int(os.getenv("ELASTIC_ASYNC_CONEXIONES", "32")),
+    plantillas=plantillas,
+)
+
+# Motor BM25 local (python construir_indice_local.py): respaldo cuando
+# Elastic no responde, o consulta directa con "motor": "local".
+INDICE_LOCAL_DIR = os.getenv("INDICE_LOCAL_DIR", "indice_local")
+motor_local = None
+if os.path.exists(os.path.join(INDICE_LOCAL_DIR, MotorBM25.ARCHIVO_META)):
+    try:
+        motor_local = MotorBM25.cargar(INDICE_LOCAL_DIR)
+    except Exception as e:
+        print("No se pudo abrir el índice local:", e)
+
+# Autocompletado: índice de prefijos construido con los JSON de boletines
+# y actualizado en cada carga bulk al índice del buscador.
+DATA_DIR = os.getenv("DATA_DIR", "data")
+indice_sugerencias = IndiceSugerencias()
+
+
+def _cargar_sugerencias(carpeta):
+    documentos = []
+    if os.path.isdir(carpeta):
+        for nombre in sorted(os.listdir(carpeta)):
+            if not nombre.lower().endswith(".json"):
+                continue
+            try:
+                data = codecJson.leer(os.path.join(carpeta, nombre))
+                if isinstance(data, dict):
+                    documentos.append(limpiar_documento(data))
+            except Exception as e:
+                print(f"Error leyendo {nombre} para sugerencias: {e}")
+    indice_sugerencias.agregar(documentos)
+
+
+_cargar_sugerencias(DATA_DIR)
+ElasticSearch.al_indexar(
+    lambda index, docs: indice_sugerencias.agregar(docs) if index == ELASTIC_INDEX else None
 )
 
+# Carga de ZIPs desde la página de documentos (/procesar-zip-elastic): los
+# miembros se leen del ZIP en memoria y van directo al bulk.
+ingesta_zip = IngestaZip(
+    elastic,
+    preparar=limpiar_documento,
+    hilos=int(os.getenv("INGESTA_ZIP_HILOS", "4")),
+)
+INGESTA_ZIP_PROCESOS = int(os.getenv("INGESTA_ZIP_PROCESOS", "1"))
+
+# Caché de resultados de /buscar-elastic (el índice cambia semanalmente)
+cache_busquedas = CacheResultados(
+    max_entradas=int(os.getenv("CACHE_BUSQUEDA_MAX", "512")),
+    ttl_segundos=float(os.getenv("CACHE_BUSQUEDA_TTL", "300")),
+)
+
+# Búsquedas idénticas concurrentes -> una sola llamada a Elastic.
+# Con SINGLEFLIGHT_DIR se coalesce también entre workers de gunicorn.
+vuelos_busqueda = SingleFlight(carpeta_locks=os.getenv("SINGLEFLIGHT_DIR") or None)
+
+
+# ========================
+# MÉTRICAS (GET /metrics)
+# ========================
+http_peticiones = metricas.registro.histograma(
+    "http_peticion_segundos", "Duración de las peticiones HTTP por ruta"
+)
+http_bytes = metricas.registro.histograma(
+    "http_respuesta_bytes", "Tamaño de las respuestas HTTP por ruta",
+    buckets=(512, 2048, 8192, 32768, 131072, 524288, 2097152),
+)
+busqueda_errores = metricas.registro.contador(
+    "busqueda_errores_total", "Búsquedas que terminaron en error, por endpoint"
+)
+busqueda_resultados = metricas.registro.histograma(
+    "busqueda_resultados", "Hits devueltos por respuesta de búsqueda",
+    buckets=(0, 1, 5, 10, 20, 50, 100, 150),
+)
+busqueda_origen = metricas.registro.contador(
+    "busqueda_origen_total", "Respuestas de búsqueda según su origen (cache, elastic, local)"
+)
+elastic_took = metricas.registro.histograma(
+    "elastic_took_segundos", "Tiempo reportado por Elastic (took) en cada búsqueda"
+)
+
+
+def _metricas_cache():
+    stats = cache_busquedas.estadisticas()
+    vuelos = vuelos_busqueda.estadisticas()
+    return [
+        ("cache_busqueda_aciertos_total", "counter", "Aciertos de la caché de búsquedas", stats["aciertos"]),
+        ("cache_busqueda_fallos_total", "counter", "Fallos de la caché de búsquedas", stats["fallos"]),
+        ("cache_busqueda_expulsadas_total", "counter", "Entradas expulsadas por tamaño", stats["expulsadas"]),
+        ("cache_busqueda_entradas", "gauge", "Entradas en la caché de búsquedas", stats["entradas"]),
+        ("singleflight_coalescidas_total", "counter", "Búsquedas que esperaron a una idéntica", vuelos["coalescidas"]),
+    ]
+
+
+metricas.registro.agregar_colector(_metricas_cache)
+
+
+@app.before_request
+def _iniciar_cronometro():
+    g.inicio_peticion = time.perf_counter()
+
+
+@app.after_request
+def _registrar_peticion(response):
+    inicio = g.get("inicio_peticion")
+    if inicio is not None:
+        ruta = request.url_rule.rule if request.url_rule else "sin_ruta"
+        http_peticiones.observar(
+            time.perf_counter() - inicio,
+            ruta=ruta, metodo=request.method, estado=str(response.status_code),
+        )
+        if response.content_length is not None:
+            http_bytes.observar(response.content_length, ruta=ruta)
+    return response
+
+
+def _responder_busqueda(cuerpo, origen):
+    """jsonify midiendo la serialización y el tamaño del resultado."""
+    busqueda_origen.inc(origen=origen)
+    if cuerpo.get("hits") is not None:
+        busqueda_resultados.observar(len(cuerpo["hits"]))
+    with etapa("serializacion"):
+        return jsonify(cuerpo)
+
 
 # ========================
 # RUTAS BÁSICAS
@@ -71,97 +255,636 @@ def buscador():
     return render_template("buscador.html")
 
 
-@app.route("/buscar-elastic", methods=["POST"])
-def buscar_elastic():
+def _leer_page_size(data):
+    """page_size del body, acotado entre 1 y PAGE_SIZE_MAX."""
     try:
-        data = request.json or {}
+        page_size = int(data.get("page_size") or PAGE_SIZE_DEFECTO)
+    except (TypeError, ValueError):
+        page_size = PAGE_SIZE_DEFECTO
+    return max(1, min(page_size, PAGE_SIZE_MAX))
+
+
+def _cursor_inicial(pit_id, hits, filtros, page_size, total):
+    """Cursor de la segunda página (None si ya no hay más)."""
+    if not pit_id:
+        return None
+    return Busqueda.codificar_cursor({
+        "pit": pit_id,
+        "after": hits[-1]["sort"],
+        "f": filtros,
+        "n": page_size,
+        "t": total,
+    })
+
+
+def _indice_busqueda(filtros):
+    """Índice del año filtrado (si existe) o el alias de lectura."""
+    return indices_anio.indice_para(filtros.get("anio"))
+
+
+def _pagina_elastic(filtros, page_size, pit_id=None, search_after=None):
+    """
+    Ejecuta una página de la búsqueda sobre un point-in-time (PIT).
+
+    Si no hay PIT se abre uno; si el PIT del cursor ya expiró se abre
+    otro y se continúa desde el mismo search_after (el orden es estable).
+    """
+    es = elastic.client_busqueda
+
+    if not pit_id:
+        pit_id = es.open_point_in_time(index=_indice_busqueda(filtros), keep_alive=PIT_KEEP_ALIVE)["id"]
+
+    def con_plantilla():
+        with etapa("construccion"):
+            params = Busqueda.parametros_plantilla(
+                filtros, page_size, pit_id, PIT_KEEP_ALIVE, search_after,
+                total=search_after is None,
+            )
+        return elastic.buscar_plantilla(PLANTILLA_BUSQUEDA, params)
+
+    def sin_plantilla():
+        with etapa("construccion"):
+            params = {
+                "size": page_size,
+                "query": Busqueda.construir_query(filtros),
+                "sort": ORDEN_ESTABLE,
+                "source": CAMPOS_RESPUESTA,
+                "highlight": RESALTADO,
+                "track_total_hits": search_after is None,
+            }
+            if search_after is not None:
+                params["search_after"] = search_after
+        return es.search(pit={"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}, **params)
+
+    with etapa("elastic"):
+        try:
+            resp = plantillas.ejecutar(con_plantilla, sin_plantilla)
+        except NotFoundError:
+            # PIT expirado: se abre otro y se sigue desde el mismo search_after
+            pit_id = es.open_point_in_time(index=_indice_busqueda(filtros), keep_alive=PIT_KEEP_ALIVE)["id"]
+            resp = plantillas.ejecutar(con_plantilla, sin_plantilla)
+    if "took" in resp:
+        elastic_took.observar(resp["took"] / 1000)
+
+    hits = resp["hits"]["hits"]
+    pit_id = resp.get("pit_id", pit_id)
+
+    if len(hits) < page_size:
+        # Última página: liberamos el PIT
+        try:
+            es.close_point_in_time(id=pit_id)
+        except Exception:
+            pass
+        pit_id = None
+
+    return resp, hits, pit_id
+
+
+def _elastic_no_disponible(error):
+    """True si el error es de conexión/timeout o un 5xx/429 del clúster."""
+    if isinstance(error, TransportError):
+        return True
+    if isinstance(error, ApiError):
+        return error.meta.status >= 500 or error.meta.status == 429
+    return False
+
+
+def _pagina_local(filtros, page_size, desde=0, total=None):
+    """Página servida por el motor BM25 local (mismo formato que Elastic)."""
+    resultado = motor_local.buscar(filtros, size=page_size, desde=desde)
+    siguiente = None
+    if desde + page_size < resultado["total"]:
+        siguiente = Busqueda.codificar_cursor({
+            "pit": "local",
+            "after": desde + page_size,
+            "f": filtros,
+            "n": page_size,
+            "t": resultado["total"],
+        })
+    return {
+        "success": True,
+        "total": resultado["total"] if total is None else total,
+        "hits": resultado["hits"],
+        "cursor": siguiente,
+        "motor": "local",
+    }
+
+
+def _busqueda_hibrida(filtros, ventana):
+    """
+    Búsqueda léxica (multi_match) y kNN sobre CAMPO_VECTOR en un solo
+    _msearch, fusionadas con reciprocal rank fusion. Si el modelo de
+    embeddings no está disponible queda solo la parte léxica.
+
+    Los errores de conexión se propagan para que la vista use el motor local.
+
+    Returns:
+        {"total" (coincidencias de la parte léxica), "hits" (todos los
+         fusionados, ya proyectados), "modo"}
+    """
+    index = _indice_busqueda(filtros)
+    consultas = [{
+        "index": index,
+        "query": Busqueda.construir_query(filtros),
+        "size": ventana,
+        "track_total_hits": True,
+        "_source": CAMPOS_RESPUESTA,
+        "highlight": RESALTADO,
+    }]
+
+    modo = "lexico"
+    if embeddings.disponible():
+        with etapa("embedding"):
+            vector = embeddings.vectorizar_consulta(filtros["texto"])
+        consultas.append({
+            "index": index,
+            "knn": Busqueda.construir_knn(vector, filtros, k=ventana, campo=CAMPO_VECTOR),
+            "size": ventana,
+            "_source": CAMPOS_RESPUESTA,
+        })
+        modo = "hibrido"
+
+    with etapa("elastic"):
+        respuestas = elastic.buscar_multiple(consultas, propagar_errores=True)
+    if not respuestas[0]["success"]:
+        raise RuntimeError(respuestas[0]["error"])
+    listas = [r["hits"] for r in respuestas if r["success"]]
+    if modo == "hibrido" and not respuestas[1]["success"]:
+        # p. ej. índice sin el campo dense_vector (hay que reindexar)
+        print("kNN no disponible:", respuestas[1]["error"])
+        modo = "lexico"
+
+    fusionados = Busqueda.fusionar_rrf(listas)
+    return {
+        "total": respuestas[0]["total"],
+        "hits": [Busqueda.proyectar_hit(h) for h in fusionados],
+        "modo": modo,
+    }
+
+
+def _pagina_hibrida(filtros, page_size, desde=0):
+    """
+    Página de la lista fusionada (calculada una vez y guardada en caché).
+    Se pagina hasta el final de la lista fusionada, no hasta el total.
+    """
+    ventana = max(HIBRIDO_VENTANA, page_size)
+    clave = ("hibrido",) + Busqueda.clave(filtros) + (ventana,)
+    generacion = ElasticSearch.generacion_indice(ELASTIC_INDEX)
+    resultado = cache_busquedas.obtener(clave, generacion)
+    origen = "cache"
+    if resultado is None:
+        origen = "elastic"
+        resultado = vuelos_busqueda.ejecutar(
+            clave + (generacion,), lambda: _busqueda_hibrida(filtros, ventana)
+        )
+        cache_busquedas.guardar(clave, resultado, generacion)
+
+    siguiente = None
+    if desde + page_size < len(resultado["hits"]):
+        siguiente = Busqueda.codificar_cursor({
+            "pit": "hibrido",
+            "after": desde + page_size,
+            "f": filtros,
+            "n": page_size,
+            "t": resultado["total"],
+        })
+    return {
+        "success": True,
+        "total": resultado["total"],
+        "hits": resultado["hits"][desde:desde + page_size],
+        "cursor": siguiente,
+        "modo": resultado["modo"],
+    }, origen
+
+
+def _pagina_pasajes(filtros, page_size, desde=0, total=None):
+    """
+    Página de boletines con sus pasajes (collapse por boletin_id). El
+    total de boletines se cuenta en la primera página y viaja en el cursor.
+    """
+    clave = ("pasajes",) + Busqueda.clave(filtros) + (page_size, desde)
+    generacion = ElasticSearch.generacion_indice(ELASTIC_INDEX_PASAJES)
+    resultado = cache_busquedas.obtener(clave, generacion)
+    origen = "cache"
+    if resultado is None:
+        origen = "elastic"
+
+        def buscar():
+            with etapa("construccion"):
+                cuerpo = Busqueda.construir_pasajes(
+                    filtros, page_size, desde, PASAJES_POR_BOLETIN, total=total is None,
+                )
+            with etapa("elastic"):
+                resp = elastic.client_busqueda.search(index=ELASTIC_INDEX_PASAJES, **cuerpo)
+            if "took" in resp:
+                elastic_took.observar(resp["took"] / 1000)
+            hits = resp["hits"]["hits"]
+            return {
+                "total": resp.get("aggregations", {}).get("boletines", {}).get("value", total),
+                "hits": [Busqueda.proyectar_pasajes(h) for h in hits],
+            }
 
-        texto = (data.get("texto") or "").trim() if hasattr(str, "trim") else (data.get("texto") or "").strip()
-        # la línea de arriba es por seguridad, pero realmente .strip() basta:
-        texto = (data.get("texto") or "").strip()
+        resultado = vuelos_busqueda.ejecutar(clave + (generacion,), buscar)
+        cache_busquedas.guardar(clave, resultado, generacion)
+
+    total = resultado["total"] if total is None else total
+    siguiente = None
+    if len(resultado["hits"]) == page_size and (total is None or desde + page_size < total):
+        siguiente = Busqueda.codificar_cursor({
+            "pit": "pasajes",
+            "after": desde + page_size,
+            "f": filtros,
+            "n": page_size,
+            "t": total,
+        })
+    return {
+        "success": True,
+        "total": total,
+        "hits": resultado["hits"],
+        "cursor": siguiente,
+        "modo": "pasajes",
+    }, origen
 
-        anio_filtro = data.get("anio")
-        semana_filtro = data.get("semana")
-        tipo_archivo = data.get("tipo_archivo")
 
-        if not texto:
-            return jsonify({"success": False, "error": "Texto vacío"})
+@app.route("/buscar-elastic", methods=["POST"])
+def buscar_elastic():
+    try:
+        with etapa("parseo"):
+            data = request.json or {}
+            page_size = _leer_page_size(data)
 
         # --------------------------
-        # QUERY BASE
+        # PÁGINAS SIGUIENTES (cursor)
         # --------------------------
-        query_base = {
-            "bool": {
-                "must": [
-                    {
-                        "multi_match": {
-                            "query": texto,
-                            "fields": [
-                                "tema_central",
-                                "temas_portada",
-                                "rango_fechas",
-                                "publicacion_en_linea",
-                                "semana_epidemiologica"
-                                # OJO: quitamos "anio" porque es numérico
-                            ],
-                            "type": "best_fields"
-                        }
-                    }
-                ],
-                "filter": []
-            }
-        }
-
-        # Filtro por año (numérico)
-        if anio_filtro:
+        if data.get("cursor"):
             try:
-                anio_int = int(anio_filtro)
-                query_base["bool"]["filter"].append(
-                    {"term": {"anio": anio_int}}
+                cursor = Busqueda.decodificar_cursor(data["cursor"])
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)})
+
+            filtros = cursor["f"]
+            # El cursor lo puede armar el cliente (no va firmado): se vuelve a acotar
+            page_size = _leer_page_size({"page_size": cursor.get("n", page_size)})
+
+            if cursor["pit"] == "local":
+                if motor_local is None:
+                    return jsonify({"success": False, "error": "Índice local no disponible"})
+                return _responder_busqueda(
+                    _pagina_local(filtros, page_size, cursor["after"], cursor.get("t")), "local"
                 )
-            except ValueError:
-                pass
 
-        # Filtro por semana (dos dígitos)
-        if semana_filtro:
-            try:
-                semana_int = int(semana_filtro)
-                semana_str = f"{semana_int:02d}"   # 1 -> "01"
-                query_base["bool"]["filter"].append(
-                    {"term": {"semana_epidemiologica": semana_str}}
-                )
-            except ValueError:
-                pass
+            if cursor["pit"] == "hibrido":
+                return _responder_busqueda(*_pagina_hibrida(filtros, page_size, cursor["after"]))
+
+            if cursor["pit"] == "pasajes":
+                return _responder_busqueda(*_pagina_pasajes(
+                    filtros, page_size, cursor["after"], cursor.get("t")
+                ))
 
-        # Filtro por tipo de archivo
-        if tipo_archivo:
-            query_base["bool"]["filter"].append(
-                {"term": {"tipo_archivo": tipo_archivo}}
+            resp, hits, pit_id = _pagina_elastic(
+                filtros, page_size, cursor["pit"], cursor["after"]
             )
 
+            siguiente = None
+            if pit_id:
+                siguiente = Busqueda.codificar_cursor({
+                    **cursor, "pit": pit_id, "after": hits[-1]["sort"]
+                })
+
+            return _responder_busqueda({
+                "success": True,
+                "total": cursor.get("t"),
+                "hits": [Busqueda.proyectar_hit(h) for h in hits],
+                "cursor": siguiente
+            }, "elastic")
+
         # --------------------------
-        # EJECUTAR QUERY EN ELASTIC
+        # PRIMERA PÁGINA
         # --------------------------
-        resultado = es.search(
-            index=ELASTIC_INDEX,
-            size=150,
-            query=query_base
-        )
+        with etapa("parseo"):
+            filtros = Busqueda.normalizar_filtros(data)
 
-        total = resultado["hits"]["total"]["value"]
-        hits = resultado["hits"]["hits"]
+        if not filtros["texto"]:
+            return jsonify({"success": False, "error": "Texto vacío"})
+
+        # Motor local a pedido (consultas de baja latencia sin ir a Elastic)
+        if data.get("motor") == "local":
+            if motor_local is None:
+                return jsonify({"success": False, "error": "Índice local no disponible"})
+            return _responder_busqueda(_pagina_local(filtros, page_size), "local")
+
+        # Híbrido léxico + kNN fusionado con RRF
+        if data.get("modo") == "hibrido":
+            try:
+                return _responder_busqueda(*_pagina_hibrida(filtros, page_size))
+            except Exception as e:
+                if motor_local is None or not _elastic_no_disponible(e):
+                    raise
+                print("Elastic no disponible, se usa el índice local:", e)
+                return _responder_busqueda(_pagina_local(filtros, page_size), "local")
+
+        # Pasajes del cuerpo de los PDFs agrupados por boletín
+        if data.get("modo") == "pasajes":
+            return _responder_busqueda(*_pagina_pasajes(filtros, page_size))
+
+        # Caché (texto + filtros normalizados + tamaño de página)
+        clave = Busqueda.clave(filtros) + (page_size,)
+        generacion = ElasticSearch.generacion_indice(ELASTIC_INDEX)
+        resultado = cache_busquedas.obtener(clave, generacion)
+        origen = "cache"
+
+        if resultado is None:
+            origen = "elastic"
+
+            def primera_pagina():
+                resp, hits, pit_id = _pagina_elastic(filtros, page_size)
+                total = resp["hits"]["total"]["value"]
+                return {
+                    "total": total,
+                    "hits": [Busqueda.proyectar_hit(h) for h in hits],
+                    "cursor": _cursor_inicial(pit_id, hits, filtros, page_size, total),
+                }
 
-        return jsonify({
+            try:
+                resultado = vuelos_busqueda.ejecutar(clave + (generacion,), primera_pagina)
+            except Exception as e:
+                if motor_local is None or not _elastic_no_disponible(e):
+                    raise
+                print("Elastic no disponible, se usa el índice local:", e)
+                return _responder_busqueda(_pagina_local(filtros, page_size), "local")
+
+            # Con cursor, la entrada no dura más que el PIT que lleva adentro
+            # (si no, la página siguiente encuentra el PIT vencido)
+            cache_busquedas.guardar(
+                clave, resultado, generacion,
+                ttl_segundos=PIT_KEEP_ALIVE_SEGUNDOS if resultado["cursor"] else None,
+            )
+
+        return _responder_busqueda({
             "success": True,
-            "total": total,
-            "hits": hits
-        })
+            "total": resultado["total"],
+            "hits": resultado["hits"],
+            "cursor": resultado["cursor"]
+        }, origen)
 
     except Exception as e:
+        busqueda_errores.inc(endpoint="/buscar-elastic")
         print("Error en /buscar-elastic:", e)
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route("/buscar-elastic-async", methods=["POST"])
+def buscar_elastic_async():
+    """
+    Igual que la primera página de /buscar-elastic, pero la búsqueda, las
+    facetas y las sugerencias se piden a Elastic en paralelo (una sola
+    espera por petición) sobre el pool async compartido. Las páginas
+    siguientes se piden a /buscar-elastic con el cursor devuelto.
+    """
+    try:
+        data = request.json or {}
+        page_size = _leer_page_size(data)
+        filtros = Busqueda.normalizar_filtros(data)
+
+        if not filtros["texto"]:
+            return jsonify({"success": False, "error": "Texto vacío"})
+
+        clave = ("async",) + Busqueda.clave(filtros) + (page_size,)
+        generacion = ElasticSearch.generacion_indice(ELASTIC_INDEX)
+        resultado = cache_busquedas.obtener(clave, generacion)
+
+        if resultado is None:
+            plantillas.asegurar()   # registro (sincrónico) antes de entrar al loop
+
+            def busqueda_completa():
+                resp = es_async.ejecutar(
+                    es_async.buscar_completo(filtros, page_size, PIT_KEEP_ALIVE, _indice_busqueda(filtros))
+                )
+                hits = resp["hits"]
+                return {
+                    "total": resp["total"],
+                    "hits": [Busqueda.proyectar_hit(h) for h in hits],
+                    "cursor": _cursor_inicial(resp["pit"], hits, filtros, page_size, resp["total"]),
+                    "facetas": resp["facetas"],
+                    "sugerencias": resp["sugerencias"],
+                }
+
+            resultado = vuelos_busqueda.ejecutar(clave + (generacion,), busqueda_completa)
+            cache_busquedas.guardar(
+                clave, resultado, generacion,
+                ttl_segundos=PIT_KEEP_ALIVE_SEGUNDOS if resultado["cursor"] else None,
+            )
+
+        return jsonify({"success": True, **resultado})
+
+    except Exception as e:
+        busqueda_errores.inc(endpoint="/buscar-elastic-async")
+        print("Error en /buscar-elastic-async:", e)
+        return jsonify({"success": False, "error": str(e)})
+
+
+def _buscar_lote(pendientes):
+    """Un solo _msearch (con plantillas si están registradas) para el lote."""
+    return plantillas.ejecutar(
+        lambda: elastic.buscar_multiple_plantillas([
+            (PLANTILLA_BUSQUEDA, Busqueda.parametros_plantilla(f, n), _indice_busqueda(f))
+            for _, _, f, n in pendientes
+        ]),
+        lambda: elastic.buscar_multiple([{
+            "index": _indice_busqueda(f),
+            "query": Busqueda.construir_query(f),
+            "size": n,
+            "sort": ORDEN_ESTABLE[:-1],
+            "_source": CAMPOS_RESPUESTA,
+            "highlight": RESALTADO,
+        } for _, _, f, n in pendientes]),
+        faltante=PlantillasBusqueda.falta_en_msearch,
+    )
+
+
+@app.route("/buscar-elastic-lote", methods=["POST"])
+def buscar_elastic_lote():
+    """
+    Varias búsquedas en una sola petición (un solo _msearch a Elastic).
+
+    Body: {"consultas": [ {texto, anio, semana, tipo_archivo, page_size}, ... ]}
+    Cada consulta devuelve su primera página (sin cursor) en el mismo
+    orden en que llegó. Las que están en caché no se envían a Elastic.
+    """
+    try:
+        data = request.json or {}
+        consultas = data.get("consultas") or []
+
+        if not isinstance(consultas, list) or not consultas:
+            return jsonify({"success": False, "error": "Se requiere una lista 'consultas'"})
+        if len(consultas) > LOTE_MAX_CONSULTAS:
+            return jsonify({
+                "success": False,
+                "error": f"Máximo {LOTE_MAX_CONSULTAS} consultas por lote"
+            })
+
+        generacion = ElasticSearch.generacion_indice(ELASTIC_INDEX)
+        resultados = [None] * len(consultas)
+        pendientes = []   # (posición, clave, filtros, page_size)
+
+        for i, consulta in enumerate(consultas):
+            filtros = Busqueda.normalizar_filtros(consulta or {})
+            if not filtros["texto"]:
+                resultados[i] = {"success": False, "error": "Texto vacío"}
+                continue
+
+            page_size = _leer_page_size(consulta)
+            clave = ("lote",) + Busqueda.clave(filtros) + (page_size,)
+            en_cache = cache_busquedas.obtener(clave, generacion)
+            if en_cache is not None:
+                resultados[i] = en_cache
+                continue
+
+            pendientes.append((i, clave, filtros, page_size))
+
+        if pendientes:
+            try:
+                respuestas = _buscar_lote(pendientes)
+            except Exception as e:
+                print("Error al ejecutar msearch:", e)
+                respuestas = [{"success": False, "error": str(e)} for _ in pendientes]
+            for (i, clave, _, _), resp in zip(pendientes, respuestas):
+                if not resp["success"]:
+                    resultados[i] = {"success": False, "error": resp["error"]}
+                    continue
+                resultados[i] = {
+                    "success": True,
+                    "total": resp["total"],
+                    "hits": [Busqueda.proyectar_hit(h) for h in resp["hits"]],
+                }
+                cache_busquedas.guardar(clave, resultados[i], generacion)
+
+        return jsonify({"success": True, "resultados": resultados})
+
+    except Exception as e:
+        busqueda_errores.inc(endpoint="/buscar-elastic-lote")
+        print("Error en /buscar-elastic-lote:", e)
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route("/sugerir", methods=["GET"])
+def sugerir():
+    """Autocompletado por prefijo: /sugerir?q=mort&n=8"""
+    try:
+        n = max(1, min(int(request.args.get("n", 8)), 20))
+    except ValueError:
+        n = 8
+    return jsonify({
+        "success": True,
+        "sugerencias": indice_sugerencias.sugerir(request.args.get("q", ""), n)
+    })
+
+
+@app.route("/exportar-elastic", methods=["GET"])
+def exportar_elastic():
+    """
+    Descarga del índice completo en NDJSON (gzip si ?gzip=1), en streaming
+    sobre un point-in-time: la memoria no depende del tamaño del índice.
+
+    Query string: slices (lecturas paralelas, máx. 8), gzip
+    """
+    if "usuario" not in session:
+        return jsonify({"success": False, "error": "Inicia sesión para exportar"}), 401
+
+    slices = min(max(Busqueda._entero(request.args.get("slices")) or 1, 1), 8)
+    comprimir = request.args.get("gzip") in ("1", "true")
+
+    def cuerpo():
+        trozos = Exportador.ndjson_en_trozos(elastic.exportar(index=ELASTIC_INDEX, slices=slices))
+        if not comprimir:
+            yield from trozos
+            return
+        compresor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: formato gzip
+        for trozo in trozos:
+            datos = compresor.compress(trozo)
+            if datos:
+                yield datos
+        yield compresor.flush()
+
+    nombre = f"{ELASTIC_INDEX}-{time.strftime('%Y%m%d-%H%M%S')}.ndjson" + (".gz" if comprimir else "")
+    return Response(
+        stream_with_context(cuerpo()),
+        mimetype="application/gzip" if comprimir else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'},
+    )
+
+
+@app.route("/procesar-zip-elastic", methods=["POST"])
+def procesar_zip_elastic():
+    """
+    Indexa el contenido de un ZIP (JSON de boletines, PDFs, textos) sin
+    extraerlo a disco: la subida se lee desde el stream de la petición y
+    una URL se descarga a un archivo temporal en memoria.
+
+    Form: file (ZIP) o url, index (ELASTIC_INDEX, por defecto, o ELASTIC_INDEX_PASAJES)
+    """
+    if "usuario" not in session:
+        return jsonify({"success": False, "error": "Inicia sesión para cargar documentos"}), 401
+
+    # Solo los índices de la app: el formulario no elige cualquier índice del clúster
+    index = (request.form.get("index") or ELASTIC_INDEX).strip()
+    if index not in (ELASTIC_INDEX, ELASTIC_INDEX_PASAJES):
+        return jsonify({"success": False, "error": f"Índice no permitido: {index}"}), 400
+    subida = request.files.get("file")
+    url = (request.form.get("url") or "").strip()
+
+    if subida and subida.filename:
+        if not Funciones.allowed_file(subida.filename, ["zip"]):
+            return jsonify({"success": False, "error": "El archivo debe ser .zip"}), 400
+        origen = subida.stream
+    elif url:
+        origen = Funciones.descargar_zip_spooled(url)
+        if origen is None:
+            return jsonify({"success": False, "error": "No se pudo descargar el ZIP"}), 502
+    else:
+        return jsonify({"success": False, "error": "Envía un archivo ZIP o una URL"}), 400
+
+    # En el índice del buscador con índices por año, cada boletín va al de su
+    # año. Lo que no es un boletín (sin año) no tiene índice donde escribir:
+    # el alias de lectura abarca varios índices y no acepta escrituras.
+    preparar = limpiar_documento
+    if index == ELASTIC_INDEX and indices_anio.activo():
+        def preparar(doc):
+            doc = limpiar_documento(doc)
+            if "anio" not in doc:
+                return None
+            return indices_anio.asignar_indice(doc)
+
+    try:
+        resultado = ingesta_zip.ingerir(
+            origen, index=index, preparar=preparar, procesos_pdf=INGESTA_ZIP_PROCESOS,
+        )
+    finally:
+        origen.close()
+
+    if "indexados" in resultado:
+        resultado["mensaje"] = (
+            f"{resultado['indexados']} documentos indexados en {index}"
+            f" ({resultado['fallidos']} fallidos, {resultado['segundos']} s)"
+        )
+    return jsonify(resultado), 200 if "archivos" in resultado else 400
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Métricas del proceso en formato de texto de Prometheus."""
+    return Response(
+        metricas.registro.exportar(),
+        mimetype="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.route("/cache-elastic", methods=["GET"])
+def cache_elastic():
+    """Aciertos/fallos de la caché de búsquedas (para dimensionarla)."""
+    return jsonify(cache_busquedas.estadisticas())
+
+
 # ========================
 # EJECUCIÓN LOCAL
 # ========================
@@ -0,0 +1,67 @@
+"""
+Throughput del camino sync actual contra el servicio async con fan-out.
+
+Contra un stand-in local de Elastic con latencia fija por petición se
+simulan N hilos de un worker gthread atendiendo búsquedas:
+
+  - sync actual:        open PIT + search (lo que hace /buscar-elastic)
+  - sync completo:      open PIT + search, luego facetas y sugerencias
+  - async (fan-out):    (open PIT + search) || facetas || sugerencias
+
+Uso:
+    python benchmarks/benchmark_async.py [latencia_ms] [hilos] [peticiones]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elasticsearch import Elasticsearch  # noqa: E402
+
+from Helpers.busqueda import Busqueda, ORDEN_ESTABLE, CAMPOS_RESPUESTA, RESALTADO  # noqa: E402
+from Helpers.elasticAsync import ElasticSearchAsync  # noqa: E402
+import servidor_simulado  # noqa: E402
+
+INDICE = "index-boletin-semanal"
+FILTROS = Busqueda.normalizar_filtros({"texto": "dengue", "anio": 2020})
+
+
+def sync_actual(es):
+    pit = es.open_point_in_time(index=INDICE, keep_alive="2m")["id"]
+    es.search(pit={"id": pit, "keep_alive": "2m"}, size=20, query=Busqueda.construir_query(FILTROS),
+              sort=ORDEN_ESTABLE, source=CAMPOS_RESPUESTA, highlight=RESALTADO)
+
+
+def sync_completo(es):
+    sync_actual(es)
+    es.search(index=INDICE, size=0, query=Busqueda.construir_query(FILTROS),
+              aggs=Busqueda.construir_facetas())
+    es.search(index=INDICE, size=0, suggest=Busqueda.construir_sugerencias(FILTROS["texto"]))
+
+
+def medir(nombre, funcion, hilos, peticiones):
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        list(pool.map(lambda _: funcion(), range(peticiones)))
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<22}{peticiones / segundos:>10.1f} req/s{segundos / peticiones * hilos * 1000:>10.1f} ms/req")
+
+
+if __name__ == "__main__":
+    latencia_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    peticiones = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+
+    url, servidor = servidor_simulado.iniciar_en_proceso(latencia=latencia_ms / 1000)
+    es = Elasticsearch(hosts=[url], connections_per_node=hilos)
+    es_async = ElasticSearchAsync(url, "clave-simulada", INDICE, conexiones_por_nodo=hilos * 3)
+
+    print(f"latencia simulada {latencia_ms:.0f} ms, {hilos} hilos, {peticiones} peticiones")
+    medir("sync actual", lambda: sync_actual(es), hilos, peticiones)
+    medir("sync completo", lambda: sync_completo(es), hilos, peticiones)
+    medir("async fan-out", lambda: es_async.ejecutar(es_async.buscar_completo(FILTROS)), hilos, peticiones)
+
+    es_async.close()
+    servidor.terminate()
@@ -0,0 +1,114 @@
+"""
+Throughput de la carga bulk: una sola petición con todo el corpus (como
+era indexar_bulk) contra el bulk en streaming por lotes y con hilos.
+
+Los documentos son los boletines de data/ repetidos con _id distintos
+hasta llegar a N. El stand-in local cobra una latencia fija por petición
+más una por documento, y en la misma pasada se mide el pico de memoria
+del lado del cliente (tracemalloc).
+
+Con capacidad > 0 el stand-in rechaza con 429 los ítems de las
+peticiones bulk que excedan esa concurrencia, y se compara el bulk con
+lote/hilos fijos (sin y con reintentos) contra el control adaptativo.
+
+Uso:
+    python benchmarks/benchmark_bulk.py [documentos] [latencia_ms] [us_por_doc] [capacidad]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from elasticsearch import Elasticsearch  # noqa: E402
+
+from Helpers.elastic import ElasticSearch  # noqa: E402
+from cargarjson import limpiar_documento  # noqa: E402
+import servidor_simulado  # noqa: E402
+
+INDICE = "index-boletin-semanal"
+
+
+def cargar_boletines():
+    carpeta = os.path.join(RAIZ, "data")
+    boletines = []
+    for nombre in sorted(os.listdir(carpeta)):
+        if nombre.endswith(".json"):
+            with open(os.path.join(carpeta, nombre), "r", encoding="utf-8") as f:
+                boletines.append(limpiar_documento(json.load(f)))
+    return boletines
+
+
+def generar(boletines, n):
+    """Generador de n documentos (sin materializar la lista)."""
+    for i in range(n):
+        doc = dict(boletines[i % len(boletines)])
+        doc["_id"] = f"{doc.get('_id')}-{i}"
+        yield doc
+
+
+def bulk_unico(es, documentos):
+    """indexar_bulk antes del cambio: una lista y un solo bulk con refresh."""
+    acciones = []
+    for doc in documentos:
+        meta = {"index": {"_index": INDICE, "_id": doc["_id"]}}
+        acciones.append(meta)
+        acciones.append({k: v for k, v in doc.items() if k != "_id"})
+    resp = es.bulk(body=acciones, refresh=True)
+    return sum(1 for it in resp["items"] if not it["index"].get("error"))
+
+
+def medir(nombre, funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    indexados = funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:<26}{indexados:>8}{indexados / segundos:>12.0f} docs/s{pico / 2**20:>10.1f} MiB")
+
+
+def medir_rechazos(nombre, elastic, documentos, **opciones):
+    fallidos = os.path.join(tempfile.mkdtemp(), "fallidos.ndjson")
+    inicio = time.perf_counter()
+    r = elastic.indexar_bulk(documentos, archivo_fallidos=fallidos, **opciones)
+    segundos = time.perf_counter() - inicio
+    c = r["control"]
+    print(f"{nombre:<26}{r['indexados']:>8}{r['fallidos']:>10}{r['reintentados']:>10}"
+          f"{r['indexados'] / segundos:>10.0f} docs/s   lote {c['docs_por_lote']}, {c['hilos']} hilos")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    latencia_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    us_por_doc = float(sys.argv[3]) if len(sys.argv) > 3 else 50
+    capacidad = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    url, servidor = servidor_simulado.iniciar_en_proceso(latencia_ms / 1000, us_por_doc / 1e6, capacidad)
+    es = Elasticsearch(hosts=[url], api_key="clave-simulada", connections_per_node=16,
+                       request_timeout=120)
+    elastic = ElasticSearch(default_index=INDICE, client=es)
+    boletines = cargar_boletines()
+
+    print(f"{n} documentos, latencia {latencia_ms:.0f} ms/petición + {us_por_doc:.0f} us/doc")
+    if capacidad:
+        print(f"capacidad bulk del stand-in: {capacidad} peticiones concurrentes")
+        print(f"{'':<26}{'ok':>8}{'fallidos':>10}{'reintent.':>10}")
+        medir_rechazos("fijo, sin reintentos", elastic, generar(boletines, n),
+                       hilos=8, adaptativo=False, reintentos=0)
+        medir_rechazos("fijo, con reintentos", elastic, generar(boletines, n),
+                       hilos=8, adaptativo=False)
+        medir_rechazos("adaptativo", elastic, generar(boletines, n), hilos=8)
+    else:
+        print(f"{'':<26}{'docs':>8}{'':>19}{'pico':>10}")
+        medir("un solo bulk", lambda: bulk_unico(es, list(generar(boletines, n))))
+        for hilos in (1, 2, 4, 8):
+            medir(f"streaming, {hilos} hilo(s)",
+                  lambda: elastic.indexar_bulk(generar(boletines, n), docs_por_lote=500,
+                                               hilos=hilos, adaptativo=False)["indexados"])
+
+    servidor.terminate()
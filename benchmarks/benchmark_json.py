@@ -0,0 +1,101 @@
+"""
+Micro-benchmark del codec JSON (Helpers/codecJson) contra la librería
+estándar tal como se usaba antes, sobre los archivos reales del repo:
+los boletines de data/ y static/js/links.json.
+
+  - leer:     json.load(archivo de texto)  vs  codecJson.leer
+  - escribir: json.dump(indent=4)          vs  codecJson.dumps_bytes (compacto)
+  - bulk:     líneas NDJSON con json.dumps vs  codecJson.linea_ndjson
+
+La escritura se mide contra un buffer en memoria (io.StringIO/BytesIO):
+reescribir muchas veces los mismos archivos en disco mide el sistema de
+archivos, no el codec.
+
+Uso:
+    python benchmarks/benchmark_json.py [repeticiones]
+"""
+import glob
+import io
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Helpers import codecJson  # noqa: E402
+
+ARCHIVOS = sorted(glob.glob(os.path.join(RAIZ, "data", "*.json")))
+LINKS = os.path.join(RAIZ, "static", "js", "links.json")
+
+
+def medir(nombre, funcion, repeticiones, unidades):
+    funcion()  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    segundos = (time.perf_counter() - inicio) / repeticiones
+    print(f"  {nombre:<34}{segundos * 1000:>9.3f} ms{unidades / segundos:>12.0f} /s")
+    return segundos
+
+
+def comparar(titulo, antes, despues, repeticiones, unidades):
+    print(titulo)
+    t_antes = medir("stdlib (antes)", antes, repeticiones, unidades)
+    t_despues = medir(f"codecJson ({codecJson.BACKEND})", despues, repeticiones, unidades)
+    print(f"  {'aceleración':<34}{t_antes / t_despues:>9.1f}x")
+
+
+def leer_stdlib(rutas):
+    for ruta in rutas:
+        with open(ruta, "r", encoding="utf-8") as f:
+            json.load(f)
+
+
+def escribir_stdlib(datos):
+    for d in datos:
+        json.dump(d, io.StringIO(), indent=4, ensure_ascii=False)
+
+
+def escribir_codec(datos):
+    for d in datos:
+        io.BytesIO().write(codecJson.dumps_bytes(d))
+
+
+def bulk_stdlib(datos):
+    return "".join(
+        json.dumps({"index": {"_index": "i", "_id": i}}, ensure_ascii=False, default=str) + "\n"
+        + json.dumps(d, ensure_ascii=False, default=str) + "\n"
+        for i, d in enumerate(datos)
+    ).encode("utf-8")
+
+
+def bulk_codec(datos):
+    return b"".join(
+        codecJson.linea_ndjson({"index": {"_index": "i", "_id": i}}) + codecJson.linea_ndjson(d)
+        for i, d in enumerate(datos)
+    )
+
+
+if __name__ == "__main__":
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    datos = [codecJson.leer(r) for r in ARCHIVOS]
+    links = codecJson.leer(LINKS)
+    tamano = sum(os.path.getsize(r) for r in ARCHIVOS)
+    print(f"backend: {codecJson.BACKEND}; {len(ARCHIVOS)} boletines ({tamano / 1024:.0f} KiB) + links.json\n")
+
+    comparar(f"leer {len(ARCHIVOS)} boletines (archivos/s)",
+             lambda: leer_stdlib(ARCHIVOS), lambda: [codecJson.leer(r) for r in ARCHIVOS],
+             repeticiones, len(ARCHIVOS))
+    comparar(f"escribir {len(ARCHIVOS)} boletines (archivos/s)",
+             lambda: escribir_stdlib(datos), lambda: escribir_codec(datos),
+             repeticiones, len(ARCHIVOS))
+    comparar("links.json: serializar + parsear (ciclos/s)",
+             lambda: json.loads(json.dumps(links, indent=4, ensure_ascii=False)),
+             lambda: codecJson.loads(codecJson.dumps_bytes(links)),
+             repeticiones * 10, 1)
+    comparar(f"cuerpo bulk de {len(datos)} documentos (docs/s)",
+             lambda: bulk_stdlib(datos), lambda: bulk_codec(datos), repeticiones, len(datos))
+    print(f"\n  tamaño en disco por boletín: indent=4 {tamano / len(ARCHIVOS):.0f} B, "
+          f"compacto {sum(len(codecJson.dumps_bytes(d)) for d in datos) / len(datos):.0f} B")
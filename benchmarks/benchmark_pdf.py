@@ -0,0 +1,59 @@
+"""
+Extracción de texto de los PDFs de data_pdfs/ con ExtractorPdf
+(Helpers/extraccionPdf.py): una corrida en frío (caché vacía, pool de
+procesos) y una en caliente (mismos PDFs: solo se calcula el hash).
+
+La caché se crea en una carpeta temporal para no tocar .cache_pdf/.
+Con "--base" se mide además Funciones.extraer_texto_pdf en serie; con
+"--ocr" se activa el modo híbrido (OCR solo de las páginas sin texto útil).
+
+Uso:
+    python benchmarks/benchmark_pdf.py [carpeta] [procesos] [--base] [--ocr]
+"""
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Helpers.extraccionPdf import ExtractorPdf  # noqa: E402
+from Helpers.funciones import Funciones  # noqa: E402
+
+
+def corrida(nombre, extractor, rutas):
+    extractor.reiniciar_estadisticas()
+    caracteres = sum(len(ExtractorPdf.unir(r["paginas"])) for r in extractor.extraer(rutas) if "paginas" in r)
+    e = extractor.estadisticas()
+    print(f"  {nombre:<10}{e['pdfs']:>6} pdfs{e['paginas']:>7} págs{e['segundos']:>9.2f} s"
+          f"{e['paginas_por_segundo'] or 0:>10.1f} págs/s   aciertos {e['tasa_aciertos']:.0%}"
+          f"   ({caracteres} caracteres, {e['errores']} errores)")
+    if extractor.ocr:
+        print(f"{'':<12}OCR: {e['paginas_ocr']} págs calculadas, {e['aciertos_ocr']} desde la caché")
+    return e
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    carpeta = argumentos[0] if argumentos else os.path.join(RAIZ, "data_pdfs")
+    procesos = int(argumentos[1]) if len(argumentos) > 1 else 0
+    rutas = sorted(glob.glob(os.path.join(carpeta, "*.pdf")))
+
+    cache = tempfile.mkdtemp(prefix="cache_pdf_")
+    try:
+        extractor = ExtractorPdf(carpeta_cache=cache, procesos=procesos, ocr="--ocr" in sys.argv)
+        print(f"{len(rutas)} PDFs en {carpeta}; {extractor.procesos} proceso(s), CPUs: {os.cpu_count()}")
+
+        if "--base" in sys.argv:
+            inicio = time.perf_counter()
+            for ruta in rutas:
+                Funciones.extraer_texto_pdf(ruta)
+            print(f"  {'serie':<10}{len(rutas):>6} pdfs{'':>12}{time.perf_counter() - inicio:>9.2f} s")
+
+        corrida("frío", extractor, rutas)
+        corrida("caliente", extractor, rutas)
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
@@ -0,0 +1,78 @@
+"""
+Benchmark del tamaño de respuesta de /buscar-elastic.
+
+Compara los hits crudos de Elastic (como se devolvían antes: 150 hits con
+todo el _source, _index, _score y sort) contra la respuesta proyectada
+(hits planos con CAMPOS_RESPUESTA + resaltado) usando los boletines reales
+de data/*.json.
+
+Uso:
+    python benchmarks/benchmark_proyeccion.py
+"""
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Helpers.busqueda import Busqueda, CAMPOS_RESPUESTA  # noqa: E402
+
+CARPETA_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+REPETICIONES = 200
+
+
+def hits_crudos(n: int):
+    """Simula la respuesta de es.search a partir de los JSON de data/"""
+    documentos = []
+    for ruta in sorted(glob.glob(os.path.join(CARPETA_DATA, "*.json"))):
+        with open(ruta, "r", encoding="utf-8") as f:
+            documentos.append(json.load(f))
+
+    hits = []
+    for i in range(n):
+        doc = documentos[i % len(documentos)]
+        hits.append({
+            "_index": "index-boletin-semanal",
+            "_id": f"{doc.get('anio')}-SEM-{doc.get('semana_epidemiologica')}-{i}",
+            "_score": 3.1415926 - i * 0.001,
+            "_source": doc,
+            "sort": [doc.get("anio"), doc.get("semana_epidemiologica"), i],
+        })
+    return hits
+
+
+def con_resaltado(hit):
+    """Agrega un bloque highlight como el que devuelve Elastic"""
+    fuente = {k: v for k, v in hit["_source"].items() if k in CAMPOS_RESPUESTA}
+    temas = fuente.get("temas_portada") or []
+    resaltado = {}
+    if fuente.get("tema_central"):
+        resaltado["tema_central"] = [f"<mark>{fuente['tema_central']}</mark>"]
+    if temas:
+        resaltado["temas_portada"] = [f"<mark>{temas[0]}</mark>"]
+    return {**hit, "_source": fuente, "highlight": resaltado}
+
+
+def medir(payload):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        cuerpo = json.dumps(payload, ensure_ascii=False)
+    ms = (time.perf_counter() - inicio) * 1000 / REPETICIONES
+    return len(cuerpo.encode("utf-8")), ms
+
+
+if __name__ == "__main__":
+    antes = {"success": True, "total": 150, "hits": hits_crudos(150)}
+    proyectados_150 = [Busqueda.proyectar_hit(con_resaltado(h)) for h in antes["hits"]]
+    despues_150 = {"success": True, "total": 150, "hits": proyectados_150}
+    despues_pagina = {"success": True, "total": 150, "hits": proyectados_150[:20], "cursor": "x" * 300}
+
+    b0, t0 = medir(antes)
+    print(f"{'escenario':<38}{'bytes':>10}{'ms json':>10}")
+    print(f"{'antes  (150 hits crudos)':<38}{b0:>10}{t0:>10.3f}")
+    for nombre, payload in (("después (150 hits proyectados)", despues_150),
+                            ("después (página de 20 + cursor)", despues_pagina)):
+        b, t = medir(payload)
+        print(f"{nombre:<38}{b:>10}{t:>10.3f}   ({b / b0:.0%} bytes, {t / t0:.0%} tiempo)")
@@ -0,0 +1,164 @@
+"""
+Stand-in local de Elasticsearch para los benchmarks.
+
+Responde lo mínimo que usan la app y los helpers (info, _search, _pit,
+_msearch, _bulk) con una latencia artificial por petición (y, en _bulk,
+por documento), para medir el comportamiento del cliente sin depender
+del clúster real. Con capacidad_bulk > 0, las peticiones _bulk que
+excedan esa concurrencia reciben sus ítems rechazados con 429
+(es_rejected_execution_exception), como la cola de write de un nodo.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latencia = 0.0
+    latencia_por_doc = 0.0
+    capacidad_bulk = 0
+    en_vuelo = [0]
+    contador = {"peticiones": 0, "bulk_docs": 0, "bulk_rechazados": 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, cuerpo, estado=200):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _leer(self) -> bytes:
+        largo = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(largo) if largo else b""
+
+    def _hits(self, n=20):
+        return {
+            "took": 3,
+            "pit_id": "pit-simulado",
+            "hits": {
+                "total": {"value": 1000, "relation": "eq"},
+                "hits": [
+                    {"_index": "index-boletin-semanal", "_id": str(i),
+                     "_source": {"anio": 2020, "semana_epidemiologica": f"{i % 52 + 1:02d}",
+                                 "tema_central": "Dengue"},
+                     "sort": [2020, f"{i % 52 + 1:02d}", i]}
+                    for i in range(n)
+                ],
+            },
+            "aggregations": {"anios": {"buckets": [{"key": 2020, "doc_count": 1000}]}},
+            "suggest": {"tema_central": [{"options": [{"text": "dengue"}]}]},
+        }
+
+    def _procesar(self):
+        cuerpo = self._leer()
+        with self.lock:
+            self.contador["peticiones"] += 1
+        time.sleep(self.latencia)
+
+        ruta = self.path.split("?", 1)[0]
+        if ruta == "/" or ruta == "":
+            return self._responder({"version": {"number": "8.11.0"}, "tagline": "You Know, for Search"})
+        if ruta.endswith("/_pit"):
+            if self.command == "DELETE":
+                return self._responder({"succeeded": True, "num_freed": 1})
+            return self._responder({"id": "pit-simulado"})
+        if ruta.endswith("/_search") or ruta.endswith("/_search/template"):
+            return self._responder(self._hits())
+        if ruta.endswith("/_msearch") or ruta.endswith("/_msearch/template"):
+            lineas = [l for l in cuerpo.splitlines() if l.strip()]
+            return self._responder({"responses": [dict(self._hits(), status=200)
+                                                  for _ in range(len(lineas) // 2)]})
+        if ruta.endswith("/_bulk"):
+            lineas = [l for l in cuerpo.splitlines() if l.strip()]
+            with self.lock:
+                self.en_vuelo[0] += 1
+                saturado = 0 < self.capacidad_bulk < self.en_vuelo[0]
+            try:
+                items = []
+                for linea in lineas:
+                    accion = json.loads(linea)
+                    if len(accion) == 1 and next(iter(accion)) in ("index", "create", "update", "delete"):
+                        op = next(iter(accion))
+                        if saturado:
+                            items.append({op: {"_id": accion[op].get("_id"), "status": 429, "error": {
+                                "type": "es_rejected_execution_exception",
+                                "reason": "rejected execution (queue capacity exceeded)"}}})
+                        else:
+                            items.append({op: {"_id": accion[op].get("_id"), "status": 201}})
+                if not saturado:
+                    time.sleep(self.latencia_por_doc * len(items))
+            finally:
+                with self.lock:
+                    self.en_vuelo[0] -= 1
+                    clave = "bulk_rechazados" if saturado else "bulk_docs"
+                    self.contador[clave] += len(items)
+            return self._responder({"took": 1, "errors": saturado, "items": items})
+        if ruta.endswith("/_refresh"):
+            return self._responder({"_shards": {"total": 1, "successful": 1, "failed": 0}})
+        return self._responder({"acknowledged": True})
+
+    do_GET = do_POST = do_PUT = do_DELETE = _procesar
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def iniciar(latencia: float = 0.02, puerto: int = 0, latencia_por_doc: float = 0.0,
+            capacidad_bulk: int = 0):
+    """Arranca el servidor en un hilo; devuelve (url, servidor)."""
+    manejador = type("Manejador", (_Manejador,), {
+        "latencia": latencia,
+        "latencia_por_doc": latencia_por_doc,
+        "capacidad_bulk": capacidad_bulk,
+        "en_vuelo": [0],
+        "contador": {"peticiones": 0, "bulk_docs": 0, "bulk_rechazados": 0},
+        "lock": threading.Lock(),
+    })
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}", servidor
+
+
+def _servir(latencia: float, puerto: int, latencia_por_doc: float, capacidad_bulk: int):
+    # iniciar() ya atiende en su hilo: el proceso solo tiene que seguir vivo
+    iniciar(latencia, puerto, latencia_por_doc, capacidad_bulk)
+    threading.Event().wait()
+
+
+def iniciar_en_proceso(latencia: float = 0.02, latencia_por_doc: float = 0.0,
+                       capacidad_bulk: int = 0):
+    """
+    Arranca el servidor en un proceso aparte (no compite por el GIL con
+    el cliente medido); devuelve (url, proceso).
+    """
+    import multiprocessing
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+
+    proceso = multiprocessing.Process(target=_servir, args=(latencia, puerto, latencia_por_doc, capacidad_bulk), daemon=True)
+    proceso.start()
+
+    url = f"http://127.0.0.1:{puerto}"
+    for _ in range(100):
+        try:
+            with socket.create_connection(("127.0.0.1", puerto), timeout=0.1):
+                return url, proceso
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("No arrancó el servidor simulado")
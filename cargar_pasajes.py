@@ -0,0 +1,102 @@
+"""
+Carga los pasajes del cuerpo de los PDFs de boletines en el índice de
+pasajes ("<índice>-pasajes"), para el modo "pasajes" de /buscar-elastic.
+
+Cada PDF se extrae por páginas con ExtractorPdf (pool de procesos y
+caché en .cache_pdf/: una segunda corrida solo extrae los PDFs nuevos o
+cambiados), se divide en pasajes solapados y se indexa por bulk en una
+versión nueva del índice; al terminar el alias se mueve en una sola
+operación (GestorIndices), así la búsqueda nunca ve una carga a medias.
+
+Cada pasaje queda ligado a su boletín por boletin_id: el _id del JSON
+de data/ con el mismo nombre que el PDF (limpiar_documento), o si no
+hay JSON el año y la semana del nombre del archivo.
+
+Uso:
+    python cargar_pasajes.py [carpeta_pdfs] [--ocr]
+"""
+import os
+import re
+import sys
+from dotenv import load_dotenv
+from Helpers import codecJson
+from Helpers.elastic import ElasticSearch
+from Helpers.extraccionPdf import ExtractorPdf
+from Helpers.indices import GestorIndices, MAPEO_PASAJES
+from Helpers.pasajes import documentos_pasajes, indice_pasajes
+from cargarjson import limpiar_documento
+
+_NOMBRE_BOLETIN = re.compile(r"(\d{4}).*semana-(\d+)", re.IGNORECASE)
+
+
+def boletin_de_pdf(ruta: str, json_dir: str = "data"):
+    """
+    Documento del boletín de un PDF (con su _id), desde el JSON con el
+    mismo nombre o, si no existe, desde el nombre del archivo.
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    ruta_json = os.path.join(json_dir, f"{nombre}.json")
+    if os.path.exists(ruta_json):
+        try:
+            return limpiar_documento(codecJson.leer(ruta_json))
+        except Exception as e:
+            print(f"Error leyendo {ruta_json}: {e}")
+
+    m = _NOMBRE_BOLETIN.search(nombre)
+    if not m:
+        return None
+    return limpiar_documento({
+        "anio": int(m.group(1)),
+        "semana_epidemiologica": f"{int(m.group(2)):02d}",  # como en data/*.json
+        "tipo_archivo": "pdf",
+    })
+
+
+if __name__ == "__main__":
+    # ================== CARGAR VARIABLES DE ENTORNO ==================
+    load_dotenv("env.txt")
+
+    ELASTIC_CLOUD_URL     = os.getenv("ELASTIC_CLOUD_URL")
+    ELASTIC_API_KEY       = os.getenv("ELASTIC_API_KEY")
+    ELASTIC_INDEX_DEFAULT = os.getenv("ELASTIC_INDEX_DEFAULT") or "index-boletin-semanal"
+    ELASTIC_INDEX_PASAJES = os.getenv("ELASTIC_INDEX_PASAJES") or indice_pasajes(ELASTIC_INDEX_DEFAULT)
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    pdf_dir = argumentos[0] if argumentos else "data_pdfs"
+
+    print("ELASTIC_CLOUD_URL:", ELASTIC_CLOUD_URL)
+    print("Índice de pasajes:", ELASTIC_INDEX_PASAJES)
+    print("Carpeta de PDFs:", os.path.abspath(pdf_dir))
+
+    if not os.path.isdir(pdf_dir):
+        print("La carpeta de PDFs no existe:", pdf_dir)
+        raise SystemExit(1)
+
+    # ================== CREAR CLIENTE DE ELASTIC ==================
+    es = ElasticSearch(
+        cloud_url=ELASTIC_CLOUD_URL,
+        api_key=ELASTIC_API_KEY,
+        default_index=ELASTIC_INDEX_PASAJES,
+    )
+
+    print("\nProbando conexión a ElasticSearch...")
+    if not es.test_connection():
+        print("No se pudo conectar a ElasticSearch.")
+        raise SystemExit(1)
+
+    # ================== EXTRAER + DIVIDIR + INDEXAR ==================
+    # Todo en streaming: los pasajes se generan a medida que el bulk los consume.
+    rutas = sorted(
+        os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.lower().endswith(".pdf")
+    )
+    extractor = ExtractorPdf(ocr="--ocr" in sys.argv)
+    documentos = documentos_pasajes(extractor.extraer(rutas), boletin_de_pdf)
+
+    gestor = GestorIndices(es, alias=ELASTIC_INDEX_PASAJES, mapeo=MAPEO_PASAJES)
+    resultado = gestor.reindexar(documentos)
+
+    print("\nExtracción:", extractor.estadisticas())
+    print("\nResultado de la carga de pasajes:")
+    print({k: v for k, v in resultado.items() if k != "bulk"})
+    print("Bulk:", {k: v for k, v in resultado.get("bulk", {}).items() if k != "errores"})
+    raise SystemExit(0 if resultado["success"] else 1)
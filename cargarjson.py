@@ -1,7 +1,11 @@
 import os
-import json
+import sys
 from dotenv import load_dotenv
 from Helpers.elastic import ElasticSearch
+from Helpers.embeddings import Embeddings, embeddings_habilitados
+from Helpers.funciones import Funciones
+from Helpers.indices import IndicesPorAnio
+from Helpers.manifiesto import ManifiestoIngesta
 
 
 def limpiar_documento(doc: dict) -> dict:
@@ -18,9 +22,20 @@ def limpiar_documento(doc: dict) -> dict:
         except:
             pass
 
-    # Asegurar que "semana_epidemiologica" quede como string para Elastic
+    # Asegurar que "semana_epidemiologica" quede como string para Elastic,
+    # y la semana como número en "semana" (filtros y orden, ver Helpers/indices.py)
     if "semana_epidemiologica" in limpio:
         limpio["semana_epidemiologica"] = str(limpio["semana_epidemiologica"])
+        try:
+            limpio["semana"] = int(limpio["semana_epidemiologica"])
+        except ValueError:
+            pass
+
+    # Fechas de la semana a partir del texto "29 de marzo al 4 de abril de 2020"
+    if "rango_fechas" in limpio and "fecha_inicio" not in limpio:
+        fechas = Funciones.rango_a_fechas(limpio["rango_fechas"])
+        if fechas:
+            limpio["fecha_inicio"], limpio["fecha_fin"] = fechas
 
     # Generar ID único si el PDF viene de boletín
     if "anio" in limpio and "semana_epidemiologica" in limpio:
@@ -64,43 +79,54 @@ if __name__ == "__main__":
         print("La carpeta de JSON no existe:", json_dir)
         raise SystemExit(1)
 
-    # ================== CARGAR DOCUMENTOS DESDE LOS JSON ==================
-    documentos = []
-
-    for filename in sorted(os.listdir(json_dir)):
-        if not filename.lower().endswith(".json"):
-            continue
-
-        ruta_archivo = os.path.join(json_dir, filename)
-        print(f"Leyendo: {ruta_archivo}")
-
-        try:
-            with open(ruta_archivo, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            # DEPENDIENDO DE TU WEBSCRAPING, cada JSON es *un documento*
-            if isinstance(data, dict):
-                doc = limpiar_documento(data)
-                documentos.append(doc)
-            else:
-                print(f"Formato no reconocido en {filename}. Se omite.")
+    # ================== EMBEDDINGS (BÚSQUEDA HÍBRIDA) ==================
+    # Cada documento lleva su vector para kNN; EMBEDDINGS=0 lo desactiva.
+    enriquecer = Embeddings().agregar_vectores if embeddings_habilitados() else None
 
-        except Exception as e:
-            print(f"Error leyendo {filename}: {e}")
+    # ================== ÍNDICES POR AÑO ==================
+    # Si el alias ya está organizado por años (reindex_boletinn.py por-anio)
+    # cada documento va al índice de su año.
+    por_anio = IndicesPorAnio(es, ELASTIC_INDEX_DEFAULT)
+    if por_anio.activo():
+        print("Índices por año:", sorted(por_anio.anios()))
 
-    print(f"\nDocumentos preparados para indexar: {len(documentos)}")
-
-    if not documentos:
-        print("No hay documentos válidos para indexar.")
-        raise SystemExit(0)
+        def preparar(doc):
+            return por_anio.asignar_indice(limpiar_documento(doc))
+    else:
+        preparar = limpiar_documento
+
+    # ================== CARGA INCREMENTAL (POR DEFECTO) ==================
+    # Solo se envían los JSON nuevos o modificados desde la última corrida y
+    # se borran de Elastic los que ya no están. --completo reenvía todo.
+    if "--completo" not in sys.argv:
+        manifiesto = ManifiestoIngesta(
+            os.getenv("MANIFIESTO_INGESTA") or ".manifiesto_ingesta.json",
+            ELASTIC_INDEX_DEFAULT,
+        )
+        resultado = manifiesto.sincronizar(es, json_dir, preparar, enriquecer=enriquecer)
+
+        print("\nResultado de la carga incremental:")
+        print({k: v for k, v in resultado.items() if k != "bulk"})
+        raise SystemExit(0 if resultado["success"] else 1)
 
     # ================== INDEXAR EN ELASTIC (BULK) ==================
     print("\n Indexando documentos en ElasticSearch...")
 
+    # Generador: los documentos se leen a medida que el bulk los consume,
+    # sin cargar toda la carpeta en memoria (incluye subcarpetas). Pasan por
+    # el mismo preparar que la carga incremental (mismo _id y campos).
+    documentos = Funciones.iterar_boletines(json_dir, preparar=preparar)
+    if enriquecer is not None:
+        documentos = enriquecer(documentos)
+
     resultado = es.indexar_bulk(
         documentos=documentos,
         index=ELASTIC_INDEX_DEFAULT,
     )
 
+    if resultado.get("indexados", 0) == 0 and not resultado.get("fallidos"):
+        print("No hay documentos válidos para indexar.")
+        raise SystemExit(0)
+
     print("\nResultado de indexación:")
     print(resultado)
\ No newline at end of file
@@ -0,0 +1,47 @@
+import os
+import time
+
+from dotenv import load_dotenv
+
+from Helpers import codecJson
+from Helpers.bm25 import MotorBM25
+from cargarjson import limpiar_documento
+
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    json_dir = os.getenv("DATA_DIR") or "data"
+    destino = os.getenv("INDICE_LOCAL_DIR") or "indice_local"
+
+    print("Usando carpeta:", os.path.abspath(json_dir))
+    print("Índice local destino:", os.path.abspath(destino))
+
+    if not os.path.isdir(json_dir):
+        print("La carpeta de JSON no existe:", json_dir)
+        raise SystemExit(1)
+
+    # ================== MISMO CORPUS QUE cargarjson.py ==================
+    documentos = []
+    for filename in sorted(os.listdir(json_dir)):
+        if not filename.lower().endswith(".json"):
+            continue
+        try:
+            data = codecJson.leer(os.path.join(json_dir, filename))
+            if isinstance(data, dict):
+                documentos.append(limpiar_documento(data))
+        except Exception as e:
+            print(f"Error leyendo {filename}: {e}")
+
+    # ================== CONSTRUIR Y GUARDAR ==================
+    inicio = time.perf_counter()
+    motor = MotorBM25.construir(documentos)
+    motor.guardar(destino)
+    print(f"\nÍndice BM25 con {motor.total_documentos} documentos y "
+          f"{len(motor.vocabulario)} términos en {time.perf_counter() - inicio:.2f}s")
+
+    # Prueba rápida sobre el índice mapeado en memoria
+    motor = MotorBM25.cargar(destino)
+    for texto in ("dengue", "mortalidad materna", "IRA"):
+        r = motor.buscar({"texto": texto}, size=3, orden="relevancia")
+        print(f"  '{texto}': {r['total']} resultados en {r['took_ms']} ms")
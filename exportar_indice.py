@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from Helpers.elastic import ElasticSearch
+from Helpers.exportacion import Exportador
+
+# Exporta un índice completo (PIT + search_after) a NDJSON o Parquet.
+#
+#   python exportar_indice.py boletines.ndjson
+#   python exportar_indice.py boletines.ndjson.gz
+#   python exportar_indice.py boletines.parquet [slices]      (requiere pyarrow)
+#
+# El índice es ELASTIC_INDEX_DEFAULT (o la variable EXPORTAR_INDICE).
+
+if __name__ == "__main__":
+    load_dotenv("env.txt")
+
+    if len(sys.argv) < 2:
+        print("Uso: python exportar_indice.py <salida.ndjson|salida.ndjson.gz|salida.parquet> [slices]")
+        raise SystemExit(1)
+
+    ruta = sys.argv[1]
+    slices = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    ELASTIC_CLOUD_URL     = os.getenv("ELASTIC_CLOUD_URL")
+    ELASTIC_API_KEY       = os.getenv("ELASTIC_API_KEY")
+    ELASTIC_INDEX_DEFAULT = os.getenv("EXPORTAR_INDICE") or os.getenv("ELASTIC_INDEX_DEFAULT") or "index-boletin-semanal"
+
+    es = ElasticSearch(
+        cloud_url=ELASTIC_CLOUD_URL,
+        api_key=ELASTIC_API_KEY,
+        default_index=ELASTIC_INDEX_DEFAULT,
+    )
+
+    formato = Exportador.formato_de_ruta(ruta)
+    print(f"Exportando {ELASTIC_INDEX_DEFAULT} -> {ruta} ({formato}, {slices} slice(s))")
+
+    inicio = time.perf_counter()
+    documentos = es.exportar(slices=slices)
+    if formato == "parquet":
+        n = Exportador.a_parquet(documentos, ruta)
+    else:
+        n = Exportador.a_ndjson(documentos, ruta)
+    segundos = time.perf_counter() - inicio
+
+    print(f"Documentos exportados: {n} en {segundos:.1f} s ({n / segundos if segundos else 0:.0f} docs/s)")
@@ -0,0 +1,52 @@
+"""
+Genera los registros de boletín de data/ (semana_epidemiologica,
+rango_fechas, tema_central, temas_portada, anio, pdf_url) a partir de la
+portada de los PDFs de data_pdfs/, en paralelo (ExtractorMetadatos).
+
+Los registros que ya existen no se tocan (salvo --sobrescribir), pero se
+comparan: el reporte de validación lista los campos que no coinciden con
+el nombre del archivo, con el registro existente o con su propio rango
+de fechas (también de los JSON que no tienen PDF). Después de
+sobrescribir, cargarjson.py envía solo los registros que cambiaron.
+
+Uso:
+    python generar_metadatos.py [carpeta_pdfs] [carpeta_json] [--sobrescribir] [--procesos=N]
+"""
+import os
+import sys
+from dotenv import load_dotenv
+from Helpers.metadatosPdf import ExtractorMetadatos
+
+
+if __name__ == "__main__":
+    load_dotenv("env.txt")
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opciones = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+
+    pdf_dir = argumentos[0] if argumentos else "data_pdfs"
+    json_dir = argumentos[1] if len(argumentos) > 1 else os.getenv("DATA_DIR", "data")
+    reporte = os.getenv("REPORTE_METADATOS") or "reporte_metadatos.json"
+
+    print("Carpeta de PDFs:", os.path.abspath(pdf_dir))
+    print("Carpeta de registros:", os.path.abspath(json_dir))
+
+    extractor = ExtractorMetadatos(procesos=int(opciones.get("procesos", 0)))
+    resultado = extractor.generar(
+        pdf_dir, json_dir, sobrescribir="--sobrescribir" in sys.argv, ruta_reporte=reporte,
+    )
+
+    if not resultado.get("pdfs") and "error" in resultado:
+        print("Error:", resultado["error"])
+        raise SystemExit(1)
+
+    print("\nResultado:")
+    print({k: v for k, v in resultado.items() if k not in ("diferencias", "errores")})
+    print(f"Errores: {len(resultado['errores'])}")
+
+    print(f"\nDiferencias ({len(resultado['diferencias'])}), detalle en {reporte}:")
+    for d in resultado["diferencias"]:
+        valores = ", ".join(f"{k}={d[k]}" for k in d if k not in ("archivo", "campo"))
+        print(f"  {d['archivo']}: {d['campo']} -> {valores}")
+
+    raise SystemExit(0 if resultado["success"] else 1)
@@ -0,0 +1,17 @@
+# Configuración de gunicorn:  gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+preload_app = True
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """Ya en el worker: abre las conexiones antes de la primera petición."""
+    from Helpers.conexiones import conexiones
+
+    estado = conexiones.calentar(mongo_uri=os.getenv("MONGO_URI"))
+    server.log.info(f"Worker {worker.pid} warm-up: {estado}")
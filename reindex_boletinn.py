@@ -1,10 +1,15 @@
 import os
-import json
 import glob
+import sys
 
-from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
 
+from Helpers import codecJson
+from Helpers.elastic import ElasticSearch
+from Helpers.embeddings import Embeddings, embeddings_habilitados
+from Helpers.indices import GestorIndices, IndicesPorAnio
+from cargarjson import limpiar_documento
+
 # ==============================
 # 1. Cargar variables del env.txt
 # ==============================
@@ -14,57 +19,134 @@ ELASTIC_CLOUD_URL       = os.getenv("ELASTIC_CLOUD_URL")
 ELASTIC_API_KEY         = os.getenv("ELASTIC_API_KEY")
 ELASTIC_INDEX_DEFAULT   = os.getenv("ELASTIC_INDEX_DEFAULT") or "index-boletin-semanal"
 
-# 🔴 AJUSTA ESTA RUTA A TU CARPETA REAL DE JSON
-CARPETA_JSON = r"C:\Users\ARNULFO\Documents\GitHub\BigDataApp_2025_s2_MPBM\data"
+# Carpeta con los JSON de los boletines (por defecto data/ del repo)
+CARPETA_JSON = os.getenv("CARPETA_JSON") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 # ==============================
-# 2. Crear cliente de Elasticsearch
-#    (IGUAL que en tu clase Helpers/elastic.py)
+# 2. Helper de Elastic
+#    (el mismo gestor de conexiones que usa la app)
 # ==============================
-if not ELASTIC_CLOUD_URL:
-    raise ValueError("ELASTIC_CLOUD_URL no está configurada en env.txt")
-if not ELASTIC_API_KEY:
-    raise ValueError("ELASTIC_API_KEY no está configurada en env.txt")
-
-es = Elasticsearch(
-    hosts=[ELASTIC_CLOUD_URL],
+es = ElasticSearch(
+    cloud_url=ELASTIC_CLOUD_URL,
     api_key=ELASTIC_API_KEY,
+    default_index=ELASTIC_INDEX_DEFAULT,
 )
 
+# El nombre del índice de siempre pasa a ser un alias: cada reindexación
+# carga un índice versionado nuevo y al final mueve el alias.
+gestor = GestorIndices(es, alias=ELASTIC_INDEX_DEFAULT)
+
+# Variante particionada: un índice por año detrás del mismo alias de lectura
+por_anio = IndicesPorAnio(es, alias=ELASTIC_INDEX_DEFAULT)
+
+
+def leer_documentos(archivos):
+    for ruta in archivos:
+        try:
+            doc = codecJson.leer(ruta)
+            if isinstance(doc, dict):
+                yield limpiar_documento(doc)
+        except Exception as e:
+            print(f"Error al leer {ruta}: {e}")
+
+
+def documentos_de_carpeta():
+    print(f"Leyendo JSON desde: {CARPETA_JSON}")
+    archivos = sorted(glob.glob(os.path.join(CARPETA_JSON, "*.json")))
+    print(f"Encontré {len(archivos)} archivos JSON para indexar")
+    if not archivos:
+        print("⚠ No se encontraron archivos .json en la carpeta indicada.")
+        return None
+
+    documentos = leer_documentos(archivos)
+    if embeddings_habilitados():
+        # Vector para la búsqueda híbrida (campo dense_vector del mapeo)
+        documentos = Embeddings().agregar_vectores(documentos)
+    return documentos
+
+
 # ==============================
 # 3. Función principal de reindexación
 # ==============================
 def main():
-    indice = ELASTIC_INDEX_DEFAULT
-    print(f"Usando índice: {indice}")
-    print(f"Leyendo JSON desde: {CARPETA_JSON}")
+    if por_anio.activo():
+        # Ya particionado: reindexar todo es reindexar todos los años
+        reindexar_por_anio()
+        return
 
-    archivos = glob.glob(os.path.join(CARPETA_JSON, "*.json"))
-    print(f"Encontré {len(archivos)} archivos JSON para indexar")
+    print(f"Alias de lectura: {gestor.alias} (hoy apunta a {gestor.indice_activo()})")
+    documentos = documentos_de_carpeta()
+    if documentos is None:
+        return
 
-    if not archivos:
-        print("⚠ No se encontraron archivos .json en la carpeta indicada.")
+    resultado = gestor.reindexar(documentos)
+    bulk = resultado.get("bulk", {})
+
+    print("========== RESUMEN ==========")
+    print(f"Índice nuevo            : {resultado.get('indice')}")
+    print(f"Documentos indexados OK : {bulk.get('indexados', 0)}")
+    print(f"Documentos con error    : {bulk.get('fallidos', 0)}")
+    if resultado["success"]:
+        print(f"Alias {gestor.alias}: {resultado['anterior']} -> {resultado['indice']}")
+        borrados = gestor.borrar_versiones_viejas(conservar=2)
+        if borrados:
+            print(f"Versiones viejas borradas: {borrados}")
+    else:
+        print(f"No se cambió el alias: {resultado.get('error')}")
+
+
+def reindexar_por_anio(anios=None):
+    """Carga en índices por año (todos, o solo `anios`) y mueve los alias."""
+    documentos = documentos_de_carpeta()
+    if documentos is None:
         return
 
-    count_ok = 0
-    count_fail = 0
+    resultado = por_anio.reindexar(documentos, anios=anios)
+    bulk = resultado.get("bulk", {})
 
-    for ruta in archivos:
-        try:
-            with open(ruta, "r", encoding="utf-8") as f:
-                doc = json.load(f)
+    print("========== RESUMEN POR AÑO ==========")
+    print(f"Documentos indexados OK : {bulk.get('indexados', 0)}")
+    print(f"Documentos con error    : {bulk.get('fallidos', 0)}")
+    if not resultado["success"]:
+        print(f"No se cambiaron los alias: {resultado.get('error')}")
+        return
+    for anio, indice in sorted(resultado["indices"].items()):
+        print(f"  {anio}: {resultado['anteriores'].get(anio)} -> {indice}")
+    if resultado.get("heredados"):
+        print(f"Fuera del alias {por_anio.alias}: {resultado['heredados']}")
+    for anio in resultado["indices"]:
+        por_anio.gestor(anio).borrar_versiones_viejas(conservar=2)
 
-            # Indexar el documento
-            es.index(index=indice, document=doc)
-            count_ok += 1
-        except Exception as e:
-            print(f"Error al indexar {ruta}: {e}")
-            count_fail += 1
 
-    print("========== RESUMEN ==========")
-    print(f"Documentos indexados OK : {count_ok}")
-    print(f"Documentos con error    : {count_fail}")
+def volver_a(indice):
+    """Rollback: apunta el alias (o el alias de su año) a una versión anterior."""
+    if por_anio.anio_de_version(indice) is not None:
+        anterior = por_anio.volver(indice)
+    else:
+        anterior = gestor.cambiar_alias(indice)
+    print(f"Alias de {indice}: {anterior} -> {indice}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python reindex_boletinn.py                  -> reindexación completa
+    # python reindex_boletinn.py versiones        -> lista las versiones
+    # python reindex_boletinn.py volver <indice>  -> rollback del alias
+    # python reindex_boletinn.py por-anio         -> pasa a (o recarga) un índice por año
+    # python reindex_boletinn.py anio 2021 [2022] -> recarga solo esos años
+    # python reindex_boletinn.py congelar         -> años anteriores en 1 segmento y solo lectura
+    if len(sys.argv) > 1 and sys.argv[1] == "versiones":
+        for v in gestor.versiones():
+            print(("* " if v["activo"] else "  ") + v["indice"])
+        for anio in sorted(por_anio.anios()):
+            for v in por_anio.gestor(anio).versiones():
+                print(("* " if v["activo"] else "  ") + v["indice"])
+    elif len(sys.argv) > 1 and sys.argv[1] == "por-anio":
+        reindexar_por_anio()
+    elif len(sys.argv) > 2 and sys.argv[1] == "anio":
+        reindexar_por_anio({int(a) for a in sys.argv[2:]})
+    elif len(sys.argv) > 1 and sys.argv[1] == "congelar":
+        print("Congelados:", por_anio.congelar_anteriores())
+    elif len(sys.argv) > 2 and sys.argv[1] == "volver":
+        volver_a(sys.argv[2])
+    else:
+        main()
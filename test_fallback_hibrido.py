@@ -0,0 +1,33 @@
+import os
+
+# Elastic apuntando a un puerto sin nada escuchando: cada llamada falla con
+# ConnectionError, como cuando el clúster está caído. Se fija antes de
+# importar app (que lee el entorno al cargar).
+os.environ["ELASTIC_ENDPOINT"] = "http://127.0.0.1:9"
+os.environ["ELASTIC_API_KEY"] = "sin-clave"
+os.environ["ELASTIC_TIMEOUT"] = "2"
+
+import app as aplicacion  # noqa: E402
+
+if __name__ == "__main__":
+    if aplicacion.motor_local is None:
+        print("No hay índice local (python construir_indice_local.py); no se puede probar el respaldo")
+        raise SystemExit(1)
+
+    cliente = aplicacion.app.test_client()
+    fallos = 0
+    for modo in (None, "hibrido"):
+        cuerpo = {"texto": "mortalidad", "page_size": 5}
+        if modo:
+            cuerpo["modo"] = modo
+        data = cliente.post("/buscar-elastic", json=cuerpo).get_json()
+
+        ok = data.get("success") and data.get("motor") == "local" and data.get("hits")
+        print(f"modo={modo or 'lexico':<8} success={data.get('success')} "
+              f"motor={data.get('motor')} hits={len(data.get('hits') or [])} total={data.get('total')}")
+        if not ok:
+            print("  respuesta:", data)
+            fallos += 1
+
+    print("OK" if not fallos else f"{fallos} modo(s) sin respaldo local")
+    raise SystemExit(1 if fallos else 0)
@@ -0,0 +1,65 @@
+import os
+from dotenv import load_dotenv
+
+from Helpers.bm25 import MotorBM25
+from Helpers.busqueda import Busqueda
+from Helpers.elastic import ElasticSearch
+
+# Consultas frecuentes del buscador (texto, anio, semana)
+CONSULTAS = [
+    {"texto": "situación nacional"},
+    {"texto": "mortalidad"},
+    {"texto": "mortalidad materna"},
+    {"texto": "brotes", "anio": 2021},
+    {"texto": "eventos trazadores", "anio": 2020},
+    {"texto": "tablas de mando", "semana": 10},
+    {"texto": "covid"},
+    {"texto": "infeccion respiratoria aguda"},
+]
+
+if __name__ == "__main__":
+    load_dotenv("env.txt")
+
+    ELASTIC_CLOUD_URL     = os.getenv("ELASTIC_CLOUD_URL")
+    ELASTIC_API_KEY       = os.getenv("ELASTIC_API_KEY")
+    ELASTIC_INDEX_DEFAULT = os.getenv("ELASTIC_INDEX_DEFAULT") or "index-boletin-semanal"
+    INDICE_LOCAL_DIR      = os.getenv("INDICE_LOCAL_DIR") or "indice_local"
+
+    es = ElasticSearch(
+        cloud_url=ELASTIC_CLOUD_URL,
+        api_key=ELASTIC_API_KEY,
+        default_index=ELASTIC_INDEX_DEFAULT,
+    )
+    motor = MotorBM25.cargar(INDICE_LOCAL_DIR)
+
+    print(f"Índice local: {motor.total_documentos} documentos")
+    print(f"{'consulta':<40}{'elastic':>8}{'local':>8}{'jaccard':>9}{'top10':>7}")
+
+    diferencias = 0
+    for data in CONSULTAS:
+        filtros = Busqueda.normalizar_filtros(data)
+
+        resp = es.buscar(query={"query": Busqueda.construir_query(filtros)}, size=500)
+        if not resp["success"]:
+            print("Error en Elastic:", resp.get("error"))
+            raise SystemExit(1)
+        ids_elastic = [h["_id"] for h in resp["hits"]]
+
+        local = motor.buscar(filtros, size=500, orden="relevancia")
+        ids_local = [h["id"] for h in local["hits"]]
+
+        union = set(ids_elastic) | set(ids_local)
+        jaccard = len(set(ids_elastic) & set(ids_local)) / len(union) if union else 1.0
+        top10 = len(set(ids_elastic[:10]) & set(ids_local[:10]))
+
+        nombre = " / ".join(str(v) for v in data.values())
+        print(f"{nombre:<40}{resp['total']:>8}{local['total']:>8}{jaccard:>9.2f}{top10:>7}")
+        if jaccard < 0.9:
+            diferencias += 1
+
+    # El plegado de acentos del motor local puede encontrar algo más que
+    # Elastic (analizador estándar); por eso se compara con Jaccard >= 0.9
+    if diferencias:
+        print(f"\n{diferencias} consultas con resultados distintos (Jaccard < 0.9)")
+        raise SystemExit(1)
+    print("\nParidad OK")